@@ -1,29 +1,57 @@
+import asyncio
 import atexit
 import base64
+import contextlib
 import datetime
+import glob
 import hmac
 import hashlib
+import http.client
 import io
 import json
 import logging
+import multiprocessing
 import os
 import re
 import secrets
+import selectors
+import shutil
+import signal
 import smtplib
+import socket
+import sys
+import tempfile
+import threading
 import time
 import uuid
 import html
 import traceback
 import zipfile
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from email import policy
+from email import utils as email_utils
 from email.parser import BytesParser
 from pathlib import Path
 from urllib.parse import parse_qs, quote, unquote, urlparse
 
+try:
+    import fcntl
+except ImportError:  # Windows: pas de flock, ingestion bufferisée indisponible
+    fcntl = None
+
+try:
+    import brotli
+except ImportError:  # Optionnel: sans le module, compression gzip seulement
+    brotli = None
+
 import psycopg
 from psycopg.rows import dict_row
-from psycopg_pool import ConnectionPool
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
 import requests
 
 # ==================== LOGGING ====================
@@ -53,25 +81,46 @@ MEDIA_EVENTS = {}
 # ==================== GESTION D'ERREURS ====================
 class APIError(Exception):
     """Exception personnalisée pour les erreurs API"""
-    def __init__(self, message, status_code=400, details=None):
+    def __init__(self, message, status_code=400, details=None, headers=None):
         self.message = message
         self.status_code = status_code
         self.details = details or {}
+        self.headers = headers or {}
         super().__init__(self.message)
 
+
+class DatabaseUnavailable(APIError):
+    """Disjoncteur base de données ouvert: échec immédiat sans tentative de connexion."""
+    def __init__(self):
+        super().__init__(
+            "Base de données momentanément indisponible. Réessayez dans quelques secondes.",
+            503,
+            headers={"Retry-After": "5"},
+        )
+
 # Admin credentials par défaut
 ADMIN_USERNAME = os.environ.get("ADMIN_USERNAME", "asaa2026")
 ADMIN_PASSWORD = os.environ.get("ADMIN_PASSWORD", "ASAALMO2026")
 ADMIN_WHATSAPP = os.environ.get("ADMIN_WHATSAPP", "2250150070083")
+# Jetons de session admin (HMAC). Sans secret fixe, les jetons expirent au redémarrage.
+ADMIN_TOKEN_SECRET = os.environ.get("ADMIN_TOKEN_SECRET", "") or secrets.token_hex(32)
+ADMIN_TOKEN_TTL = int(os.environ.get("ADMIN_TOKEN_TTL", "43200"))
+ADMIN_AUTH_REFRESH_SECONDS = float(os.environ.get("ADMIN_AUTH_REFRESH_SECONDS", "5"))
+# Cache des identifiants Basic déjà vérifiés (0 = désactivé)
+ADMIN_AUTH_CACHE_TTL = float(os.environ.get("ADMIN_AUTH_CACHE_TTL", "60"))
+ADMIN_AUTH_CACHE_SIZE = int(os.environ.get("ADMIN_AUTH_CACHE_SIZE", "64"))
 CODE_PREFIX = "QI26"
 MAX_UPLOAD_BYTES = 3 * 1024 * 1024
 MAX_JSON_BYTES = 1024 * 1024
 RATE_LIMIT_RULES = {
+    "admin_login": {"limit": 10, "window": 300},
     "register": {"limit": 10, "window": 300},
     "vote": {"limit": 30, "window": 300},
     "contact": {"limit": 8, "window": 300},
 }
 RATE_LIMITS = {}
+# Protège RATE_LIMITS et MEDIA_EVENTS, partagés entre les threads du serveur
+_STATE_LOCK = threading.Lock()
 ALLOWED_STATUSES = {"pending", "approved", "eliminated"}
 ALLOWED_LEVELS = {"", "Débutant", "Intermédiaire", "Avancé"}
 MAX_LENGTHS = {
@@ -120,35 +169,318 @@ SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
 SMTP_FROM = os.environ.get("SMTP_FROM", "")
 SMTP_TO = os.environ.get("SMTP_TO", "")
 
+# Serveur HTTP : "threaded" (pool de threads borné), "prefork" (plusieurs processus
+# threaded sur le même socket), "asyncio" (boucle d'événements, les routes tournent
+# dans un pool de threads) ou "single" (une requête à la fois)
+SERVER_MODE = os.environ.get("SERVER_MODE", "threaded").strip().lower()
+HTTP_WORKERS = max(1, int(os.environ.get("HTTP_WORKERS", "16")))
+HTTP_QUEUE_SIZE = max(0, int(os.environ.get("HTTP_QUEUE_SIZE", "64")))
+HTTP_SOCKET_TIMEOUT = float(os.environ.get("HTTP_SOCKET_TIMEOUT", "30"))
+HTTP_DRAIN_TIMEOUT = float(os.environ.get("HTTP_DRAIN_TIMEOUT", "20"))
+# Keep-alive HTTP/1.1 : délai d'inactivité entre deux requêtes et nombre max de requêtes par connexion
+HTTP_KEEPALIVE_TIMEOUT = float(os.environ.get("HTTP_KEEPALIVE_TIMEOUT", "5"))
+HTTP_KEEPALIVE_MAX_REQUESTS = max(1, int(os.environ.get("HTTP_KEEPALIVE_MAX_REQUESTS", "100")))
+# Après une réponse, le thread attend la requête suivante au plus ce délai (secondes) avant
+# de rendre la connexion au sélecteur (évite un aller-retour quand le client enchaîne),
+# sauf si d'autres requêtes attendent un worker
+HTTP_KEEPALIVE_LINGER = max(0.0, float(os.environ.get("HTTP_KEEPALIVE_LINGER", "0.01")))
+# Connexions ouvertes au plus (actives + en attente de requête); au-delà, l'accept attend
+HTTP_MAX_CONNECTIONS = max(1, int(os.environ.get("HTTP_MAX_CONNECTIONS", "512")))
+# Corps de requête non lu jusqu'à cette taille: lu et ignoré pour garder la connexion
+KEEPALIVE_DRAIN_BYTES = 64 * 1024
+PREFORK_WORKERS = max(1, int(os.environ.get("PREFORK_WORKERS", str(os.cpu_count() or 1))))
+ASYNC_ROUTE_WORKERS = max(1, int(os.environ.get("ASYNC_ROUTE_WORKERS", str(HTTP_WORKERS))))
+PREFORK_REUSEPORT = os.environ.get("PREFORK_REUSEPORT", "0").lower() in ("1", "true", "yes")
+# Vidéos /media/ lues en même temps (par processus). En mode threaded chaque lecture occupe
+# un thread du pool: la moitié par défaut, pour que les vidéos n'affament pas l'API
+MEDIA_MAX_STREAMS = max(1, int(os.environ.get("MEDIA_MAX_STREAMS", str(max(1, HTTP_WORKERS // 2)))))
+# Ingestion des votes: "direct" (une transaction par vote) ou "buffered" (validation en
+# mémoire, journal local fsync, écriture par lots). Voir VoteIngestor.
+VOTE_INGEST_MODE = os.environ.get("VOTE_INGEST_MODE", "direct").strip().lower()
+VOTE_SPOOL_DIR = os.environ.get("VOTE_SPOOL_DIR", str(BASE_DIR / "vote-spool"))
+VOTE_FLUSH_INTERVAL = float(os.environ.get("VOTE_FLUSH_INTERVAL", "0.5"))
+VOTE_FLUSH_BATCH = max(1, int(os.environ.get("VOTE_FLUSH_BATCH", "500")))
+VOTE_BUFFER_MAX = max(1, int(os.environ.get("VOTE_BUFFER_MAX", "50000")))
+VOTE_STATE_REFRESH = float(os.environ.get("VOTE_STATE_REFRESH", "2"))
+VOTE_SPOOL_FSYNC = os.environ.get("VOTE_SPOOL_FSYNC", "1").lower() in ("1", "true", "yes")
+# Paramètres du tournoi en mémoire: rechargés sur NOTIFY (LISTEN) et au plus tard après N secondes
+SETTINGS_REFRESH_SECONDS = float(os.environ.get("SETTINGS_REFRESH_SECONDS", "30"))
+SETTINGS_LISTEN = os.environ.get("SETTINGS_LISTEN", "1").lower() in ("1", "true", "yes")
+# Réponses publiques (candidats, résultats, paramètres) encodées une fois par version des
+# données; ETag/304 et Cache-Control public côté navigateur
+PUBLIC_CACHE = os.environ.get("PUBLIC_CACHE", "1").lower() in ("1", "true", "yes")
+PUBLIC_CACHE_MAX_AGE = max(0, int(os.environ.get("PUBLIC_CACHE_MAX_AGE", "5")))
+PUBLIC_CACHE_STALE = max(0, int(os.environ.get("PUBLIC_CACHE_STALE", "30")))
+# Sections du tableau de bord admin gardées en mémoire (secondes, 0 = pas de cache)
+DASHBOARD_CACHE_SECONDS = float(os.environ.get("DASHBOARD_CACHE_SECONDS", "5"))
+# Pool de processus pour le travail CPU (PBKDF2, archive zip, gros JSON). 0 = sur le thread de la requête
+CPU_POOL_WORKERS = max(0, int(os.environ.get("CPU_POOL_WORKERS", str(min(4, os.cpu_count() or 1)))))
+CPU_POOL_QUEUE_SIZE = max(0, int(os.environ.get("CPU_POOL_QUEUE_SIZE", "8")))
+CPU_POOL_TIMEOUT = float(os.environ.get("CPU_POOL_TIMEOUT", "120"))
+CPU_POOL_RETRY_AFTER = 5
+# Réponses JSON dont la liste principale a au moins ce nombre d'éléments: encodées dans le
+# pool (0 = toujours sur le thread de la requête)
+CPU_JSON_MIN_ITEMS = max(0, int(os.environ.get("CPU_JSON_MIN_ITEMS", "2000")))
+# Listes complètes et exports admin: curseur serveur lu par STREAM_FETCH_ROWS lignes,
+# réponse écrite par morceaux d'environ STREAM_CHUNK_BYTES (mémoire constante par requête)
+STREAM_FETCH_ROWS = max(1, int(os.environ.get("STREAM_FETCH_ROWS", "1000")))
+STREAM_CHUNK_BYTES = max(1024, int(os.environ.get("STREAM_CHUNK_BYTES", str(64 * 1024))))
+# Compression des réponses (gzip, ou brotli si le module est installé) à partir de N octets
+COMPRESS = os.environ.get("COMPRESS", "1").lower() in ("1", "true", "yes")
+COMPRESS_MIN_BYTES = max(0, int(os.environ.get("COMPRESS_MIN_BYTES", "1024")))
+COMPRESS_LEVEL = min(9, max(1, int(os.environ.get("COMPRESS_LEVEL", "6"))))
+# Fichiers de public/ en mémoire (total), et taille max d'un fichier gardé tel quel:
+# au-delà, il est envoyé par sendfile sans passer par Python
+STATIC_CACHE_MAX_BYTES = max(0, int(os.environ.get("STATIC_CACHE_MAX_BYTES", str(32 * 1024 * 1024))))
+STATIC_CACHE_FILE_MAX_BYTES = max(0, int(os.environ.get("STATIC_CACHE_FILE_MAX_BYTES", str(256 * 1024))))
+# Catalogue des médias du quiz: mtime du dossier et des métadonnées vérifiés au plus
+# toutes les N secondes; rescan complet périodique (fichier remplacé sur place), 0 = jamais
+MEDIA_CATALOG_CHECK_SECONDS = max(0.0, float(os.environ.get("MEDIA_CATALOG_CHECK_SECONDS", "2")))
+MEDIA_CATALOG_RESCAN_SECONDS = max(0.0, float(os.environ.get("MEDIA_CATALOG_RESCAN_SECONDS", "300")))
+
 
 def db_ready():
     return bool(DATABASE_URL)
 
 
-# Connection pool (désactivé par défaut sur Render free: base peut dormir)
-USE_DB_POOL = os.environ.get("USE_DB_POOL", "0").lower() in ("1", "true", "yes")
+# Connection pool, actif par défaut. Les connexions sont vérifiées avant d'être prêtées et
+# recréées en arrière-plan; une requête attend au plus DB_POOL_TIMEOUT secondes une
+# connexion (au lieu du connect_timeout de 60 s quand la base Render dort).
+USE_DB_POOL = os.environ.get("USE_DB_POOL", "1").lower() in ("1", "true", "yes")
+DB_POOL_MIN_SIZE = max(0, int(os.environ.get("DB_POOL_MIN_SIZE", "1")))
+DB_POOL_MAX_SIZE = max(1, DB_POOL_MIN_SIZE, int(os.environ.get("DB_POOL_MAX_SIZE", "10")))
+DB_POOL_MAX_IDLE = float(os.environ.get("DB_POOL_MAX_IDLE", "300"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "5"))
+DB_POOL_RECONNECT_TIMEOUT = float(os.environ.get("DB_POOL_RECONNECT_TIMEOUT", "300"))
+DB_RETRY_AFTER = 5
+# Requêtes fréquentes préparées sur chaque connexion (0 derrière PgBouncer en mode transaction)
+DB_PREPARE = os.environ.get("DB_PREPARE", "1").lower() in ("1", "true", "yes")
+# Disjoncteur: ouvert après N échecs de connexion consécutifs, refermé par une sonde unique
+DB_BREAKER_THRESHOLD = max(1, int(os.environ.get("DB_BREAKER_THRESHOLD", "3")))
+DB_BREAKER_PROBE_INTERVAL = float(os.environ.get("DB_BREAKER_PROBE_INTERVAL", "5"))
+# Délai laissé à la sonde pour réveiller une base en veille
+DB_WAKE_TIMEOUT = int(os.environ.get("DB_WAKE_TIMEOUT", "60"))
+# Keep-warm: ping régulier (secondes, 0 = désactivé), limité à une période et à des heures
+DB_KEEPWARM_INTERVAL = float(os.environ.get("DB_KEEPWARM_INTERVAL", "0"))
+DB_KEEPWARM_WINDOW = os.environ.get("DB_KEEPWARM_WINDOW", "").strip()
+DB_KEEPWARM_HOURS = os.environ.get("DB_KEEPWARM_HOURS", "").strip()
 _connection_pool = None
+_POOL_LOCK = threading.Lock()
+
+
+def db_pool_options():
+    """Paramètres communs aux pools synchrone et asyncio."""
+    return {
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "max_idle": DB_POOL_MAX_IDLE,
+        "timeout": DB_POOL_TIMEOUT,
+        "reconnect_timeout": DB_POOL_RECONNECT_TIMEOUT,
+        "reconnect_failed": _log_pool_reconnect_failed,
+        "open": False,
+    }
+
+
+def _log_pool_reconnect_failed(pool):
+    logger.error(f"Pool DB: reconnexion impossible depuis {DB_POOL_RECONNECT_TIMEOUT:.0f}s, nouvel essai à la prochaine demande")
 
 
 def get_pool():
     global _connection_pool
     if _connection_pool is None and db_ready() and USE_DB_POOL:
-        min_conn = 1
-        max_conn = min(10, 20)
-        _connection_pool = ConnectionPool(
-            DATABASE_URL,
-            min_size=min_conn,
-            max_size=max_conn,
-        )
-        atexit.register(lambda: _connection_pool.close() if _connection_pool else None)
+        with _POOL_LOCK:
+            if _connection_pool is None:
+                pool = ConnectionPool(DATABASE_URL, check=ConnectionPool.check_connection, **db_pool_options())
+                # Ne pas bloquer: les connexions s'ouvrent en arrière-plan
+                pool.open(wait=False)
+                _connection_pool = pool
     return _connection_pool
 
 
+def pool_stats(pool):
+    """Statistiques d'un pool psycopg (synchrone ou asyncio) pour /api/health."""
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    size = stats.get("pool_size", 0)
+    return {
+        "min": stats.get("pool_min", 0),
+        "max": stats.get("pool_max", 0),
+        "size": size,
+        "inUse": size - stats.get("pool_available", 0),
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": stats.get("requests_num", 0),
+        "timeouts": stats.get("requests_errors", 0),
+        "connectErrors": stats.get("connections_errors", 0),
+        "connectionsLost": stats.get("connections_lost", 0),
+    }
+
+
+def close_pool():
+    global _connection_pool
+    with _POOL_LOCK:
+        pool, _connection_pool = _connection_pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(close_pool)
+
+
+def _forget_pool_after_fork():
+    # Les connexions et threads du pool appartiennent au processus parent:
+    # le worker ouvrira son propre pool au premier get_pool().
+    global _connection_pool
+    _connection_pool = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+
+def ping_database(connect_timeout=DB_WAKE_TIMEOUT):
+    """Connexion directe (hors pool) + "select 1": réveille une base en veille."""
+    with psycopg.connect(DATABASE_URL, connect_timeout=connect_timeout) as conn:
+        conn.execute("select 1")
+
+
+class DatabaseBreaker:
+    """Disjoncteur autour de get_conn().
+
+    Fermé: les connexions passent, les échecs consécutifs sont comptés.
+    Ouvert (après DB_BREAKER_THRESHOLD échecs): get_conn() lève DatabaseUnavailable
+    sans attendre, et un seul thread sonde la base jusqu'à ce qu'elle réponde.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = ""
+        self._prober = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            self._ensure_prober()
+            return False
+
+    def record_success(self):
+        if self.failures == 0 and self.opened_at is None:
+            return
+        with self._lock:
+            self.failures = 0
+            if self.opened_at is not None:
+                logger.info("Base de données de nouveau disponible, disjoncteur refermé.")
+            self.opened_at = None
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:200]
+            if self.opened_at is None and self.failures >= self.threshold:
+                self.opened_at = time.time()
+                logger.error(f"Disjoncteur DB ouvert après {self.failures} échecs: {self.last_error}")
+                self._ensure_prober()
+
+    def _ensure_prober(self):
+        # Appelé avec le verrou: une seule sonde par processus
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe_loop, name="db-breaker-probe", daemon=True)
+            self._prober.start()
+
+    def _probe_loop(self):
+        while True:
+            try:
+                ping_database()
+            except Exception as error:
+                with self._lock:
+                    self.last_error = str(error)[:200]
+                time.sleep(DB_BREAKER_PROBE_INTERVAL)
+                continue
+            self.record_success()
+            return
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": "open" if self.opened_at is not None else "closed",
+                "failures": self.failures,
+                "openedAt": self.opened_at,
+                "lastError": self.last_error,
+            }
+
+    def reset_after_fork(self):
+        # Le verrou a pu être copié verrouillé; la sonde du parent n'existe pas ici
+        self._lock = threading.Lock()
+        self._prober = None
+
+
+DB_BREAKER = DatabaseBreaker(DB_BREAKER_THRESHOLD)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=DB_BREAKER.reset_after_fork)
+
+
+@contextlib.contextmanager
 def get_conn():
-    pool = get_pool()
-    if pool:
-        return pool.connection()
-    return psycopg.connect(DATABASE_URL)
+    if not DB_BREAKER.allow():
+        raise DatabaseUnavailable()
+    with contextlib.ExitStack() as stack:
+        pool = get_pool()
+        try:
+            conn = stack.enter_context(pool.connection() if pool else psycopg.connect(DATABASE_URL))
+        except (PoolTimeout, psycopg.OperationalError) as error:
+            DB_BREAKER.record_failure(error)
+            raise
+        DB_BREAKER.record_success()
+        try:
+            yield conn
+        except psycopg.OperationalError as error:
+            # Connexion perdue en cours de requête
+            if conn.broken:
+                DB_BREAKER.record_failure(error)
+            raise
+
+
+def _in_keepwarm_window(now):
+    if DB_KEEPWARM_WINDOW:
+        start, _, end = DB_KEEPWARM_WINDOW.partition("/")
+        try:
+            if start and now < datetime.datetime.fromisoformat(start.strip()):
+                return False
+            if end and now > datetime.datetime.fromisoformat(end.strip()):
+                return False
+        except ValueError:
+            logger.warning(f"DB_KEEPWARM_WINDOW invalide: {DB_KEEPWARM_WINDOW!r} (attendu: début/fin ISO)")
+    if DB_KEEPWARM_HOURS:
+        first, _, last = DB_KEEPWARM_HOURS.partition("-")
+        try:
+            if not int(first) <= now.hour <= int(last or first):
+                return False
+        except ValueError:
+            logger.warning(f"DB_KEEPWARM_HOURS invalide: {DB_KEEPWARM_HOURS!r} (attendu: 8-23)")
+    return True
+
+
+def _keepwarm_loop():
+    while True:
+        time.sleep(DB_KEEPWARM_INTERVAL)
+        if not _in_keepwarm_window(datetime.datetime.now()):
+            continue
+        try:
+            ping_database()
+        except Exception as error:
+            logger.warning(f"Keep-warm DB: ping échoué: {error}")
+
+
+def start_db_keepwarm():
+    """Démarre le ping périodique de la base (un thread par processus appelant)."""
+    if DB_KEEPWARM_INTERVAL <= 0 or not db_ready():
+        return
+    threading.Thread(target=_keepwarm_loop, name="db-keepwarm", daemon=True).start()
+    logger.info(f"Keep-warm DB actif: ping toutes les {DB_KEEPWARM_INTERVAL:.0f}s")
 
 
 def _row_to_camel(row):
@@ -174,6 +506,8 @@ def _row_to_camel(row):
         "schedulejson": "scheduleJson",
         "updatedat": "updatedAt",
         "fullname": "fullName",
+        "votername": "voterName",
+        "votercontact": "voterContact",
     }
     out = {}
     for k, v in row.items():
@@ -194,196 +528,1477 @@ def cloudinary_ready():
     return bool(CLD_CLOUD_NAME and CLD_API_KEY and CLD_API_SECRET)
 
 
+# ==================== MIGRATIONS ====================
+# Schéma versionné: chaque migration (numérotée, idempotente) est notée dans
+# schema_migrations. Au démarrage, init_db() ne fait qu'une lecture de cette table
+# tant que rien n'est en attente. "python app.py migrate" applique aussi les
+# fichiers de sql-migrations/ (avant un déploiement par exemple).
+SQL_MIGRATIONS_DIR = BASE_DIR / "sql-migrations"
+# Clé du verrou consultatif qui sérialise les migrations entre processus et instances
+MIGRATIONS_LOCK_ID = 20260118
+# Base injoignable au démarrage: init_db() est réessayée, délai doublé jusqu'à ce plafond
+INIT_DB_RETRY_MAX = 60
+
+
+@contextlib.contextmanager
+def schema_conn():
+    """Connexion directe pour le schéma (démarrage, CLI migrate).
+
+    Hors pool et hors disjoncteur: le délai DB_POOL_TIMEOUT (quelques secondes) est
+    fait pour les requêtes, pas pour une base en veille qui met DB_WAKE_TIMEOUT à
+    répondre.
+    """
+    with psycopg.connect(DATABASE_URL, connect_timeout=DB_WAKE_TIMEOUT) as conn:
+        yield conn
+
+
 def init_db():
     if not db_ready():
         return
-    with get_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                create table if not exists candidates (
-                  id bigserial primary key,
-                  candidateCode text unique,
-                  fullName text not null,
-                  age integer,
-                  city text,
-                  country text,
-                  email text,
-                  phone text,
-                  whatsapp text not null,
-                  photoUrl text,
-                  quranLevel text,
-                  motivation text,
-                  status text default 'pending',
-                  createdAt timestamp with time zone default now()
-                );
-
-                create table if not exists votes (
-                  id bigserial primary key,
-                  candidateId bigint not null references candidates(id) on delete cascade,
-                  voterName text,
-                  voterContact text,
-                  createdAt timestamp with time zone default now()
-                );
-
-                create table if not exists scores (
-                  id bigserial primary key,
-                  candidateId bigint not null references candidates(id) on delete cascade,
-                  judgeName text not null,
-                  themeChosenScore real default 0,
-                  themeImposedScore real default 0,
-                  notes text,
-                  createdAt timestamp with time zone default now()
-                );
-
-                create table if not exists tournament_settings (
-                  id integer primary key check (id = 1),
-                  maxCandidates integer default 64,
-                  directQualified integer default 16,
-                  playoffParticipants integer default 32,
-                  playoffWinners integer default 16,
-                  groupsCount integer default 8,
-                  candidatesPerGroup integer default 4,
-                  finalistsFromWinners integer default 8,
-                  finalistsFromBestSecond integer default 2,
-                  totalFinalists integer default 10,
-                  votingEnabled integer default 0,
-                  registrationLocked integer default 0,
-                  competitionClosed integer default 0,
-                  announcementText text default '',
-                  scheduleJson text default '[]',
-                  updatedAt timestamp with time zone default now()
-                );
-
-                create table if not exists admin_audit (
-                  id bigserial primary key,
-                  action text not null,
-                  payload text,
-                  ip text,
-                  createdAt timestamp with time zone default now()
-                );
-
-                create table if not exists contact_messages (
-                  id bigserial primary key,
-                  fullName text not null,
-                  email text not null,
-                  subject text not null,
-                  message text not null,
-                  ip text,
-                  archived integer default 0,
-                  createdAt timestamp with time zone default now()
-                );
-
-                create table if not exists admin_config (
-                  key text primary key,
-                  value text,
-                  updatedAt timestamp with time zone default now()
-                );
-
-                insert into tournament_settings (id)
-                values (1)
-                on conflict (id) do nothing;
-                """
-            )
-            cur.execute("alter table candidates add column if not exists status text default 'pending'")
-            cur.execute("alter table candidates add column if not exists candidateCode text unique")
-            cur.execute(
-                "alter table tournament_settings add column if not exists registrationLocked integer default 0"
-            )
-            cur.execute(
-                "alter table tournament_settings add column if not exists competitionClosed integer default 0"
-            )
-            cur.execute("alter table tournament_settings add column if not exists announcementText text default ''")
-            cur.execute("alter table tournament_settings add column if not exists scheduleJson text default '[]'")
-            cur.execute(
-                f"""
-                update candidates
-                set candidateCode = '{CODE_PREFIX}-' || lpad(id::text, 3, '0')
-                where candidateCode is null
-                """
-            )
-            cur.execute("create index if not exists idx_votes_candidate on votes(candidateId)")
-            cur.execute("create index if not exists idx_scores_candidate on scores(candidateId)")
-            cur.execute("alter table votes add column if not exists ip text")
-            cur.execute("alter table contact_messages add column if not exists archived integer default 0")
-            cur.execute("create index if not exists idx_votes_candidate_ip on votes(candidateId, ip)")
-            cur.execute("create index if not exists idx_contact_archived on contact_messages(archived)")
+    with schema_conn() as conn:
+        done = applied_migrations(conn)
+    if any(version not in done for version, _, _ in MIGRATIONS):
+        applied = migrate()
+        if applied:
+            logger.info(f"Migrations appliquées: {', '.join(applied)}")
+    waiting = [version for version, _, _ in sql_file_migrations() if version not in done]
+    if waiting:
+        logger.info(f"{len(waiting)} migration(s) SQL en attente (python app.py migrate): {', '.join(waiting)}")
+
+
+def retry_init_db():
+    """Réessaie init_db() dans un thread démon jusqu'au succès (migrations appliquées)."""
+    def _retry():
+        delay = DB_BREAKER_PROBE_INTERVAL
+        while True:
+            time.sleep(delay)
             try:
-                cur.execute("create unique index if not exists uniq_candidates_whatsapp on candidates(whatsapp)")
-            except Exception:
-                pass
-            if ADMIN_PASSWORD:
-                cur.execute(
-                    """
-                    insert into admin_config (key, value)
-                    values ('admin_password_hash', %s)
-                    on conflict (key) do nothing
-                    """,
-                    (hash_password(ADMIN_PASSWORD),),
-                )
+                init_db()
+            except Exception as error:
+                delay = min(delay * 2, INIT_DB_RETRY_MAX)
+                logger.warning(f"Init base de données: nouvel échec ({error}), prochain essai dans {delay:.0f}s")
+                continue
+            logger.info("Base de données initialisée.")
+            return
+
+    threading.Thread(target=_retry, name="init-db-retry", daemon=True).start()
+
+
+def _migration_base_schema(cur):
+    cur.execute(
+        """
+        create table if not exists candidates (
+          id bigserial primary key,
+          candidateCode text unique,
+          fullName text not null,
+          age integer,
+          city text,
+          country text,
+          email text,
+          phone text,
+          whatsapp text not null,
+          photoUrl text,
+          quranLevel text,
+          motivation text,
+          status text default 'pending',
+          createdAt timestamp with time zone default now()
+        );
+
+        create table if not exists votes (
+          id bigserial primary key,
+          candidateId bigint not null references candidates(id) on delete cascade,
+          voterName text,
+          voterContact text,
+          createdAt timestamp with time zone default now()
+        );
+
+        create table if not exists scores (
+          id bigserial primary key,
+          candidateId bigint not null references candidates(id) on delete cascade,
+          judgeName text not null,
+          themeChosenScore real default 0,
+          themeImposedScore real default 0,
+          notes text,
+          createdAt timestamp with time zone default now()
+        );
+
+        create table if not exists tournament_settings (
+          id integer primary key check (id = 1),
+          maxCandidates integer default 64,
+          directQualified integer default 16,
+          playoffParticipants integer default 32,
+          playoffWinners integer default 16,
+          groupsCount integer default 8,
+          candidatesPerGroup integer default 4,
+          finalistsFromWinners integer default 8,
+          finalistsFromBestSecond integer default 2,
+          totalFinalists integer default 10,
+          votingEnabled integer default 0,
+          registrationLocked integer default 0,
+          competitionClosed integer default 0,
+          announcementText text default '',
+          scheduleJson text default '[]',
+          updatedAt timestamp with time zone default now()
+        );
+
+        create table if not exists admin_audit (
+          id bigserial primary key,
+          action text not null,
+          payload text,
+          ip text,
+          createdAt timestamp with time zone default now()
+        );
+
+        create table if not exists contact_messages (
+          id bigserial primary key,
+          fullName text not null,
+          email text not null,
+          subject text not null,
+          message text not null,
+          ip text,
+          archived integer default 0,
+          createdAt timestamp with time zone default now()
+        );
+
+        create table if not exists admin_config (
+          key text primary key,
+          value text,
+          updatedAt timestamp with time zone default now()
+        );
+
+        insert into tournament_settings (id)
+        values (1)
+        on conflict (id) do nothing;
+        """
+    )
+    cur.execute("alter table candidates add column if not exists status text default 'pending'")
+    cur.execute("alter table candidates add column if not exists candidateCode text unique")
+    cur.execute(
+        "alter table tournament_settings add column if not exists registrationLocked integer default 0"
+    )
+    cur.execute(
+        "alter table tournament_settings add column if not exists competitionClosed integer default 0"
+    )
+    cur.execute("alter table tournament_settings add column if not exists announcementText text default ''")
+    cur.execute("alter table tournament_settings add column if not exists scheduleJson text default '[]'")
+    cur.execute(
+        f"""
+        update candidates
+        set candidateCode = '{CODE_PREFIX}-' || lpad(id::text, greatest(3, length(id::text)), '0')
+        where candidateCode is null
+        """
+    )
+    cur.execute("create index if not exists idx_votes_candidate on votes(candidateId)")
+    cur.execute("create index if not exists idx_scores_candidate on scores(candidateId)")
+    cur.execute("alter table votes add column if not exists ip text")
+    cur.execute("alter table contact_messages add column if not exists archived integer default 0")
+    cur.execute("create index if not exists idx_contact_archived on contact_messages(archived)")
+    try:
+        # Dans un savepoint: un échec (doublons hérités) n'annule pas le reste de la migration
+        with cur.connection.transaction():
+            cur.execute("create unique index if not exists uniq_candidates_whatsapp on candidates(whatsapp)")
+    except psycopg.Error as error:
+        logger.warning(f"Index unique sur candidates.whatsapp impossible: {error}")
+    if ADMIN_PASSWORD:
+        cur.execute(
+            """
+            insert into admin_config (key, value)
+            values ('admin_password_hash', %s)
+            on conflict (key) do nothing
+            """,
+            (hash_password(ADMIN_PASSWORD),),
+        )
+
+
+# Totaux de votes matérialisés: tenus à jour par des triggers "for each statement"
+# (tables de transition), un seul upsert par candidat même pour un insert groupé.
+VOTE_TOTALS_SQL = """
+create or replace function candidate_vote_totals_ins() returns trigger language plpgsql as $$
+begin
+  insert into candidate_vote_totals (candidateId, totalVotes)
+  select candidateId, count(*) from new_votes group by candidateId order by candidateId
+  on conflict (candidateId) do update set totalVotes = candidate_vote_totals.totalVotes + excluded.totalVotes;
+  return null;
+end $$;
+
+create or replace function candidate_vote_totals_del() returns trigger language plpgsql as $$
+begin
+  update candidate_vote_totals t set totalVotes = t.totalVotes - d.n
+  from (select candidateId, count(*) as n from old_votes group by candidateId) d
+  where t.candidateId = d.candidateId;
+  return null;
+end $$;
+
+create or replace function candidate_vote_totals_upd() returns trigger language plpgsql as $$
+begin
+  insert into candidate_vote_totals (candidateId, totalVotes)
+  select candidateId, sum(n) from (
+    select candidateId, count(*) as n from new_votes group by candidateId
+    union all
+    select candidateId, -count(*) from old_votes group by candidateId
+  ) d
+  group by candidateId having sum(n) <> 0 order by candidateId
+  on conflict (candidateId) do update set totalVotes = candidate_vote_totals.totalVotes + excluded.totalVotes;
+  return null;
+end $$;
+
+create or replace function candidate_vote_totals_truncate() returns trigger language plpgsql as $$
+begin
+  delete from candidate_vote_totals;
+  return null;
+end $$;
+
+drop trigger if exists votes_totals_ins on votes;
+create trigger votes_totals_ins after insert on votes
+  referencing new table as new_votes for each statement execute function candidate_vote_totals_ins();
+drop trigger if exists votes_totals_del on votes;
+create trigger votes_totals_del after delete on votes
+  referencing old table as old_votes for each statement execute function candidate_vote_totals_del();
+drop trigger if exists votes_totals_upd on votes;
+create trigger votes_totals_upd after update on votes
+  referencing old table as old_votes new table as new_votes for each statement execute function candidate_vote_totals_upd();
+drop trigger if exists votes_totals_truncate on votes;
+create trigger votes_totals_truncate after truncate on votes
+  for each statement execute function candidate_vote_totals_truncate();
+"""
+
+
+# Toute modification de tournament_settings (API Python, serveur Node, psql) prévient
+# les processus à l'écoute, qui rechargent leur SettingsCache.
+SETTINGS_NOTIFY_SQL = """
+create or replace function tournament_settings_notify() returns trigger language plpgsql as $$
+begin
+  perform pg_notify('tournament_settings', '');
+  return null;
+end $$;
+
+drop trigger if exists tournament_settings_notify on tournament_settings;
+create trigger tournament_settings_notify after insert or update or delete on tournament_settings
+  for each statement execute function tournament_settings_notify();
+"""
+
+
+# Toute écriture sur les données publiques est signalée sur le canal "data_version"
+# (délivré au commit): chaque processus invalide alors ses réponses publiques en cache
+DATA_VERSION_NOTIFY_SQL = """
+create or replace function data_version_notify() returns trigger language plpgsql as $$
+begin
+  perform pg_notify('data_version', '');
+  return null;
+end $$;
+""" + "".join(
+    f"""
+drop trigger if exists data_version_notify on {table};
+create trigger data_version_notify after insert or update or delete or truncate on {table}
+  for each statement execute function data_version_notify();
+"""
+    for table in ("candidates", "votes", "scores", "tournament_settings")
+)
+
+
+# Code candidat calculé à l'insertion (l'id est déjà attribué dans un trigger "before")
+# lpad seul tronque au-delà de 3 caractères: greatest() donne le format de str(id).zfill(3).
+# Pas d'accents dans ce SQL: une base en SQL_ASCII ne les accepte pas.
+CANDIDATE_CODE_SQL = f"""
+create or replace function candidates_set_code() returns trigger language plpgsql as $$
+begin
+  if new.candidateCode is null or new.candidateCode = '' then
+    new.candidateCode := '{CODE_PREFIX}-' || lpad(new.id::text, greatest(3, length(new.id::text)), '0');
+  end if;
+  return new;
+end $$;
+
+drop trigger if exists candidates_set_code on candidates;
+create trigger candidates_set_code before insert on candidates
+  for each row execute function candidates_set_code();
+"""
+
+def insert_candidate(cur, payload, whatsapp):
+    """Insère un candidat (requête "candidate_insert"). Retourne (id, None) ou (None, message de doublon)."""
+    STATEMENTS.execute(
+        cur,
+        "candidate_insert",
+        {
+            "fullName": payload.get("fullName"),
+            "age": payload.get("age") or None,
+            "city": payload.get("city"),
+            "country": payload.get("country"),
+            "email": payload.get("email"),
+            "phone": payload.get("phone"),
+            "whatsapp": whatsapp,
+            "photoUrl": payload.get("photoUrl"),
+            "quranLevel": payload.get("quranLevel"),
+            "motivation": payload.get("motivation"),
+            "status": payload.get("status") or "pending",
+        },
+    )
+    row = cur.fetchone()
+    if row is None:
+        # Conflit avec une inscription validée après le début de la requête: invisible
+        # dans son instantané, on relit
+        found = STATEMENTS.execute(
+            cur, "candidate_same_name", {"fullName": payload.get("fullName"), "whatsapp": whatsapp}
+        ).fetchone()
+        row = (None, bool(found and found[0]))
+    candidate_id, same_name = row
+    if candidate_id is not None:
+        return candidate_id, None
+    return None, "Utilisateur déjà enregistré." if same_name else "WhatsApp déjà utilisé."
+
+
+def _ensure_vote_totals(cur):
+    cur.execute("select to_regclass('candidate_vote_totals') is null")
+    created = cur.fetchone()[0]
+    cur.execute(
+        """
+        create table if not exists candidate_vote_totals (
+          candidateId bigint primary key references candidates(id) on delete cascade,
+          totalVotes bigint not null default 0
+        )
+        """
+    )
+    cur.execute(VOTE_TOTALS_SQL)
+    if created:
+        # Première installation: remplir depuis les votes existants (les triggers
+        # posés dans cette transaction bloquent les insertions concurrentes)
+        _rebuild_vote_totals(cur)
+
+
+def _rebuild_vote_totals(cur):
+    """Recalcule candidate_vote_totals depuis votes. Retourne le nombre de candidats corrigés."""
+    cur.execute("lock table votes in share mode")
+    cur.execute(
+        """
+        select count(*) from (
+          select candidateId, count(*) as n from votes group by candidateId
+        ) v
+        full join candidate_vote_totals t using (candidateId)
+        where coalesce(v.n, 0) <> coalesce(t.totalVotes, 0)
+        """
+    )
+    drift = cur.fetchone()[0]
+    cur.execute("delete from candidate_vote_totals")
+    cur.execute(
+        """
+        insert into candidate_vote_totals (candidateId, totalVotes)
+        select candidateId, count(*) from votes group by candidateId
+        """
+    )
+    return drift
+
+
+def _ensure_vote_dedup(cur):
+    """Une ligne par (candidat, ip, jour UTC): garantit un vote par jour entre tous les workers."""
+    cur.execute("select to_regclass('vote_dedup') is null")
+    created = cur.fetchone()[0]
+    cur.execute(
+        """
+        create table if not exists vote_dedup (
+          candidateId bigint not null references candidates(id) on delete cascade,
+          ip text not null,
+          day date not null,
+          primary key (candidateId, ip, day)
+        );
+        create index if not exists idx_vote_dedup_day on vote_dedup(day);
+        """
+    )
+    if created:
+        cur.execute(
+            """
+            insert into vote_dedup (candidateId, ip, day)
+            select distinct candidateId, coalesce(ip, ''), (createdAt at time zone 'UTC')::date
+            from votes
+            where createdAt > now() - interval '2 days'
+            on conflict do nothing
+            """
+        )
+
+
+def rebuild_vote_totals():
+    """Commande de réparation: python app.py rebuild-vote-totals"""
+    with schema_conn() as conn:
+        with conn.cursor() as cur:
+            drift = _rebuild_vote_totals(cur)
         conn.commit()
+    return drift
 
 
-class Handler(BaseHTTPRequestHandler):
-    def _set_security_headers(self):
+def _migration_vote_ingest_id(cur):
+    cur.execute("alter table votes add column if not exists ingestId uuid")
+    cur.execute("create unique index if not exists uniq_votes_ingest on votes(ingestId)")
+
+
+def _migration_vote_dedup(cur):
+    # (candidateId, ip, createdAt): la règle des 24 h et le préchargement lisent une plage de dates
+    cur.execute("create index if not exists idx_votes_candidate_ip_created on votes(candidateId, ip, createdAt)")
+    cur.execute("drop index if exists idx_votes_candidate_ip")
+    cur.execute("create index if not exists idx_votes_created on votes(createdAt)")
+    _ensure_vote_dedup(cur)
+
+
+def _migration_settings_notify(cur):
+    cur.execute(SETTINGS_NOTIFY_SQL)
+
+
+def _migration_candidate_code(cur):
+    cur.execute(CANDIDATE_CODE_SQL)
+    # Doublon "même nom + même WhatsApp" (modification d'un candidat)
+    cur.execute("create index if not exists idx_candidates_name_whatsapp on candidates(lower(fullName), whatsapp)")
+
+
+def _migration_admin_list_indexes(cur):
+    # Filtre + parcours par id décroissant (listes admin paginées par clé)
+    cur.execute("create index if not exists idx_candidates_status_id on candidates(status, id)")
+    cur.execute("create index if not exists idx_contact_archived_id on contact_messages(archived, id)")
+    cur.execute("drop index if exists idx_contact_archived")
+    cur.execute("create index if not exists idx_admin_audit_action_id on admin_audit(action, id)")
+    cur.execute("create index if not exists idx_scores_judge_id on scores(judgeName, id)")
+
+
+def _migration_data_version_notify(cur):
+    cur.execute(DATA_VERSION_NOTIFY_SQL)
+
+
+# Migrations du code, dans l'ordre. Ne jamais renuméroter ni modifier une migration
+# publiée: en ajouter une nouvelle.
+MIGRATIONS = [
+    ("0001", "schéma initial", _migration_base_schema),
+    ("0002", "totaux de votes matérialisés", _ensure_vote_totals),
+    ("0003", "identifiant d'ingestion des votes", _migration_vote_ingest_id),
+    ("0004", "anti-doublon des votes", _migration_vote_dedup),
+    ("0005", "NOTIFY sur tournament_settings", _migration_settings_notify),
+    ("0006", "code candidat à l'insertion", _migration_candidate_code),
+    ("0007", "index des listes admin paginées", _migration_admin_list_indexes),
+    ("0008", "NOTIFY data_version sur les données publiques", _migration_data_version_notify),
+]
+
+
+def sql_file_migrations():
+    """Fichiers de sql-migrations/, par ordre de nom, sous la version "sql/<fichier>"."""
+    out = []
+    for path in sorted(SQL_MIGRATIONS_DIR.glob("*.sql")):
+        def apply(cur, path=path):
+            cur.execute(path.read_text(encoding="utf-8"))
+        out.append((f"sql/{path.name}", path.stem, apply))
+    return out
+
+
+def applied_migrations(conn):
+    """Versions déjà appliquées (une seule requête, en autocommit)."""
+    conn.autocommit = True
+    try:
+        return {row[0] for row in conn.execute("select version from schema_migrations")}
+    except psycopg.errors.UndefinedTable:
+        return set()
+    finally:
+        if not conn.closed:
+            conn.autocommit = False
+
+
+def pending_migrations(include_sql=False, conn=None):
+    migrations = MIGRATIONS + (sql_file_migrations() if include_sql else [])
+    if conn is None:
+        with schema_conn() as conn:
+            done = applied_migrations(conn)
+    else:
+        done = applied_migrations(conn)
+    return [m for m in migrations if m[0] not in done]
+
+
+def migrate(include_sql=False):
+    """Applique les migrations en attente, chacune dans sa transaction. Retourne leurs versions.
+
+    Un verrou consultatif sérialise les processus (prefork, plusieurs instances): celui
+    qui attend relit schema_migrations une fois le verrou obtenu.
+    """
+    applied = []
+    with schema_conn() as conn:
+        pending = pending_migrations(include_sql, conn)
+        for version, description, apply in pending:
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    cur.execute("select pg_advisory_xact_lock(%s)", (MIGRATIONS_LOCK_ID,))
+                    cur.execute(
+                        """
+                        create table if not exists schema_migrations (
+                          version text primary key,
+                          description text,
+                          appliedAt timestamp with time zone default now()
+                        )
+                        """
+                    )
+                    cur.execute("select 1 from schema_migrations where version = %s", (version,))
+                    if cur.fetchone():
+                        continue
+                    logger.info(f"Migration {version}: {description}")
+                    apply(cur)
+                    cur.execute(
+                        "insert into schema_migrations (version, description) values (%s, %s)",
+                        (version, description),
+                    )
+            applied.append(version)
+    return applied
+
+
+def is_https_request(headers):
+    forwarded = headers.get("X-Forwarded-Proto", "")
+    if forwarded:
+        return forwarded.lower() == "https"
+    host = headers.get("Host", "")
+    # En développement local, considérer comme sécurisé
+    # En production, vérifier que c'est vraiment HTTPS
+    is_local = any(value in host for value in ["localhost", "127.0.0.1", "0.0.0.0"])
+    return is_local
+
+
+def security_headers(headers):
+    """En-têtes de sécurité et CORS communs à toutes les réponses (moteurs sync et asyncio)."""
+    out = [
         # Sécurité standard
-        self.send_header("X-Content-Type-Options", "nosniff")
-        self.send_header("X-Frame-Options", "DENY")
-        self.send_header("X-XSS-Protection", "1; mode=block")
-        self.send_header("Referrer-Policy", "no-referrer")
-        self.send_header("Permissions-Policy", "camera=(), microphone=(), geolocation=()")
-        self.send_header(
+        ("X-Content-Type-Options", "nosniff"),
+        ("X-Frame-Options", "DENY"),
+        ("X-XSS-Protection", "1; mode=block"),
+        ("Referrer-Policy", "no-referrer"),
+        ("Permissions-Policy", "camera=(), microphone=(), geolocation=()"),
+        (
             "Content-Security-Policy",
             "default-src 'self'; script-src 'self' https://cdn.jsdelivr.net; style-src 'self' 'unsafe-inline'; img-src 'self' https: data:; connect-src 'self'; frame-ancestors 'none'; base-uri 'self'; form-action 'self'",
-        )
+        ),
+    ]
 
-        # CORS - Même domaine, localhost, ou Render
-        origin = self.headers.get("Origin", "")
-        host = self.headers.get("Host", "")
-        if origin and (
-            origin.endswith((".render.com", ".local"))
-            or "localhost" in origin
-            or "127.0.0.1" in origin
-            or origin in (f"https://{host}", f"http://{host}")
-        ):
-            self.send_header("Access-Control-Allow-Origin", origin)
-        elif not origin:
-            self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
-        self.send_header("Access-Control-Max-Age", "3600")
-        
-        if self._is_https():
-            self.send_header("Strict-Transport-Security", "max-age=31536000; includeSubDomains")
-
-    def _send_json(self, payload, status=200):
-        """Envoie une réponse JSON avec format standardisé et gestion d'erreurs robuste"""
+    # CORS - Même domaine, localhost, ou Render
+    origin = headers.get("Origin", "")
+    host = headers.get("Host", "")
+    if origin and (
+        origin.endswith((".render.com", ".local"))
+        or "localhost" in origin
+        or "127.0.0.1" in origin
+        or origin in (f"https://{host}", f"http://{host}")
+    ):
+        out.append(("Access-Control-Allow-Origin", origin))
+    elif not origin:
+        out.append(("Access-Control-Allow-Origin", "*"))
+    out.append(("Access-Control-Allow-Methods", "GET, POST, PUT, DELETE, OPTIONS"))
+    out.append(("Access-Control-Allow-Headers", "Content-Type, Authorization"))
+    out.append(("Access-Control-Max-Age", "3600"))
+
+    if is_https_request(headers):
+        out.append(("Strict-Transport-Security", "max-age=31536000; includeSubDomains"))
+    return out
+
+
+def json_envelope(payload, status=200):
+    """Standardise le format des réponses JSON de l'API."""
+    if not isinstance(payload, dict):
+        if payload is None:
+            payload = {"data": None, "success": False, "error": "No data available"}
+        else:
+            payload = {"data": payload}
+
+    # Ajouter métadonnées standard si absentes
+    if "success" not in payload and "error" not in payload:
+        payload["success"] = status < 400
+
+    if status >= 400 and "error" not in payload:
+        payload["error"] = "Une erreur est survenue"
+    return payload
+
+
+def probe_database():
+    """Exécute "select 1". Retourne None si la base répond, sinon l'exception."""
+    try:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("select 1")
+    except Exception as e:
+        return e
+    return None
+
+
+def health_report(probe_error, pool=None):
+    health = {"status": "ok", "database": "ok"}
+    if probe_error is not None:
+        health["database"] = "error"
+        health["databaseError"] = str(probe_error)[:100]
+    stats = pool_stats(pool if pool is not None else _connection_pool)
+    if stats is not None:
+        health["pool"] = stats
+    health["breaker"] = DB_BREAKER.snapshot()
+    if _vote_ingestor is not None:
+        health["voteIngest"] = _vote_ingestor.stats()
+    health["voteDedup"] = VOTE_DEDUP.stats()
+    health["settings"] = SETTINGS.stats()
+    health["publicCache"] = RESPONSE_CACHE.stats()
+    health["static"] = STATIC_FILES.stats()
+    health["mediaCatalog"] = MEDIA_CATALOG.stats()
+    health["listen"] = LISTENER.stats()
+    return health
+
+
+def quiz_media_root():
+    return Path(QUIZ_2025_MEDIA_DIR).resolve()
+
+
+def resolve_quiz_media(rel_path):
+    """Résout /media/<nom> vers (fichier, content-type). Lève APIError sinon."""
+    root = quiz_media_root()
+    if not root.exists() or not root.is_dir():
+        raise APIError("Dossier média non configuré ou introuvable.", 404)
+    requested = unquote(rel_path[len("/media/"):]).strip()
+    if not requested:
+        raise APIError("Fichier média manquant.", 400)
+    path = (root / requested).resolve()
+    if root not in path.parents or not path.exists() or not path.is_file():
+        raise APIError("Média introuvable.", 404)
+    content_type = QUIZ_2025_ALLOWED_EXT.get(path.suffix.lower())
+    if not content_type:
+        raise APIError("Type de média non supporté.", 415)
+    return path, content_type
+
+
+MEDIA_STREAMS = threading.BoundedSemaphore(MEDIA_MAX_STREAMS)
+MEDIA_RETRY_AFTER = 5
+
+
+def parse_byte_range(header, size):
+    """Range à une plage (bytes=a-b, a- ou -n) -> (début, fin incluse), ou None pour
+    l'ignorer (syntaxe inconnue, plusieurs plages: fichier entier). Lève APIError 416
+    si la plage est hors du fichier."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if not sep or not (first or last) or not (first + last).isdigit():
+        return None
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        start, end = max(0, size - int(last)), size - 1
+        if int(last) == 0:
+            start = size
+    if start >= size:
+        raise APIError("Plage demandée hors du fichier.", 416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def media_response(rel_path, request_headers):
+    """Réponse pour /media/<nom>: {"status", "headers", "path", "offset", "length", "contentType"}.
+
+    Range donne 206 et Content-Range (If-Range périmé: fichier entier); If-None-Match /
+    If-Modified-Since donnent 304. Le corps (length octets depuis offset) est envoyé
+    depuis le fichier par sendfile, jamais chargé en mémoire. Lève APIError.
+    """
+    path, content_type = resolve_quiz_media(rel_path)
+    info = path.stat()
+    size = info.st_size
+    etag = f'"{info.st_mtime_ns:x}-{size:x}"'
+    last_modified = email_utils.formatdate(info.st_mtime, usegmt=True)
+    headers = [
+        ("Cache-Control", "public, max-age=3600"),
+        ("Accept-Ranges", "bytes"),
+        ("ETag", etag),
+        ("Last-Modified", last_modified),
+    ]
+    media = {"status": 200, "headers": headers, "path": path, "offset": 0, "length": size, "contentType": content_type}
+    if not_modified(request_headers, etag, info.st_mtime):
+        media.update(status=304, length=0)
+        return media
+    headers.append(("Content-Type", content_type))
+    byte_range = request_headers.get("Range")
+    if_range = request_headers.get("If-Range")
+    if byte_range and if_range and if_range.strip() not in (etag, last_modified):
+        # Fichier modifié depuis la première partie: tout renvoyer
+        byte_range = None
+    span = parse_byte_range(byte_range, size) if byte_range else None
+    if span:
+        start, end = span
+        headers.append(("Content-Range", f"bytes {start}-{end}/{size}"))
+        media.update(status=206, offset=start, length=end - start + 1)
+    headers.append(("Content-Length", str(media["length"])))
+    return media
+
+
+def acquire_media_stream(media):
+    """Place de lecture pour une vidéo (True: à rendre par MEDIA_STREAMS.release()).
+    Les images et les réponses sans corps ne sont pas limitées. Lève APIError 503."""
+    if not media["length"] or not media["contentType"].startswith("video/"):
+        return False
+    if MEDIA_STREAMS.acquire(blocking=False):
+        return True
+    raise APIError(
+        "Trop de vidéos en lecture, réessayez dans quelques secondes.",
+        503,
+        headers={"Retry-After": str(MEDIA_RETRY_AFTER)},
+    )
+
+
+# ==================== REQUÊTES FRÉQUENTES ====================
+class StatementRegistry:
+    """Requêtes fréquentes, déclarées une seule fois sous un nom.
+
+    execute() les passe à psycopg avec prepare=True: chaque connexion du pool prépare la
+    requête à sa première exécution puis réutilise le plan (ni analyse ni planification
+    aux suivantes). Nombre d'exécutions et temps cumulé par requête: /api/admin/statements.
+    En mode pipeline, execute() ne fait que mettre la requête en file: le temps compté
+    est celui de l'envoi, pas de l'exécution.
+    """
+
+    def __init__(self):
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, sql, prepare=True):
+        self._statements[name] = {
+            "name": name,
+            "sql": sql,
+            "prepare": prepare and DB_PREPARE,
+            "calls": 0,
+            "errors": 0,
+            "totalMs": 0.0,
+            "maxMs": 0.0,
+        }
+
+    def execute(self, cur, name, params=None):
+        statement = self._statements[name]
+        started = time.perf_counter()
         try:
-            # Standardiser le format de réponse
-            if not isinstance(payload, dict):
-                if payload is None:
-                    payload = {"data": None, "success": False, "error": "No data available"}
+            cur.execute(statement["sql"], params, prepare=statement["prepare"])
+        except Exception:
+            self.record(statement, time.perf_counter() - started, error=True)
+            raise
+        self.record(statement, time.perf_counter() - started)
+        return cur
+
+    async def execute_async(self, cur, name, params=None):
+        """execute() sur un curseur asynchrone (moteur asyncio, pool AsyncConnectionPool)."""
+        statement = self._statements[name]
+        started = time.perf_counter()
+        try:
+            await cur.execute(statement["sql"], params, prepare=statement["prepare"])
+        except Exception:
+            self.record(statement, time.perf_counter() - started, error=True)
+            raise
+        self.record(statement, time.perf_counter() - started)
+        return cur
+
+    def record(self, statement, elapsed, error=False):
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            statement["calls"] += 1
+            if error:
+                statement["errors"] += 1
+            statement["totalMs"] += elapsed_ms
+            statement["maxMs"] = max(statement["maxMs"], elapsed_ms)
+
+    def describe(self):
+        with self._lock:
+            out = []
+            for statement in self._statements.values():
+                info = {k: v for k, v in statement.items() if k != "sql"}
+                info["totalMs"] = round(statement["totalMs"], 2)
+                info["maxMs"] = round(statement["maxMs"], 2)
+                info["avgMs"] = round(statement["totalMs"] / statement["calls"], 2) if statement["calls"] else 0.0
+                out.append(info)
+            return sorted(out, key=lambda info: info["totalMs"], reverse=True)
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+
+
+STATEMENTS = StatementRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=STATEMENTS.reset_after_fork)
+
+# Les "select *" ne sont pas préparés: une colonne ajoutée (init_db, server.js) rendrait
+# le plan en cache invalide ("cached plan must not change result type")
+STATEMENTS.add("settings_row", "select * from tournament_settings where id = 1", prepare=False)
+STATEMENTS.add("candidates_all", "select * from candidates order by id desc", prepare=False)
+STATEMENTS.add("candidate_ids", "select id from candidates")
+STATEMENTS.add("candidate_exists", "select 1 from candidates where id = %(candidateId)s")
+STATEMENTS.add("candidate_brief", "select id, fullName from candidates where id = %(candidateId)s")
+STATEMENTS.add(
+    "public_candidates",
+    """
+    select c.id,
+           c.candidateCode,
+           c.fullName,
+           c.city,
+           c.country,
+           c.photoUrl,
+           c.quranLevel,
+           c.motivation,
+           c.createdAt,
+           coalesce(v.totalVotes, 0) as totalVotes
+    from candidates c
+    left join candidate_vote_totals v on c.id = v.candidateId
+    order by c.id asc
+    """,
+)
+STATEMENTS.add(
+    "public_results",
+    """
+    select c.id,
+           c.fullName,
+           c.city,
+           c.country,
+           c.photoUrl,
+           coalesce(v.totalVotes, 0) as totalVotes,
+           coalesce(s.averageScore, 0) as averageScore,
+           coalesce(s.passages, 0) as passages
+    from candidates c
+    left join candidate_vote_totals v on c.id = v.candidateId
+    left join (
+      select candidateId,
+             cast(avg(coalesce(themeChosenScore, 0) + coalesce(themeImposedScore, 0)) as numeric(10,2)) as averageScore,
+             count(*) as passages
+      from scores
+      group by candidateId
+    ) s on c.id = s.candidateId
+    order by coalesce(v.totalVotes, 0) desc, c.fullName asc
+    """,
+)
+STATEMENTS.add(
+    "public_qualified",
+    """
+    select c.id, coalesce(v.totalVotes, 0) as totalVotes
+    from candidates c
+    left join candidate_vote_totals v on c.id = v.candidateId
+    order by coalesce(v.totalVotes, 0) desc
+    limit 10
+    """,
+)
+STATEMENTS.add(
+    "votes_summary",
+    """
+    select c.id, c.fullName, coalesce(v.totalVotes, 0) as totalVotes
+    from candidates c
+    left join candidate_vote_totals v on c.id = v.candidateId
+    order by totalVotes desc, c.fullName asc
+    """,
+)
+STATEMENTS.add(
+    "scores_ranking",
+    """
+    select c.id, c.fullName,
+           cast(avg(coalesce(s.themeChosenScore, 0) + coalesce(s.themeImposedScore, 0)) as numeric(10,2))
+           as averageScore, count(s.id) as passages
+    from candidates c
+    left join scores s on c.id = s.candidateId
+    group by c.id, c.fullName
+    order by averageScore desc nulls last, passages desc, c.fullName asc
+    """,
+)
+STATEMENTS.add(
+    "contacts_recent",
+    """
+    select id, fullName, email, subject, message, ip, archived, createdAt
+    from contact_messages order by id desc limit 500
+    """,
+)
+STATEMENTS.add(
+    "audit_recent",
+    """
+    select id, action, payload, ip, createdAt
+    from admin_audit order by id desc limit 500
+    """,
+)
+STATEMENTS.add(
+    "scores_recent",
+    """
+    select s.id, s.candidateId, c.fullName, s.judgeName,
+           s.themeChosenScore, s.themeImposedScore, s.notes, s.createdAt
+    from scores s
+    left join candidates c on s.candidateId = c.id
+    order by s.id desc
+    limit 500
+    """,
+)
+STATEMENTS.add(
+    "audit_insert",
+    "insert into admin_audit (action, payload, ip) values (%(action)s, %(payload)s, %(ip)s)",
+)
+# Inscription en une requête: l'insert s'efface devant uniq_candidates_whatsapp, et dans
+# ce cas la ligne existante dit s'il s'agit du même candidat (même nom) ou d'un autre.
+STATEMENTS.add(
+    "candidate_insert",
+    """
+    with inserted as (
+      insert into candidates
+      (fullName, age, city, country, email, phone, whatsapp, photoUrl, quranLevel, motivation, status)
+      values (%(fullName)s, %(age)s, %(city)s, %(country)s, %(email)s, %(phone)s, %(whatsapp)s,
+              %(photoUrl)s, %(quranLevel)s, %(motivation)s, %(status)s)
+      on conflict (whatsapp) do nothing
+      returning id
+    )
+    select id, false from inserted
+    union all
+    select null, lower(c.fullName) = lower(%(fullName)s)
+    from candidates c
+    where c.whatsapp = %(whatsapp)s and not exists (select 1 from inserted)
+    """,
+)
+STATEMENTS.add(
+    "candidate_same_name",
+    "select lower(fullName) = lower(%(fullName)s) from candidates where whatsapp = %(whatsapp)s",
+)
+# Vote direct: réservation (candidat, ip, jour) et insertion en une requête
+STATEMENTS.add(
+    "vote_insert",
+    """
+    with claimed as (
+      insert into vote_dedup (candidateId, ip, day)
+      values (%(candidateId)s, %(ip)s, (now() at time zone 'UTC')::date)
+      on conflict do nothing
+      returning candidateId
+    )
+    insert into votes (candidateId, voterName, voterContact, ip)
+    select candidateId, %(voterName)s, %(voterContact)s, %(ip)s from claimed
+    returning id
+    """,
+)
+# Lot de votes bufferisés, copié dans la table temporaire vote_ingest
+STATEMENTS.add(
+    "vote_ingest",
+    """
+    with fresh as (
+      select distinct on (i.candidateId, i.ip) i.*
+      from vote_ingest i
+      join candidates c on c.id = i.candidateId
+      order by i.candidateId, i.ip, i.createdAt
+    ),
+    claimed as (
+      insert into vote_dedup (candidateId, ip, day)
+      select candidateId, ip, (createdAt at time zone 'UTC')::date from fresh
+      on conflict do nothing
+      returning candidateId, ip
+    )
+    insert into votes (ingestId, candidateId, voterName, voterContact, ip, createdAt)
+    select f.ingestId, f.candidateId, f.voterName, f.voterContact, f.ip, f.createdAt
+    from fresh f
+    join claimed c on c.candidateId = f.candidateId and c.ip = f.ip
+    on conflict (ingestId) do nothing
+    """,
+)
+
+
+# ==================== TABLEAU DE BORD ====================
+# Sections de GET /api/admin/dashboard: requête du registre, ou None pour les paramètres (SettingsCache)
+DASHBOARD_SECTIONS = {
+    "candidates": "candidates_all",
+    "votes": "votes_summary",
+    "ranking": "scores_ranking",
+    "settings": None,
+    "contacts": "contacts_recent",
+    "audit": "audit_recent",
+}
+_DASHBOARD_CACHE = {}
+_DASHBOARD_LOCK = threading.Lock()
+
+
+def run_pipeline(queries):
+    """Exécute plusieurs requêtes du registre en un seul aller-retour (mode pipeline de libpq).
+
+    queries: liste de (nom, params). Retourne la liste des lignes (dict) de chacune.
+    Sans support du pipeline (libpq < 14), les requêtes partent l'une après l'autre.
+    """
+    with get_conn() as conn:
+        # Lecture seule, en autocommit: ni BEGIN ni COMMIT, un seul Sync pour tout le lot
+        conn.autocommit = True
+        try:
+            cursors = [conn.cursor(row_factory=dict_row) for _ in queries]
+            with conn.pipeline() if psycopg.Pipeline.is_supported() else contextlib.nullcontext():
+                for cur, (name, params) in zip(cursors, queries):
+                    STATEMENTS.execute(cur, name, params)
+            return [cur.fetchall() for cur in cursors]
+        finally:
+            if not conn.closed:
+                conn.autocommit = False
+
+
+def dashboard_sections(names):
+    """Sections demandées du tableau de bord, chacune en cache DASHBOARD_CACHE_SECONDS.
+
+    Les sections absentes du cache sont lues ensemble par run_pipeline().
+    """
+    now = time.monotonic()
+    out = {}
+    missing = []
+    with _DASHBOARD_LOCK:
+        for name in names:
+            cached = _DASHBOARD_CACHE.get(name)
+            if cached is not None and now < cached[0]:
+                out[name] = cached[1]
+            elif DASHBOARD_SECTIONS[name] is not None:
+                missing.append(name)
+    if "settings" in names:
+        out["settings"] = SETTINGS.get()
+    if missing:
+        results = run_pipeline([(DASHBOARD_SECTIONS[name], None) for name in missing])
+        expires = time.monotonic() + DASHBOARD_CACHE_SECONDS
+        with _DASHBOARD_LOCK:
+            for name, rows in zip(missing, results):
+                out[name] = [_row_to_camel(r) for r in rows]
+                if DASHBOARD_CACHE_SECONDS > 0:
+                    _DASHBOARD_CACHE[name] = (expires, out[name])
+    return {name: out[name] for name in names}
+
+
+def clear_dashboard_cache():
+    with _DASHBOARD_LOCK:
+        _DASHBOARD_CACHE.clear()
+
+
+# ==================== LISTES ADMIN ====================
+PAGE_LIMIT_DEFAULT = 50
+PAGE_LIMIT_MAX = 500
+# Listes paginées par clé (id décroissant): requête, colonne id, filtres (paramètre -> colonne),
+# requête du registre et limite historiques quand aucun paramètre n'est donné
+ADMIN_LISTS = {
+    "candidates": {
+        "select": "select * from candidates",
+        "id": "id",
+        "filters": {"status": "status"},
+        "legacy": ("candidates_all", None),
+    },
+    "contacts": {
+        "select": "select id, fullName, email, subject, message, ip, archived, createdAt from contact_messages",
+        "id": "id",
+        "filters": {"archived": "archived"},
+        "legacy": ("contacts_recent", 500),
+    },
+    "audit": {
+        "select": "select id, action, payload, ip, createdAt from admin_audit",
+        "id": "id",
+        "filters": {"action": "action"},
+        "legacy": ("audit_recent", 500),
+    },
+    "scores": {
+        "select": """
+            select s.id, s.candidateId, c.fullName, s.judgeName,
+                   s.themeChosenScore, s.themeImposedScore, s.notes, s.createdAt
+            from scores s
+            left join candidates c on s.candidateId = c.id
+        """,
+        "id": "s.id",
+        "filters": {"judgeName": "s.judgeName"},
+        "legacy": ("scores_recent", 500),
+    },
+}
+
+
+# Exports complets (id croissant), écrits au fil de l'eau
+ADMIN_EXPORTS = {name: f"{spec['select']} order by {spec['id']}" for name, spec in ADMIN_LISTS.items()}
+ADMIN_EXPORTS["votes"] = "select id, candidateId, voterName, voterContact, ip, createdAt from votes order by id"
+
+
+def stream_rows(sql, params=None):
+    """Lignes d'une requête lues sur un curseur serveur, STREAM_FETCH_ROWS par FETCH.
+
+    Générateur: la connexion reste empruntée jusqu'à la dernière ligne ou jusqu'à close().
+    """
+    with get_conn() as conn:
+        with conn.cursor(name="admin_stream", row_factory=dict_row) as cur:
+            cur.itersize = STREAM_FETCH_ROWS
+            cur.execute(sql, params)
+            yield from cur
+
+
+def _query_value(query, name):
+    values = query.get(name)
+    return values[0].strip() if values else None
+
+
+def _filter_value(param, value):
+    if param == "status":
+        if value not in ALLOWED_STATUSES:
+            raise APIError("Statut invalide.", 400)
+        return value
+    if param == "archived":
+        if value not in ("0", "1"):
+            raise APIError("archived doit valoir 0 ou 1.", 400)
+        return int(value)
+    if len(value) > 200:
+        raise APIError(f"Filtre {param} trop long.", 400)
+    return value
+
+
+def _cursor_value(query, name):
+    value = _query_value(query, name)
+    if value is None or value == "":
+        return None
+    if not value.isdigit():
+        raise APIError(f"Curseur {name} invalide.", 400)
+    return int(value)
+
+
+def admin_list(name, query):
+    """Liste admin. Sans limit/after/before: liste complète comme avant (filtres possibles),
+    sous forme de générateur stream_rows quand elle n'a pas de limite historique.
+
+    Avec limit (1..PAGE_LIMIT_MAX), after=<id> (page suivante, ids plus anciens) ou
+    before=<id> (page précédente, ids plus récents): {"items", "pagination": {"limit",
+    "next", "prev"}}, next/prev étant les curseurs à repasser (None en bout de liste).
+    """
+    spec = ADMIN_LISTS[name]
+    id_column = spec["id"]
+    where, params = [], []
+    for param, column in spec["filters"].items():
+        value = _query_value(query, param)
+        if value:
+            where.append(f"{column} = %s")
+            params.append(_filter_value(param, value))
+    paged = any(key in query for key in ("limit", "after", "before"))
+    statement, legacy_limit = spec["legacy"]
+
+    if not paged:
+        sql = spec["select"]
+        if where:
+            sql += f" where {' and '.join(where)}"
+        sql += f" order by {id_column} desc"
+        if not legacy_limit:
+            return stream_rows(sql, params)
+        with get_conn() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                if not where:
+                    return STATEMENTS.execute(cur, statement).fetchall()
+                cur.execute(f"{sql} limit {legacy_limit}", params)
+                return cur.fetchall()
+
+    limit_text = _query_value(query, "limit")
+    if limit_text:
+        if not limit_text.isdigit():
+            raise APIError("limit invalide.", 400)
+        limit = min(max(int(limit_text), 1), PAGE_LIMIT_MAX)
+    else:
+        limit = PAGE_LIMIT_DEFAULT
+    after = _cursor_value(query, "after")
+    before = _cursor_value(query, "before")
+    if after is not None and before is not None:
+        raise APIError("after et before sont exclusifs.", 400)
+    if after is not None:
+        where.append(f"{id_column} < %s")
+        params.append(after)
+    if before is not None:
+        where.append(f"{id_column} > %s")
+        params.append(before)
+    # Page précédente: parcours croissant depuis le curseur, remis dans l'ordre ensuite
+    direction = "asc" if before is not None else "desc"
+    sql = spec["select"]
+    if where:
+        sql += f" where {' and '.join(where)}"
+    sql += f" order by {id_column} {direction} limit %s"
+    with get_conn() as conn:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(sql, params + [limit + 1])
+            rows = cur.fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if before is not None:
+        rows.reverse()
+        next_cursor = rows[-1]["id"] if rows else None
+        prev_cursor = rows[0]["id"] if rows and more else None
+    else:
+        next_cursor = rows[-1]["id"] if rows and more else None
+        prev_cursor = rows[0]["id"] if rows and after is not None else None
+    return {"items": rows, "pagination": {"limit": limit, "next": next_cursor, "prev": prev_cursor}}
+
+
+# ==================== ROUTAGE ====================
+class Router:
+    """Table de routage compilée: chemins exacts dans un dict, chemins paramétrés dans un trie.
+
+    Motifs: "/api/admin/candidates/<id>" capture un segment, "/media/<*name>" le reste
+    du chemin. Chaque route porte ses métadonnées (admin, db, body) et ses métriques.
+    prefetch: requête (nom dans STATEMENTS) que le moteur asyncio peut exécuter sur son
+    pool asynchrone avant d'appeler la route (voir Handler._public_rows).
+    """
+
+    def __init__(self):
+        self.routes = []
+        self._exact = {}
+        self._trie = self._node()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _node():
+        return {"static": {}, "param": None, "rest": None, "methods": {}}
+
+    def add(self, method, pattern, func, admin=False, db=False, body=None, fallback=False, cache=False, prefetch=None):
+        route = {
+            "method": method,
+            "pattern": pattern,
+            "handler": func.__name__,
+            "func": func,
+            "admin": admin,
+            "db": db,
+            "body": body,
+            "fallback": fallback,
+            "cache": cache,
+            "prefetch": prefetch,
+            "lastGood": None,
+            "calls": 0,
+            "errors": 0,
+            "totalMs": 0.0,
+            "maxMs": 0.0,
+        }
+        if "<" not in pattern:
+            self._exact.setdefault(pattern, {})[method] = route
+        else:
+            node = self._trie
+            for segment in pattern.strip("/").split("/"):
+                if segment.startswith("<*"):
+                    if node["rest"] is None:
+                        node["rest"] = (segment[2:-1], self._node())
+                    node = node["rest"][1]
+                    break
+                if segment.startswith("<"):
+                    if node["param"] is None:
+                        node["param"] = (segment[1:-1], self._node())
+                    node = node["param"][1]
                 else:
-                    payload = {"data": payload}
+                    node = node["static"].setdefault(segment, self._node())
+            node["methods"][method] = route
+        self.routes.append(route)
+        return route
+
+    def resolve(self, method, path):
+        """Retourne (route, paramètres, méthodes autorisées pour ce chemin)."""
+        methods = self._exact.get(path)
+        params = {}
+        if methods is None:
+            methods, params = self._match_trie(path)
+        if not methods:
+            return None, {}, []
+        return methods.get(method), params, sorted(methods)
+
+    def _match_trie(self, path):
+        segments = path.strip("/").split("/")
+        node = self._trie
+        params = {}
+        for index, segment in enumerate(segments):
+            child = node["static"].get(segment)
+            if child is not None:
+                node = child
+                continue
+            if node["param"] is not None and segment:
+                name, node = node["param"]
+                params[name] = segment
+                continue
+            if node["rest"] is not None:
+                name, node = node["rest"]
+                params[name] = "/".join(segments[index:])
+                return node["methods"], params
+            return None, {}
+        return node["methods"], params
+
+    def record(self, route, status, elapsed):
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            route["calls"] += 1
+            if status is None or status >= 500:
+                route["errors"] += 1
+            route["totalMs"] += elapsed_ms
+            route["maxMs"] = max(route["maxMs"], elapsed_ms)
+
+    def remember(self, route, payload):
+        """Garde la dernière réponse 200 d'une route "fallback", servie si la base tombe.
+
+        Une seule par route: ces routes ne lisent pas la query string (?ts=... du frontend)."""
+        with self._lock:
+            route["lastGood"] = (payload, time.time())
+
+    def last_good(self, route):
+        with self._lock:
+            return route["lastGood"]
+
+    def describe(self):
+        with self._lock:
+            out = []
+            for route in self.routes:
+                info = {k: v for k, v in route.items() if k not in ("func", "lastGood")}
+                info["totalMs"] = round(route["totalMs"], 2)
+                info["maxMs"] = round(route["maxMs"], 2)
+                info["avgMs"] = round(route["totalMs"] / route["calls"], 2) if route["calls"] else 0.0
+                out.append(info)
+            return out
+
+
+class Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1: connexions persistantes (toutes les réponses ont un Content-Length)
+    protocol_version = "HTTP/1.1"
+    # Timeout par connexion (lecture de la requête et écriture de la réponse)
+    timeout = HTTP_SOCKET_TIMEOUT or None
+    # En-têtes et corps partent en deux écritures: sans TCP_NODELAY, Nagle + ACK
+    # retardé du client ajoutent ~40 ms à chaque réponse en keep-alive
+    disable_nagle_algorithm = True
+
+    # État par connexion / par requête (voir handle() et parse_request())
+    _requests_on_connection = 0
+    _request_parsed = False
+    _body_pending = 0
+    _idle_wait = False
+    _hand_back = False
+    _connection_header_sent = False
+    # Route dont la réponse 200 est gardée comme secours (routes "fallback")
+    _fallback = None
+    # Lignes lues d'avance par le moteur asyncio pour une route "prefetch" (ou son erreur)
+    _prefetched = None
+    _cache_slot = None
+
+    def handle(self):
+        # PooledHTTPServer: la connexion peut revenir d'une attente hors du pool
+        requests_served = getattr(self.server, "requests_served", None)
+        self._requests_on_connection = requests_served(self.request) if requests_served else 0
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            if requests_served and not self._next_request_ready(self.server.keepalive_linger()):
+                # Requête suivante pas encore reçue: la connexion attend dans le sélecteur
+                # du serveur, ce thread retourne au pool
+                self._hand_back = True
+                return
+            # Entre deux requêtes: délai d'inactivité keep-alive
+            self._idle_wait = True
+            if HTTP_KEEPALIVE_TIMEOUT:
+                self.connection.settimeout(HTTP_KEEPALIVE_TIMEOUT)
+            self.handle_one_request()
+
+    def _next_request_ready(self, wait):
+        """Début de la requête suivante reçu dans les wait secondes?
+
+        Après un délai dépassé, rfile n'est plus lisible: la connexion est alors rendue
+        au serveur, qui la reprend avec un nouveau handler.
+        """
+        self.connection.settimeout(wait)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def parse_request(self):
+        self._idle_wait = False
+        if self.connection is not None:
+            self.connection.settimeout(self.timeout)
+        self._requests_on_connection += 1
+        self._connection_header_sent = False
+        self._request_parsed = False
+        self._body_pending = 0
+        if not super().parse_request():
+            return False
+        self._request_parsed = True
+        if self.headers.get("Transfer-Encoding"):
+            # Corps "chunked" non supporté: impossible de retrouver la requête suivante
+            self.close_connection = True
+        try:
+            self._body_pending = max(0, int(self.headers.get("Content-Length", 0) or 0))
+        except ValueError:
+            self.close_connection = True
+        return True
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == "connection":
+            self._connection_header_sent = True
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        if self._body_pending and not self.close_connection:
+            # Réponse envoyée sans lire le corps (401, 413...): le consommer ou fermer
+            if self._body_pending <= KEEPALIVE_DRAIN_BYTES:
+                self.rfile.read(self._body_pending)
+                self._body_pending = 0
+            else:
+                self.close_connection = True
+        if not self.close_connection and self._requests_on_connection >= HTTP_KEEPALIVE_MAX_REQUESTS:
+            self.close_connection = True
+        if self.request_version != "HTTP/0.9" and not self._connection_header_sent:
+            if self.close_connection:
+                self.send_header("Connection", "close")
+            else:
+                self.send_header(
+                    "Keep-Alive",
+                    f"timeout={int(HTTP_KEEPALIVE_TIMEOUT)}, max={HTTP_KEEPALIVE_MAX_REQUESTS - self._requests_on_connection}",
+                )
+        super().end_headers()
+
+    def send_error(self, code, message=None, explain=None):
+        # Erreurs de parsing: comportement standard (Connection: close)
+        if not self._request_parsed:
+            return super().send_error(code, message, explain)
+        try:
+            short, long = self.responses[code]
+        except KeyError:
+            short, long = "???", "???"
+        message = message or short
+        explain = explain or long
+        self.log_error("code %d, message %s", code, message)
+        self.send_response(code, message)
+        self._set_security_headers()
+        body = b""
+        if code >= 200 and code not in (204, 205, 304):
+            content = self.error_message_format % {
+                "code": code,
+                "message": html.escape(message, quote=False),
+                "explain": html.escape(explain, quote=False),
+            }
+            body = content.encode("UTF-8", "replace")
+            self.send_header("Content-Type", self.error_content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD" and body:
+            self.wfile.write(body)
+
+    def handle_expect_100(self):
+        # Moteur asyncio: le corps est déjà lu, "100 Continue" a été envoyé par la boucle
+        if self.connection is None:
+            return True
+        return super().handle_expect_100()
 
-            # Ajouter métadonnées standard si absentes
-            if "success" not in payload and "error" not in payload:
-                payload["success"] = status < 400
+    def log_error(self, format, *args):
+        # Fermeture d'une connexion keep-alive inactive: pas une erreur
+        if self._idle_wait and format.startswith("Request timed out"):
+            return
+        super().log_error(format, *args)
 
-            if status >= 400 and "error" not in payload:
-                payload["error"] = "Une erreur est survenue"
+    def _set_security_headers(self):
+        for name, value in security_headers(self.headers):
+            self.send_header(name, value)
 
-            data = json.dumps(payload, default=json_default).encode("utf-8")
+    def _send_json(self, payload, status=200, headers=None):
+        """Envoie une réponse JSON avec format standardisé et gestion d'erreurs robuste"""
+        if self._fallback is not None and status == 200:
+            ROUTER.remember(self._fallback, payload)
+        try:
+            payload = json_envelope(payload, status)
+            data = encode_response_json(payload)
+            if self._cache_slot is not None and status == 200 and not headers:
+                key, version = self._cache_slot
+                self._cache_slot = None
+                return self._send_cached(RESPONSE_CACHE.put(key, version, data))
+            vary = compressible("application/json", len(data))
+            encoding = accepted_encoding(self.headers.get("Accept-Encoding")) if vary else None
+            if encoding:
+                data = compress_bytes(data, encoding)
             self.send_response(status)
             self._set_security_headers()
             self.send_header("Content-Type", "application/json; charset=utf-8")
             self.send_header("Cache-Control", "no-store, no-cache, must-revalidate")
             self.send_header("Pragma", "no-cache")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self._send_encoding_headers(vary, encoding)
             self.send_header("Content-Length", str(len(data)))
             self.end_headers()
             self.wfile.write(data)
         except Exception as e:
             logger.exception("Erreur envoi JSON")
+            # Réponse possiblement partielle: ne pas réutiliser la connexion
+            self.close_connection = True
             try:
                 fallback = json.dumps({"error": "Erreur serveur interne", "success": False}).encode("utf-8")
                 self.send_response(500)
@@ -394,17 +2009,135 @@ class Handler(BaseHTTPRequestHandler):
             except:
                 logger.critical("Impossible d'envoyer réponse erreur")
 
-    def _get_json(self):
-        length = int(self.headers.get("Content-Length", 0))
-        if length > MAX_JSON_BYTES:
-            self._send_json({"message": "Requête trop volumineuse."}, 413)
-            return None
-        raw = self.rfile.read(length) if length else b"{}"
-        try:
-            return json.loads(raw.decode("utf-8") or "{}")
-        except json.JSONDecodeError:
-            return {}
-
+    def _send_json_stream(self, chunks):
+        """Envoie une réponse JSON produite par morceaux (iter_json_list).
+
+        Les deux premiers morceaux sont lus avant les en-têtes: une erreur de requête
+        donne encore une réponse d'erreur normale, et une réponse d'un seul morceau part
+        avec Content-Length. Sinon Transfer-Encoding: chunked (HTTP/1.1), ou fin de
+        réponse à la fermeture de la connexion (HTTP/1.0).
+        """
+        first = next(chunks, b"")
+        second = next(chunks, None)
+        vary = second is not None or compressible("application/json", len(first))
+        encoding = accepted_encoding(self.headers.get("Accept-Encoding")) if vary else None
+        self.send_response(200)
+        self._set_security_headers()
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Cache-Control", "no-store, no-cache, must-revalidate")
+        self.send_header("Pragma", "no-cache")
+        self._send_encoding_headers(vary, encoding)
+        if second is None:
+            if encoding:
+                first = compress_bytes(first, encoding)
+            self.send_header("Content-Length", str(len(first)))
+            self.end_headers()
+            self.wfile.write(first)
+            return
+        chunked = self.request_version >= "HTTP/1.1"
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.close_connection = True
+        self.end_headers()
+        compress, finish = stream_compressor(encoding) if encoding else (None, None)
+
+        def emit(data):
+            if data:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data) if chunked else data)
+
+        def write(chunk):
+            emit(compress(chunk) if compress else chunk)
+
+        try:
+            write(first)
+            write(second)
+            for chunk in chunks:
+                write(chunk)
+            if finish:
+                emit(finish())
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except (ConnectionError, TimeoutError, FutureTimeout) as error:
+            logger.info(f"Client déconnecté pendant {self.path}: {error!r}")
+            self.close_connection = True
+        except Exception:
+            # En-têtes déjà envoyés: plus de réponse d'erreur possible, couper la connexion
+            logger.exception(f"Réponse JSON interrompue: {self.path}")
+            self.close_connection = True
+        finally:
+            chunks.close()
+
+    def _serve_cached(self, route):
+        """Route publique: répond depuis RESPONSE_CACHE (200 ou 304) et retourne True, ou
+        prépare la mise en cache de la réponse que la route va calculer.
+
+        Clé: le motif de la route seul. Les routes "cache" ne lisent pas la query string,
+        et le frontend ajoute ?ts=<Date.now()> à chaque appel: la prendre en compte
+        ferait manquer presque toutes les requêtes."""
+        version = DATA_VERSION.current()
+        if version is None:
+            return False
+        key = route["pattern"]
+        entry = RESPONSE_CACHE.get(key, version)
+        if entry is None:
+            self._cache_slot = (key, version)
+            return False
+        self._send_cached(entry)
+        return True
+
+    def _send_cached(self, entry):
+        body, etag = entry["body"], entry["etag"]
+        vary = compressible("application/json", len(body))
+        encoding = accepted_encoding(self.headers.get("Accept-Encoding")) if vary else None
+        if encoding:
+            # Compressé une fois par entrée; ETag fort distinct par encodage
+            body = RESPONSE_CACHE.variant(entry, encoding)
+            etag = f'{etag[:-1]}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={PUBLIC_CACHE_MAX_AGE}, stale-while-revalidate={PUBLIC_CACHE_STALE}",
+        }
+        if vary:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            RESPONSE_CACHE.not_modified()
+            headers.pop("Content-Encoding", None)
+            self.send_response(304)
+            self._set_security_headers()
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self._set_security_headers()
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_encoding_headers(self, vary, encoding):
+        if vary:
+            self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+
+    def _get_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_JSON_BYTES:
+            self._send_json({"message": "Requête trop volumineuse."}, 413)
+            return None
+        raw = self.rfile.read(length) if length else b"{}"
+        self._body_pending = 0
+        try:
+            return json.loads(raw.decode("utf-8") or "{}")
+        except json.JSONDecodeError:
+            return {}
+
     def _get_admin_password_hash(self):
         if db_ready():
             try:
@@ -416,37 +2149,49 @@ class Handler(BaseHTTPRequestHandler):
                             return str(row[0])
             except Exception:
                 pass
-        if ADMIN_PASSWORD:
-            return hash_password(ADMIN_PASSWORD)
-        return ""
+        return default_admin_password_hash()
 
-    def _is_admin(self):
-        if not ADMIN_USERNAME:
-            return False
+    def _basic_credentials(self):
         auth = self.headers.get("Authorization", "")
         if not auth.startswith("Basic "):
-            return False
+            return None
         try:
             decoded = base64.b64decode(auth[6:]).decode("utf-8")
             username, password = decoded.split(":", 1)
         except Exception:
+            return None
+        return username, password
+
+    def _check_admin_credentials(self, username, password):
+        if not ADMIN_USERNAME or not isinstance(username, str) or not isinstance(password, str):
             return False
-        if not hmac.compare_digest(username, ADMIN_USERNAME):
+        if not hmac.compare_digest(username.encode("utf-8"), ADMIN_USERNAME.encode("utf-8")):
             return False
         admin_hash = self._get_admin_password_hash()
         if not admin_hash:
             return False
-        return check_password(password, admin_hash)
+        return run_cpu(check_password, password, admin_hash)
+
+    def _is_admin(self):
+        if not ADMIN_USERNAME:
+            return False
+        auth = self.headers.get("Authorization", "")
+        if auth.startswith("Bearer "):
+            return verify_admin_token(auth[7:].strip())
+        credentials = self._basic_credentials()
+        if not credentials:
+            return False
+        cache_key = admin_auth_cache_key(auth)
+        cached, generation = admin_auth_cache_lookup(cache_key)
+        if cached:
+            return True
+        if not self._check_admin_credentials(*credentials):
+            return False
+        admin_auth_cache_store(cache_key, generation)
+        return True
 
     def _is_https(self):
-        forwarded = self.headers.get("X-Forwarded-Proto", "")
-        if forwarded:
-            return forwarded.lower() == "https"
-        host = self.headers.get("Host", "")
-        # En développement local, considérer comme sécurisé
-        # En production, vérifier que c'est vraiment HTTPS
-        is_local = any(value in host for value in ["localhost", "127.0.0.1", "0.0.0.0"])
-        return is_local
+        return is_https_request(self.headers)
 
     def _require_admin(self):
         # Toujours exiger les credentials (on a des defaults maintenant)
@@ -460,65 +2205,64 @@ class Handler(BaseHTTPRequestHandler):
             return
         with get_conn() as conn:
             with conn.cursor() as cur:
-                cur.execute(
-                    "insert into admin_audit (action, payload, ip) values (%s, %s, %s)",
-                    (action, json.dumps(payload or {}), get_client_ip(self)),
+                STATEMENTS.execute(
+                    cur,
+                    "audit_insert",
+                    {"action": action, "payload": json.dumps(payload or {}), "ip": get_client_ip(self)},
                 )
             conn.commit()
+        # Toute écriture admin passe par ici: tableau de bord et réponses publiques de ce
+        # processus sont recalculés sans attendre la notification
+        clear_dashboard_cache()
+        DATA_VERSION.bump()
 
     def _serve_file(self, rel_path):
-        path = (PUBLIC_DIR / rel_path.lstrip("/")).resolve()
-        if PUBLIC_DIR not in path.parents and path != PUBLIC_DIR:
-            self.send_error(404)
-            return
-        if path.is_dir():
-            path = path / "index.html"
-        if not path.exists():
+        response = static_response(rel_path, self.headers)
+        if response is None:
             self.send_error(404)
             return
-
-        ext = path.suffix.lower()
-        content_types = {
-            ".html": "text/html; charset=utf-8",
-            ".css": "text/css; charset=utf-8",
-            ".js": "application/javascript; charset=utf-8",
-            ".svg": "image/svg+xml",
-            ".png": "image/png",
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-        }
-        content = path.read_bytes()
-        self.send_response(200)
+        status, headers, body, entry = response
+        self.send_response(status)
         self._set_security_headers()
-        self.send_header("Content-Type", content_types.get(ext, "application/octet-stream"))
-        if ext in {".css", ".js", ".svg", ".png", ".jpg", ".jpeg"}:
-            self.send_header("Cache-Control", "public, max-age=86400")
-        elif ext == ".html":
-            self.send_header("Cache-Control", "no-cache")
-        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers:
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(content)
+        if status != 200:
+            return
+        if body is not None:
+            self.wfile.write(body)
+        else:
+            self._send_file_body(entry["path"], 0, entry["size"])
+
+    def _send_file_body(self, path, offset, length):
+        with open(path, "rb") as handle:
+            if self.connection is not None:
+                # socket.sendfile: os.sendfile (noyau -> socket) quand la plateforme le permet
+                self.connection.sendfile(handle, offset, length)
+                return
+            # Moteur asyncio (pas de socket): morceaux de MEDIA_CHUNK_BYTES au plus
+            handle.seek(offset)
+            while length > 0:
+                data = handle.read(min(MEDIA_CHUNK_BYTES, length))
+                if not data:
+                    break
+                self.wfile.write(data)
+                length -= len(data)
 
     def _quiz_media_root(self):
-        return Path(QUIZ_2025_MEDIA_DIR).resolve()
+        return quiz_media_root()
 
     def _quiz_media_meta_path(self):
         return self._quiz_media_root() / QUIZ_2025_META_FILE
 
     def _load_quiz_media_meta(self):
-        path = self._quiz_media_meta_path()
-        if not path.exists() or not path.is_file():
-            return {}
-        try:
-            raw = json.loads(path.read_text(encoding="utf-8"))
-            return raw if isinstance(raw, dict) else {}
-        except Exception:
-            return {}
+        return load_quiz_media_meta(self._quiz_media_root())
 
     def _save_quiz_media_meta(self, meta):
         path = self._quiz_media_meta_path()
         try:
             path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+            MEDIA_CATALOG.invalidate()
             return True
         except Exception:
             return False
@@ -530,41 +2274,10 @@ class Handler(BaseHTTPRequestHandler):
             "downloads": int(stats.get("downloads", 0)),
         }
 
-    def _list_quiz_media(self, include_hidden=False):
-        root = self._quiz_media_root()
-        if not root.exists() or not root.is_dir():
-            return []
-        meta = self._load_quiz_media_meta()
-        items = []
-        for file in sorted(root.iterdir(), key=lambda x: x.name.lower()):
-            if not file.is_file():
-                continue
-            ext = file.suffix.lower()
-            if ext not in QUIZ_2025_ALLOWED_EXT:
-                continue
-            file_meta = meta.get(file.name, {}) if isinstance(meta.get(file.name), dict) else {}
-            hidden = bool(file_meta.get("hidden", False))
-            if hidden and not include_hidden:
-                continue
-            media_type = "video" if QUIZ_2025_ALLOWED_EXT[ext].startswith("video/") else "image"
-            stats = self._media_event_stats(file.name)
-            items.append(
-                {
-                    "name": file.name,
-                    "url": f"/media/{quote(file.name)}",
-                    "type": media_type,
-                    "caption": str(file_meta.get("caption", "")),
-                    "order": int(file_meta.get("order", 0) or 0),
-                    "hidden": hidden,
-                    "createdAt": datetime.datetime.fromtimestamp(file.stat().st_mtime, tz=datetime.timezone.utc).isoformat(),
-                    "sizeBytes": int(file.stat().st_size),
-                    "views": stats["views"],
-                    "downloads": stats["downloads"],
-                }
-            )
-        return items
+    def _with_media_stats(self, items):
+        return [dict(item, **self._media_event_stats(item["name"])) for item in items]
 
-    def _apply_media_query(self, items, query, paginate=True):
+    def _apply_media_query(self, query, include_hidden=False, paginate=True):
         def _safe_int(raw, fallback):
             try:
                 return int(raw)
@@ -577,20 +2290,14 @@ class Handler(BaseHTTPRequestHandler):
         page = max(1, _safe_int(query.get("page", ["1"])[0] or 1, 1))
         page_size = min(80, max(1, _safe_int(query.get("pageSize", ["30"])[0] or 30, 30)))
 
-        filtered = items
-        if media_type in {"image", "video"}:
-            filtered = [x for x in filtered if x.get("type") == media_type]
+        # Listes pré-triées du catalogue: seule la recherche parcourt les éléments
+        filtered = MEDIA_CATALOG.items(
+            include_hidden,
+            media_type if media_type in MEDIA_TYPES else "all",
+            sort if sort in MEDIA_SORTS else "newest",
+        )
         if search:
-            filtered = [x for x in filtered if search in str(x.get("name", "")).lower() or search in str(x.get("caption", "")).lower()]
-
-        if sort == "name":
-            filtered = sorted(filtered, key=lambda x: str(x.get("name", "")).lower())
-        elif sort == "oldest":
-            filtered = sorted(filtered, key=lambda x: str(x.get("createdAt", "")))
-        else:
-            filtered = sorted(filtered, key=lambda x: str(x.get("createdAt", "")), reverse=True)
-
-        filtered = sorted(filtered, key=lambda x: int(x.get("order", 0)))
+            filtered = [x for x in filtered if search in x["name"].lower() or search in x["caption"].lower()]
 
         total = len(filtered)
         if paginate:
@@ -611,55 +2318,45 @@ class Handler(BaseHTTPRequestHandler):
         }
 
     def _serve_quiz_media(self, rel_path):
-        root = self._quiz_media_root()
-        if not root.exists() or not root.is_dir():
-            return self._send_json({"message": "Dossier média non configuré ou introuvable."}, 404)
-        requested = unquote(rel_path[len("/media/"):]).strip()
-        if not requested:
-            return self._send_json({"message": "Fichier média manquant."}, 400)
-        path = (root / requested).resolve()
-        if root not in path.parents or not path.exists() or not path.is_file():
-            return self._send_json({"message": "Média introuvable."}, 404)
-        ext = path.suffix.lower()
-        content_type = QUIZ_2025_ALLOWED_EXT.get(ext)
-        if not content_type:
-            return self._send_json({"message": "Type de média non supporté."}, 415)
-        content = path.read_bytes()
-        self.send_response(200)
-        self._set_security_headers()
-        self.send_header("Content-Type", content_type)
-        self.send_header("Cache-Control", "public, max-age=3600")
-        self.send_header("Content-Length", str(len(content)))
-        self.end_headers()
-        self.wfile.write(content)
+        try:
+            media = media_response(rel_path, self.headers)
+            stream = acquire_media_stream(media)
+        except APIError as error:
+            return self._send_json({"message": error.message}, error.status_code, headers=error.headers)
+        try:
+            self.send_response(media["status"])
+            self._set_security_headers()
+            for name, value in media["headers"]:
+                self.send_header(name, value)
+            self.end_headers()
+            if media["length"]:
+                self._send_file_body(media["path"], media["offset"], media["length"])
+        finally:
+            if stream:
+                MEDIA_STREAMS.release()
 
     def _record_media_event(self, name, event):
         if not name or event not in {"views", "downloads"}:
             return
-        current = MEDIA_EVENTS.setdefault(name, {"views": 0, "downloads": 0})
-        current[event] = int(current.get(event, 0)) + 1
+        with _STATE_LOCK:
+            current = MEDIA_EVENTS.setdefault(name, {"views": 0, "downloads": 0})
+            current[event] = int(current.get(event, 0)) + 1
 
     def _send_zip(self, filename, media_items):
-        mem = io.BytesIO()
-        root = self._quiz_media_root()
-        with zipfile.ZipFile(mem, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-            for item in media_items:
-                name = item.get("name")
-                if not name:
-                    continue
-                path = (root / name).resolve()
-                if root not in path.parents or not path.exists() or not path.is_file():
-                    continue
-                zf.write(path, arcname=name)
-        data = mem.getvalue()
-        self.send_response(200)
-        self._set_security_headers()
-        self.send_header("Content-Type", "application/zip")
-        self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
-        self.send_header("Cache-Control", "no-store")
-        self.send_header("Content-Length", str(len(data)))
-        self.end_headers()
-        self.wfile.write(data)
+        names = [item.get("name") for item in media_items if item.get("name")]
+        zip_path = run_cpu(build_media_zip, str(self._quiz_media_root()), names)
+        try:
+            with open(zip_path, "rb") as handle:
+                self.send_response(200)
+                self._set_security_headers()
+                self.send_header("Content-Type", "application/zip")
+                self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+                self.send_header("Cache-Control", "no-store")
+                self.send_header("Content-Length", str(os.fstat(handle.fileno()).st_size))
+                self.end_headers()
+                shutil.copyfileobj(handle, self.wfile, MEDIA_CHUNK_BYTES)
+        finally:
+            os.unlink(zip_path)
 
     def _require_db(self):
         if not db_ready():
@@ -671,7 +2368,9 @@ class Handler(BaseHTTPRequestHandler):
         length = int(self.headers.get("Content-Length", 0))
         if length > MAX_UPLOAD_BYTES:
             return b""
-        return self.rfile.read(length) if length else b""
+        body = self.rfile.read(length) if length else b""
+        self._body_pending = 0
+        return body
 
     def _parse_multipart(self):
         content_type = self.headers.get("Content-Type", "")
@@ -703,12 +2402,21 @@ class Handler(BaseHTTPRequestHandler):
         """Gérer les requêtes OPTIONS pour CORS preflight"""
         self.send_response(200)
         self._set_security_headers()
+        self.send_header("Content-Length", "0")
         self.end_headers()
 
     def _handle_api_error(self, error):
         """Gère une erreur API et envoie la réponse appropriée"""
         if isinstance(error, APIError):
-            self._send_json({"error": error.message, **error.details}, error.status_code)
+            self._send_json({"error": error.message, **error.details}, error.status_code, headers=error.headers)
+        elif isinstance(error, PoolTimeout):
+            # Aucune connexion disponible dans le délai du pool: échec rapide et explicite
+            logger.warning("Pool DB: %s", error)
+            self._send_json(
+                {"error": "Base de données momentanément indisponible. Réessayez dans quelques secondes."},
+                503,
+                headers={"Retry-After": str(DB_RETRY_AFTER)},
+            )
         else:
             error_msg = str(error)
             logger.exception("Erreur API: %s", error_msg)
@@ -723,855 +2431,673 @@ class Handler(BaseHTTPRequestHandler):
                 self._send_json({"error": "Erreur serveur interne"}, 500)
 
     def do_GET(self):
-        try:
-            parsed = urlparse(self.path)
-            path = parsed.path
-            query = parse_qs(parsed.query)
+        self._dispatch()
 
-            if path == "/":
-                return self._serve_file("index.html")
+    def do_POST(self):
+        self._dispatch()
 
-            if path == "/api/public-media":
-                items = self._list_quiz_media()
-                result = self._apply_media_query(items, query)
-                return self._send_json(
-                    {
-                        "items": result["items"],
-                        "pagination": result["pagination"],
-                        "filters": result["filters"],
-                        "configured": bool(items) or self._quiz_media_root().exists(),
-                    }
-                )
+    def do_PUT(self):
+        self._dispatch()
 
-            if path == "/api/public-media/download-all":
-                items = self._list_quiz_media()
-                result = self._apply_media_query(items, query, paginate=False)
-                for item in result["items"]:
-                    self._record_media_event(item.get("name", ""), "downloads")
-                return self._send_zip("quiz-islamique-2025.zip", result["items"])
-
-            if path == "/api/public-media/stats":
-                items = self._list_quiz_media(include_hidden=True)
-                total_views = sum(int(item.get("views", 0)) for item in items)
-                total_downloads = sum(int(item.get("downloads", 0)) for item in items)
-                return self._send_json(
-                    {
-                        "totalMedia": len(items),
-                        "totalViews": total_views,
-                        "totalDownloads": total_downloads,
-                    }
-                )
+    def do_DELETE(self):
+        self._dispatch()
 
-            if path == "/api/admin/media":
-                if not self._require_admin():
-                    return
-                items = self._list_quiz_media(include_hidden=True)
-                result = self._apply_media_query(items, query)
+    def send_response(self, code, message=None):
+        self._response_status = code
+        super().send_response(code, message)
+
+    def _dispatch(self):
+        parsed = urlparse(self.path)
+        path = parsed.path
+        route, params, allowed = ROUTER.resolve(self.command, path)
+        if route is None:
+            if allowed:
                 return self._send_json(
-                    {
-                        "items": result["items"],
-                        "pagination": result["pagination"],
-                        "filters": result["filters"],
-                    }
+                    {"message": "Méthode non autorisée."},
+                    405,
+                    headers={"Allow": ", ".join(allowed)},
                 )
+            if self.command == "GET" and not path.startswith("/api/"):
+                return self._serve_file(path)
+            return self._send_json({"message": "Not found"}, 404)
 
-            if path.startswith("/media/"):
-                return self._serve_quiz_media(path)
-
-            if path.startswith("/api/"):
-                if not self._require_db():
+        self._response_status = None
+        self._fallback = route if route["fallback"] else None
+        started = time.perf_counter()
+        try:
+            if route["admin"] and not self._require_admin():
+                return
+            if route["db"] and not self._require_db():
+                return
+            if route["cache"] and self._serve_cached(route):
+                return
+            payload = None
+            if route["body"] == "json":
+                payload = self._get_json()
+                if payload is None:
                     return
+            req = {"path": path, "query": parse_qs(parsed.query), "params": params, "payload": payload}
+            route["func"](self, req)
+        except Exception as error:
+            self._cache_slot = None
+            if not self._send_last_good(error):
+                self._handle_api_error(error)
+        finally:
+            self._fallback = None
+            self._cache_slot = None
+            ROUTER.record(route, self._response_status, time.perf_counter() - started)
+
+    def _send_last_good(self, error):
+        """Base indisponible: renvoie la dernière réponse connue de la route, marquée dégradée."""
+        if self._fallback is None or not isinstance(error, (DatabaseUnavailable, PoolTimeout)):
+            return False
+        cached = ROUTER.last_good(self._fallback)
+        if cached is None:
+            return False
+        payload, stored_at = cached
+        self._fallback = None
+        logger.warning(f"Réponse dégradée pour {self.path}: {error}")
+        self._send_json(
+            payload,
+            200,
+            headers={
+                "X-Degraded": "database-unavailable",
+                "X-Data-Timestamp": email_utils.formatdate(stored_at, usegmt=True),
+            },
+        )
+        return True
 
-                if path == "/api/health":
-                    health = {"status": "ok", "database": "unknown"}
-                    try:
-                        with get_conn() as conn:
-                            with conn.cursor() as cur:
-                                cur.execute("select 1")
-                        health["database"] = "ok"
-                    except Exception as e:
-                        health["database"] = "error"
-                        health["databaseError"] = str(e)[:100]
-                    return self._send_json(health)
-
-                if path == "/api/public-candidates":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select c.id,
-                                       c.candidateCode,
-                                       c.fullName,
-                                       c.city,
-                                       c.country,
-                                       c.photoUrl,
-                                       c.quranLevel,
-                                       c.motivation,
-                                       c.createdAt,
-                                       coalesce(v.totalVotes, 0) as totalVotes
-                                from candidates c
-                                left join (
-                                  select candidateId, count(*) as totalVotes
-                                  from votes
-                                  group by candidateId
-                                ) v on c.id = v.candidateId
-                                order by c.id asc
-                                """
-                            )
-                            rows = cur.fetchall()
-                    return self._send_json(rows)
-
-                if path == "/api/public-settings":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select votingEnabled, registrationLocked, competitionClosed, announcementText, scheduleJson
-                                from tournament_settings
-                                where id = 1
-                                """
-                            )
-                            row = cur.fetchone()
-                    return self._send_json(
-                        row
-                        or {
-                            "votingEnabled": 0,
-                            "registrationLocked": 0,
-                            "competitionClosed": 0,
-                            "announcementText": "",
-                            "scheduleJson": "[]",
-                        }
-                    )
+    def _route_index(self, req):
+        return self._serve_file("index.html")
 
-                if path == "/api/public-results":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select c.id,
-                                       c.fullName,
-                                       c.city,
-                                       c.country,
-                                       c.photoUrl,
-                                       coalesce(v.totalVotes, 0) as totalVotes,
-                                       coalesce(s.averageScore, 0) as averageScore,
-                                       coalesce(s.passages, 0) as passages
-                                from candidates c
-                                left join (
-                                  select candidateId, count(*) as totalVotes
-                                  from votes
-                                  group by candidateId
-                                ) v on c.id = v.candidateId
-                                left join (
-                                  select candidateId,
-                                         cast(avg(coalesce(themeChosenScore, 0) + coalesce(themeImposedScore, 0)) as numeric(10,2)) as averageScore,
-                                         count(*) as passages
-                                  from scores
-                                  group by candidateId
-                                ) s on c.id = s.candidateId
-                                order by coalesce(v.totalVotes, 0) desc, c.fullName asc
-                                """
-                            )
-                            rows = cur.fetchall()
-                    countries = {str(r.get("country", "")).strip().lower() for r in rows if r.get("country")}
-                    cities = {str(r.get("city", "")).strip().lower() for r in rows if r.get("city")}
-                    total_votes = sum(int(r.get("totalVotes") or 0) for r in rows)
-                    return self._send_json(
-                        {
-                            "candidates": rows,
-                            "stats": {
-                                "totalCandidates": len(rows),
-                                "totalVotes": total_votes,
-                                "countries": len(countries),
-                                "cities": len(cities),
-                            },
-                        }
-                    )
+    def _route_admin_routes(self, req):
+        return self._send_json({"routes": ROUTER.describe()})
 
-                if path == "/api/public-results/qualified":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select c.id, coalesce(v.totalVotes, 0) as totalVotes
-                                from candidates c
-                                left join (
-                                  select candidateId, count(*) as totalVotes
-                                  from votes
-                                  group by candidateId
-                                ) v on c.id = v.candidateId
-                                order by coalesce(v.totalVotes, 0) desc
-                                limit 10
-                                """
-                            )
-                            qualified = cur.fetchall()
-                    qualified_ids = [int(r.get("id", 0)) for r in qualified]
-                    return self._send_json({"qualifiedIds": qualified_ids})
-
-                if not self._require_admin():
-                    return
+    def _route_admin_statements(self, req):
+        return self._send_json({"statements": STATEMENTS.describe(), "prepare": DB_PREPARE})
 
-                if path == "/api/admin/dashboard":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute("select * from candidates order by id desc")
-                            candidates = cur.fetchall()
-                            cur.execute(
-                                """
-                                select c.id, c.fullName, count(v.id) as totalVotes
-                                from candidates c
-                                left join votes v on c.id = v.candidateId
-                                group by c.id, c.fullName
-                                order by totalVotes desc, c.fullName asc
-                                """
-                            )
-                            votes = cur.fetchall()
-                            cur.execute(
-                                """
-                                select c.id, c.fullName,
-                                       cast(avg(coalesce(s.themeChosenScore, 0) + coalesce(s.themeImposedScore, 0)) as numeric(10,2))
-                                       as averageScore, count(s.id) as passages
-                                from candidates c
-                                left join scores s on c.id = s.candidateId
-                                group by c.id, c.fullName
-                                order by averageScore desc nulls last, passages desc, c.fullName asc
-                                """
-                            )
-                            ranking = cur.fetchall()
-                            cur.execute("select * from tournament_settings where id = 1")
-                            settings = cur.fetchone() or {}
-                            cur.execute(
-                                """
-                                select id, fullName, email, subject, message, ip, archived, createdAt
-                                from contact_messages order by id desc limit 500
-                                """
-                            )
-                            contacts = cur.fetchall()
-                            cur.execute(
-                                """
-                                select id, action, payload, ip, createdAt
-                                from admin_audit order by id desc limit 500
-                                """
-                            )
-                            audit = cur.fetchall()
-                    return self._send_json({
-                        "candidates": [_row_to_camel(r) for r in candidates],
-                        "votes": [_row_to_camel(r) for r in votes],
-                        "ranking": [_row_to_camel(r) for r in ranking],
-                        "settings": _row_to_camel(settings),
-                        "contacts": [_row_to_camel(r) for r in contacts],
-                        "audit": [_row_to_camel(r) for r in audit],
-                    })
-
-                if path == "/api/candidates":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute("select * from candidates order by id desc")
-                            rows = cur.fetchall()
-                    return self._send_json(rows)
-
-                if path == "/api/votes/summary":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select c.id, c.fullName, count(v.id) as totalVotes
-                                from candidates c
-                                left join votes v on c.id = v.candidateId
-                                group by c.id, c.fullName
-                                order by totalVotes desc, c.fullName asc
-                                """
-                            )
-                            rows = cur.fetchall()
-                    return self._send_json(rows)
-
-                if path == "/api/scores/ranking":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select c.id,
-                                       c.fullName,
-                                       cast(avg(coalesce(s.themeChosenScore, 0) + coalesce(s.themeImposedScore, 0)) as numeric(10,2))
-                                       as averageScore,
-                                       count(s.id) as passages
-                                from candidates c
-                                left join scores s on c.id = s.candidateId
-                                group by c.id, c.fullName
-                                order by averageScore desc nulls last, passages desc, c.fullName asc
-                                """
-                            )
-                            rows = cur.fetchall()
-                    return self._send_json(rows)
-
-                if path == "/api/tournament-settings":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute("select * from tournament_settings where id = 1")
-                            row = cur.fetchone()
-                    return self._send_json(_row_to_camel(row or {}))
-
-                if path == "/api/contact-messages":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select id, fullName, email, subject, message, ip, archived, createdAt
-                                from contact_messages
-                                order by id desc
-                                limit 500
-                                """
-                            )
-                            rows = cur.fetchall()
-                    return self._send_json(rows)
-
-                if path == "/api/admin-audit":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select id, action, payload, ip, createdAt
-                                from admin_audit
-                                order by id desc
-                                limit 500
-                                """
-                            )
-                            rows = cur.fetchall()
-                    return self._send_json(rows)
-
-                if path.startswith("/api/admin/candidates/"):
-                    candidate_id = path.rsplit("/", 1)[-1]
-                    if candidate_id.isdigit():
-                        with get_conn() as conn:
-                            with conn.cursor(row_factory=dict_row) as cur:
-                                cur.execute("select id, fullName from candidates where id = %s", (candidate_id,))
-                                candidate = cur.fetchone()
-                        if candidate:
-                            return self._send_json(candidate)
-                        return self._send_json({"message": "Candidat introuvable."}, 404)
+    def _route_media(self, req):
+        return self._serve_quiz_media(req["path"])
 
-                if path == "/api/admin/scores":
-                    with get_conn() as conn:
-                        with conn.cursor(row_factory=dict_row) as cur:
-                            cur.execute(
-                                """
-                                select s.id, s.candidateId, c.fullName, s.judgeName, 
-                                       s.themeChosenScore, s.themeImposedScore, s.notes, s.createdAt
-                                from scores s
-                                left join candidates c on s.candidateId = c.id
-                                order by s.id desc
-                                limit 500
-                                """
-                            )
-                            rows = cur.fetchall()
-                    return self._send_json([_row_to_camel(r) for r in rows])
-
-                return self._send_json({"message": "Not found"}, 404)
-
-            return self._serve_file(path)
-        except APIError as error:
-            self._handle_api_error(error)
-        except Exception as error:
-            self._handle_api_error(error)
+    def _route_health(self, req):
+        return self._send_json(health_report(probe_database()))
 
-    def do_POST(self):
-        parsed = urlparse(self.path)
-        path = parsed.path
+    def _route_public_media(self, req):
+        result = self._apply_media_query(req["query"])
+        return self._send_json(
+            {
+                "items": self._with_media_stats(result["items"]),
+                "pagination": result["pagination"],
+                "filters": result["filters"],
+                "configured": MEDIA_CATALOG.snapshot()["configured"],
+            }
+        )
 
-        if path == "/api/public-media/events":
-            payload = self._get_json()
-            if payload is None:
-                return
-            name = str(payload.get("name", "")).strip()
-            event = str(payload.get("event", "")).strip().lower()
-            if event not in {"view", "download"} or not name:
-                return self._send_json({"message": "Événement invalide."}, 400)
-            self._record_media_event(name, "views" if event == "view" else "downloads")
-            return self._send_json({"message": "ok"}, 201)
-
-        if path == "/api/admin/change-password":
-            if not self._require_admin():
-                return
-            
-            p = self._get_json()
-            if p is None:
-                return
-            
-            current_password = p.get("currentPassword", "")
-            new_password = p.get("newPassword", "")
-            
-            if not current_password or not new_password:
-                return self._send_json({"message": "Mot de passe actuel et nouveau requis."}, 400)
-            
-            if len(new_password) < 8:
-                return self._send_json({"message": "Le mot de passe doit contenir au moins 8 caractères."}, 400)
-            
-            # Vérifier le mot de passe actuel (hash stocké)
-            current_hash = self._get_admin_password_hash()
-            if not current_hash or not check_password(current_password, current_hash):
-                return self._send_json({"message": "Mot de passe actuel incorrect."}, 401)
-
-            if not self._require_db():
-                return
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        insert into admin_config (key, value)
-                        values ('admin_password_hash', %s)
-                        on conflict (key) do update set value = excluded.value, updatedAt = now()
-                        """,
-                        (hash_password(new_password),),
-                    )
-                conn.commit()
-            
-            self._audit("admin_change_password", {})
-            return self._send_json({"message": "Mot de passe changé avec succès."})
+    def _route_public_media_download_all(self, req):
+        result = self._apply_media_query(req["query"], paginate=False)
+        for item in result["items"]:
+            self._record_media_event(item.get("name", ""), "downloads")
+        return self._send_zip("quiz-islamique-2025.zip", result["items"])
+
+    def _route_public_media_stats(self, req):
+        names = MEDIA_CATALOG.snapshot()["names"]
+        # Seuls les médias ayant reçu des événements sont parcourus
+        with _STATE_LOCK:
+            stats = [dict(MEDIA_EVENTS[name]) for name in MEDIA_EVENTS if name in names]
+        return self._send_json(
+            {
+                "totalMedia": len(names),
+                "totalViews": sum(int(s.get("views", 0)) for s in stats),
+                "totalDownloads": sum(int(s.get("downloads", 0)) for s in stats),
+            }
+        )
 
-        if path == "/api/admin/upload-photo":
-            if not self._require_admin():
-                return
-            if not cloudinary_ready():
-                return self._send_json({"message": "Cloudinary non configuré."}, 500)
-
-            form = self._parse_multipart()
-            if form and form.get("__too_large__"):
-                return self._send_json({"message": "Fichier trop volumineux (max 3 Mo)."}, 413)
-            if not form or "photo" not in form:
-                return self._send_json({"message": "Fichier photo requis."}, 400)
-            photo_item = form["photo"]
-            if not photo_item["filename"]:
-                return self._send_json({"message": "Nom de fichier invalide."}, 400)
-
-            raw = photo_item["data"]
-            if raw and len(raw) > MAX_UPLOAD_BYTES:
-                return self._send_json({"message": "Fichier trop volumineux (max 3 Mo)."}, 413)
-            if photo_item["content_type"] not in {"image/jpeg", "image/png", "image/webp"}:
-                return self._send_json({"message": "Format de fichier non supporté."}, 400)
-            ext = Path(photo_item["filename"]).suffix.lower().strip(".") or "jpg"
-            safe_ext = ext if ext in {"jpg", "jpeg", "png", "webp"} else "jpg"
-            public_id = f"{CLD_FOLDER}/{uuid.uuid4().hex}"
-
-            timestamp = int(time.time())
-            params = {
-                "folder": CLD_FOLDER,
-                "public_id": public_id.split("/")[-1],
-                "timestamp": timestamp,
+    def _route_admin_media(self, req):
+        result = self._apply_media_query(req["query"], include_hidden=True)
+        return self._send_json(
+            {
+                "items": self._with_media_stats(result["items"]),
+                "pagination": result["pagination"],
+                "filters": result["filters"],
             }
-            signature_base = "&".join(
-                f"{k}={params[k]}" for k in sorted(params)
-            ) + CLD_API_SECRET
-            signature = hashlib.sha1(signature_base.encode("utf-8")).hexdigest()
-
-            upload_res = requests.post(
-                f"https://api.cloudinary.com/v1_1/{CLD_CLOUD_NAME}/image/upload",
-                data={
-                    "api_key": CLD_API_KEY,
-                    "timestamp": timestamp,
-                    "folder": CLD_FOLDER,
-                    "public_id": params["public_id"],
-                    "signature": signature,
+        )
+
+    def _public_rows(self, name):
+        """Lignes de la requête publique name: celles lues par le moteur asyncio sur son
+        pool asynchrone s'il y en a, sinon lues ici sur le pool synchrone."""
+        prefetched, self._prefetched = self._prefetched, None
+        if isinstance(prefetched, Exception):
+            # Même traitement qu'une erreur du pool synchrone (réponse de secours, 503...)
+            raise prefetched
+        if prefetched is not None:
+            return prefetched
+        with get_conn() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                return STATEMENTS.execute(cur, name).fetchall()
+
+    def _route_public_candidates(self, req):
+        return self._send_json(self._public_rows("public_candidates"))
+
+    def _route_public_settings(self, req):
+        return self._send_json(SETTINGS.public())
+
+    def _route_public_results(self, req):
+        rows = self._public_rows("public_results")
+        countries = {str(r.get("country", "")).strip().lower() for r in rows if r.get("country")}
+        cities = {str(r.get("city", "")).strip().lower() for r in rows if r.get("city")}
+        total_votes = sum(int(r.get("totalVotes") or 0) for r in rows)
+        return self._send_json(
+            {
+                "candidates": rows,
+                "stats": {
+                    "totalCandidates": len(rows),
+                    "totalVotes": total_votes,
+                    "countries": len(countries),
+                    "cities": len(cities),
                 },
-                files={"file": (f"upload.{safe_ext}", raw, photo_item["content_type"] or "application/octet-stream")},
-                timeout=20,
-            )
-            if upload_res.status_code >= 300:
-                return self._send_json(
-                    {"message": "Erreur lors de l'upload photo.", "details": upload_res.text},
-                    500,
-                )
-            upload_json = upload_res.json()
-            return self._send_json({"photoUrl": upload_json.get("secure_url")})
+            }
+        )
 
-        payload = self._get_json()
-        if payload is None:
-            return
+    def _route_public_results_qualified(self, req):
+        qualified = self._public_rows("public_qualified")
+        qualified_ids = [int(r.get("id", 0)) for r in qualified]
+        return self._send_json({"qualifiedIds": qualified_ids})
+
+    def _route_admin_dashboard(self, req):
+        section = req["params"].get("section")
+        if section:
+            names = [section]
+        elif req["query"].get("sections"):
+            names = [n.strip() for n in ",".join(req["query"]["sections"]).split(",") if n.strip()]
+        else:
+            names = list(DASHBOARD_SECTIONS)
+        unknown = [n for n in names if n not in DASHBOARD_SECTIONS]
+        if unknown:
+            status = 404 if section else 400
+            return self._send_json({"message": f"Section inconnue: {', '.join(unknown)}."}, status)
+        return self._send_json(dashboard_sections(names))
+
+    def _route_candidates(self, req):
+        result = admin_list("candidates", req["query"])
+        if isinstance(result, (list, dict)):
+            return self._send_json(result)
+        return self._send_json_stream(iter_json_list(result))
+
+    def _route_admin_export(self, req):
+        name = req["params"]["name"]
+        if name not in ADMIN_EXPORTS:
+            return self._send_json({"message": "Export inconnu.", "exports": sorted(ADMIN_EXPORTS)}, 404)
+        transform = _row_to_camel if name in ("scores", "votes") else None
+        return self._send_json_stream(iter_json_list(stream_rows(ADMIN_EXPORTS[name]), transform))
+
+    def _route_votes_summary(self, req):
+        with get_conn() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                rows = STATEMENTS.execute(cur, "votes_summary").fetchall()
+        return self._send_json(rows)
 
-        if path == "/api/contact":
-            if not self._require_db():
-                return
-            if not check_rate_limit(get_client_ip(self), "contact"):
-                return self._send_json({"message": "Trop de tentatives, réessayez plus tard."}, 429)
-            full_name = (payload.get("fullName") or "").strip()
-            email = (payload.get("email") or "").strip()
-            subject = (payload.get("subject") or "").strip()
-            message = (payload.get("message") or "").strip()
-            if not full_name or not email or not subject or not message:
-                return self._send_json({"message": "Tous les champs sont obligatoires."}, 400)
-            if not validate_lengths(
-                {
-                    "contactName": full_name,
-                    "contactEmail": email,
-                    "contactSubject": subject,
-                    "contactMessage": message,
-                }
-            ):
-                return self._send_json({"message": "Message trop long."}, 400)
-            if not validate_email(email):
-                return self._send_json({"message": "Email invalide."}, 400)
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        """
-                        insert into contact_messages (fullName, email, subject, message, ip)
-                        values (%s, %s, %s, %s, %s)
-                        """,
-                        (full_name, email, subject, message, get_client_ip(self)),
-                    )
-                conn.commit()
-            send_contact_email(full_name, email, subject, message)
-            return self._send_json({"message": "Message envoyé. Nous vous répondrons rapidement."}, 201)
+    def _route_scores_ranking(self, req):
+        with get_conn() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                rows = STATEMENTS.execute(cur, "scores_ranking").fetchall()
+        return self._send_json(rows)
 
-        if path == "/api/register":
-            if not self._require_db():
-                return
-            if not check_rate_limit(get_client_ip(self), "register"):
-                return self._send_json({"message": "Trop de tentatives, réessayez plus tard."}, 429)
-            if not payload.get("fullName") or not payload.get("whatsapp"):
-                return self._send_json({"message": "Nom complet et WhatsApp obligatoires."}, 400)
-            normalized = normalize_whatsapp(payload.get("whatsapp"))
-            if not normalized:
-                return self._send_json({"message": "Numéro WhatsApp invalide."}, 400)
-            if payload.get("email") and not validate_email(payload.get("email")):
-                return self._send_json({"message": "Email invalide."}, 400)
-            if payload.get("phone") and not validate_phone(payload.get("phone")):
-                return self._send_json({"message": "Téléphone invalide."}, 400)
-            if not validate_lengths(payload):
-                return self._send_json({"message": "Certains champs dépassent la taille maximale."}, 400)
-            if payload.get("quranLevel", "") not in ALLOWED_LEVELS:
-                return self._send_json({"message": "Niveau invalide."}, 400)
+    def _route_get_tournament_settings(self, req):
+        # Écran d'édition: relu en base (et le cache avec)
+        return self._send_json(SETTINGS.refresh())
 
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "select registrationLocked, competitionClosed from tournament_settings where id = 1"
-                    )
-                    locked = cur.fetchone()
-                    if locked and (int(locked[0]) == 1 or int(locked[1]) == 1):
-                        return self._send_json({"message": "Inscriptions fermées."}, 403)
-                    cur.execute(
-                        "select id from candidates where lower(fullName) = lower(%s) and whatsapp = %s",
-                        (payload.get("fullName"), normalized),
-                    )
-                    if cur.fetchone():
-                        return self._send_json({"message": "Utilisateur déjà enregistré."}, 409)
-                    cur.execute("select id from candidates where whatsapp = %s", (normalized,))
-                    if cur.fetchone():
-                        return self._send_json({"message": "WhatsApp déjà utilisé."}, 409)
-                    cur.execute(
-                        """
-                        insert into candidates
-                        (fullName, age, city, country, email, phone, whatsapp, photoUrl, quranLevel, motivation, status)
-                        values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        returning id
-                        """,
-                        (
-                            payload.get("fullName"),
-                            payload.get("age") or None,
-                            payload.get("city"),
-                            payload.get("country"),
-                            payload.get("email"),
-                            payload.get("phone"),
-                            normalized,
-                            payload.get("photoUrl"),
-                            payload.get("quranLevel"),
-                            payload.get("motivation"),
-                            payload.get("status") or "pending",
-                        ),
-                    )
-                    candidate_id = cur.fetchone()[0]
-                    cur.execute(
-                        "update candidates set candidateCode = %s where id = %s",
-                        (f"{CODE_PREFIX}-{str(candidate_id).zfill(3)}", candidate_id),
-                    )
-                conn.commit()
+    def _route_contact_messages(self, req):
+        return self._send_json(admin_list("contacts", req["query"]))
 
-            # Envoyer email à l'admin
-            send_registration_email(candidate_id, payload.get("fullName"), payload.get("email"), payload.get("whatsapp"), payload.get("phone"))
+    def _route_admin_audit(self, req):
+        return self._send_json(admin_list("audit", req["query"]))
 
-            # Envoyer email de confirmation au candidat
-            send_candidate_confirmation_email(candidate_id, payload.get("fullName"), payload.get("email"))
+    def _route_admin_candidate(self, req):
+        candidate_id = req["params"]["id"]
+        if not candidate_id.isdigit():
+            return self._send_json({"message": "Not found"}, 404)
+        with get_conn() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                candidate = STATEMENTS.execute(cur, "candidate_brief", {"candidateId": int(candidate_id)}).fetchone()
+        if candidate:
+            return self._send_json(candidate)
+        return self._send_json({"message": "Candidat introuvable."}, 404)
+
+    def _route_admin_scores(self, req):
+        result = admin_list("scores", req["query"])
+        if isinstance(result, dict):
+            result["items"] = [_row_to_camel(r) for r in result["items"]]
+            return self._send_json(result)
+        return self._send_json([_row_to_camel(r) for r in result])
+
+    def _route_media_event(self, req):
+        payload = req["payload"]
+        name = str(payload.get("name", "")).strip()
+        event = str(payload.get("event", "")).strip().lower()
+        if event not in {"view", "download"} or not name:
+            return self._send_json({"message": "Événement invalide."}, 400)
+        self._record_media_event(name, "views" if event == "view" else "downloads")
+        return self._send_json({"message": "ok"}, 201)
+
+    def _route_admin_login(self, req):
+        if not check_rate_limit(get_client_ip(self), "admin_login"):
+            return self._send_json({"message": "Trop de tentatives. Réessayez plus tard."}, 429)
+        credentials = self._basic_credentials()
+        if credentials is None:
+            p = self._get_json()
+            if p is None:
+                return
+            credentials = (p.get("username", ""), p.get("password", ""))
+        if not self._check_admin_credentials(*credentials):
+            return self._send_json({"message": "Identifiants invalides."}, 401)
+        token, expires_at = issue_admin_token(ADMIN_USERNAME)
+        try:
+            self._audit("admin_login", {})
+        except Exception as error:
+            logger.warning(f"Audit de connexion admin impossible: {error}")
+        return self._send_json({"token": token, "tokenType": "Bearer", "expiresAt": expires_at})
 
-            msg = (
-                "Assalamou alaykoum, je confirme mon inscription au Quiz Islamique 2026. "
-                f"Mon ID candidat est {candidate_id}."
-            )
-            redirect = f"https://wa.me/{ADMIN_WHATSAPP}?text={msg.replace(' ', '%20')}"
-            return self._send_json(
-                {
-                    "message": "Inscription enregistrée. Un email de confirmation vous a été envoyé.",
-                    "candidateId": candidate_id,
-                    "whatsappRedirect": redirect,
-                },
-                201,
-            )
+    def _route_change_password(self, req):
+        p = req["payload"]
+        current_password = p.get("currentPassword", "")
+        new_password = p.get("newPassword", "")
 
-        if path == "/api/votes":
-            if not self._require_db():
-                return
-            if not check_rate_limit(get_client_ip(self), "vote"):
-                return self._send_json({"message": "Trop de votes, réessayez plus tard."}, 429)
-            candidate_id = payload.get("candidateId")
-            if not candidate_id:
-                return self._send_json({"message": "Candidate ID requis."}, 400)
+        if not current_password or not new_password:
+            return self._send_json({"message": "Mot de passe actuel et nouveau requis."}, 400)
 
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "select votingEnabled, competitionClosed from tournament_settings where id = 1"
-                    )
-                    settings = cur.fetchone()
-                    if not settings or int(settings[0]) != 1 or int(settings[1]) == 1:
-                        return self._send_json({"message": "Votes fermés."}, 403)
-                    cur.execute("select id from candidates where id = %s", (candidate_id,))
-                    if not cur.fetchone():
-                        return self._send_json({"message": "Candidat introuvable."}, 404)
-                    cur.execute(
-                        """
-                        select id from votes
-                        where candidateId = %s and ip = %s and createdAt > now() - interval '24 hours'
-                        """,
-                        (candidate_id, get_client_ip(self)),
-                    )
-                    if cur.fetchone():
-                        return self._send_json({"message": "Vote déjà enregistré pour ce candidat."}, 429)
-                    cur.execute(
-                        "insert into votes (candidateId, voterName, voterContact, ip) values (%s, %s, %s, %s)",
-                        (candidate_id, payload.get("voterName"), payload.get("voterContact"), get_client_ip(self)),
-                    )
-                conn.commit()
-            return self._send_json({"message": "Vote enregistré."}, 201)
+        if len(new_password) < 8:
+            return self._send_json({"message": "Le mot de passe doit contenir au moins 8 caractères."}, 400)
 
-        if path == "/api/admin/candidates":
-            if not self._require_admin():
-                return
-            if not self._require_db():
-                return
+        # Vérifier le mot de passe actuel (hash stocké)
+        current_hash = self._get_admin_password_hash()
+        if not current_hash or not run_cpu(check_password, current_password, current_hash):
+            return self._send_json({"message": "Mot de passe actuel incorrect."}, 401)
 
-            candidate_id = payload.get("candidateId")
-            data = {
-                "fullName": payload.get("fullName"),
-                "age": payload.get("age"),
-                "city": payload.get("city"),
-                "country": payload.get("country"),
-                "email": payload.get("email"),
-                "phone": payload.get("phone"),
-                "whatsapp": payload.get("whatsapp"),
-                "photoUrl": payload.get("photoUrl"),
-                "quranLevel": payload.get("quranLevel"),
-                "motivation": payload.get("motivation"),
-                "status": payload.get("status"),
+        if not self._require_db():
+            return
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    insert into admin_config (key, value)
+                    values ('admin_password_hash', %s)
+                    on conflict (key) do update set value = excluded.value, updatedAt = now()
+                    """,
+                    (run_cpu(hash_password, new_password),),
+                )
+            revoke_admin_tokens(conn)
+            conn.commit()
+        clear_admin_auth_cache()
+
+        self._audit("admin_change_password", {})
+        return self._send_json({"message": "Mot de passe changé avec succès. Reconnectez-vous."})
+
+    def _route_upload_photo(self, req):
+        if not cloudinary_ready():
+            return self._send_json({"message": "Cloudinary non configuré."}, 500)
+
+        form = self._parse_multipart()
+        if form and form.get("__too_large__"):
+            return self._send_json({"message": "Fichier trop volumineux (max 3 Mo)."}, 413)
+        if not form or "photo" not in form:
+            return self._send_json({"message": "Fichier photo requis."}, 400)
+        photo_item = form["photo"]
+        if not photo_item["filename"]:
+            return self._send_json({"message": "Nom de fichier invalide."}, 400)
+
+        raw = photo_item["data"]
+        if raw and len(raw) > MAX_UPLOAD_BYTES:
+            return self._send_json({"message": "Fichier trop volumineux (max 3 Mo)."}, 413)
+        if photo_item["content_type"] not in {"image/jpeg", "image/png", "image/webp"}:
+            return self._send_json({"message": "Format de fichier non supporté."}, 400)
+        ext = Path(photo_item["filename"]).suffix.lower().strip(".") or "jpg"
+        safe_ext = ext if ext in {"jpg", "jpeg", "png", "webp"} else "jpg"
+        public_id = f"{CLD_FOLDER}/{uuid.uuid4().hex}"
+
+        timestamp = int(time.time())
+        params = {
+            "folder": CLD_FOLDER,
+            "public_id": public_id.split("/")[-1],
+            "timestamp": timestamp,
+        }
+        signature_base = "&".join(
+            f"{k}={params[k]}" for k in sorted(params)
+        ) + CLD_API_SECRET
+        signature = hashlib.sha1(signature_base.encode("utf-8")).hexdigest()
+
+        upload_res = requests.post(
+            f"https://api.cloudinary.com/v1_1/{CLD_CLOUD_NAME}/image/upload",
+            data={
+                "api_key": CLD_API_KEY,
+                "timestamp": timestamp,
+                "folder": CLD_FOLDER,
+                "public_id": params["public_id"],
+                "signature": signature,
+            },
+            files={"file": (f"upload.{safe_ext}", raw, photo_item["content_type"] or "application/octet-stream")},
+            timeout=20,
+        )
+        if upload_res.status_code >= 300:
+            return self._send_json(
+                {"message": "Erreur lors de l'upload photo.", "details": upload_res.text},
+                500,
+            )
+        upload_json = upload_res.json()
+        return self._send_json({"photoUrl": upload_json.get("secure_url")})
+
+    def _route_contact(self, req):
+        payload = req["payload"]
+        if not check_rate_limit(get_client_ip(self), "contact"):
+            return self._send_json({"message": "Trop de tentatives, réessayez plus tard."}, 429)
+        full_name = (payload.get("fullName") or "").strip()
+        email = (payload.get("email") or "").strip()
+        subject = (payload.get("subject") or "").strip()
+        message = (payload.get("message") or "").strip()
+        if not full_name or not email or not subject or not message:
+            return self._send_json({"message": "Tous les champs sont obligatoires."}, 400)
+        if not validate_lengths(
+            {
+                "contactName": full_name,
+                "contactEmail": email,
+                "contactSubject": subject,
+                "contactMessage": message,
             }
-            clean = {k: v for k, v in data.items() if v not in [None, ""]}
-            if not validate_lengths(clean):
-                return self._send_json({"message": "Certains champs dépassent la taille maximale."}, 400)
-            if "email" in clean and not validate_email(clean["email"]):
-                return self._send_json({"message": "Email invalide."}, 400)
-            if "phone" in clean and not validate_phone(clean["phone"]):
-                return self._send_json({"message": "Téléphone invalide."}, 400)
-            if "quranLevel" in clean and clean["quranLevel"] not in ALLOWED_LEVELS:
-                return self._send_json({"message": "Niveau invalide."}, 400)
-            if "status" in clean and clean["status"] not in ALLOWED_STATUSES:
-                return self._send_json({"message": "Statut invalide."}, 400)
-            if "whatsapp" in clean:
-                normalized = normalize_whatsapp(clean["whatsapp"])
-                if not normalized:
-                    return self._send_json({"message": "Numéro WhatsApp invalide."}, 400)
-                clean["whatsapp"] = normalized
+        ):
+            return self._send_json({"message": "Message trop long."}, 400)
+        if not validate_email(email):
+            return self._send_json({"message": "Email invalide."}, 400)
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    insert into contact_messages (fullName, email, subject, message, ip)
+                    values (%s, %s, %s, %s, %s)
+                    """,
+                    (full_name, email, subject, message, get_client_ip(self)),
+                )
+            conn.commit()
+        send_contact_email(full_name, email, subject, message)
+        return self._send_json({"message": "Message envoyé. Nous vous répondrons rapidement."}, 201)
+
+    def _route_register(self, req):
+        payload = req["payload"]
+        if not check_rate_limit(get_client_ip(self), "register"):
+            return self._send_json({"message": "Trop de tentatives, réessayez plus tard."}, 429)
+        if not payload.get("fullName") or not payload.get("whatsapp"):
+            return self._send_json({"message": "Nom complet et WhatsApp obligatoires."}, 400)
+        normalized = normalize_whatsapp(payload.get("whatsapp"))
+        if not normalized:
+            return self._send_json({"message": "Numéro WhatsApp invalide."}, 400)
+        if payload.get("email") and not validate_email(payload.get("email")):
+            return self._send_json({"message": "Email invalide."}, 400)
+        if payload.get("phone") and not validate_phone(payload.get("phone")):
+            return self._send_json({"message": "Téléphone invalide."}, 400)
+        if not validate_lengths(payload):
+            return self._send_json({"message": "Certains champs dépassent la taille maximale."}, 400)
+        if payload.get("quranLevel", "") not in ALLOWED_LEVELS:
+            return self._send_json({"message": "Niveau invalide."}, 400)
+
+        if not SETTINGS.registration_open():
+            return self._send_json({"message": "Inscriptions fermées."}, 403)
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                candidate_id, duplicate = insert_candidate(cur, payload, normalized)
+            conn.commit()
+        if duplicate:
+            return self._send_json({"message": duplicate}, 409)
+        DATA_VERSION.bump()
 
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    if candidate_id:
-                        if not clean:
-                            return self._send_json({"message": "Aucune modification fournie."}, 400)
-                        if "fullName" in clean or "whatsapp" in clean:
-                            cur.execute(
-                                """
-                                select id from candidates
-                                where lower(fullName) = lower(%s)
-                                  and whatsapp = %s
-                                  and id != %s
-                                """,
-                                (
-                                    clean.get("fullName", payload.get("fullName")),
-                                    clean.get("whatsapp", payload.get("whatsapp")),
-                                    candidate_id,
-                                ),
-                            )
-                            if cur.fetchone():
-                                return self._send_json({"message": "Utilisateur déjà enregistré."}, 409)
-                        if "whatsapp" in clean:
-                            cur.execute(
-                                "select id from candidates where whatsapp = %s and id != %s",
-                                (clean["whatsapp"], candidate_id),
-                            )
-                            if cur.fetchone():
-                                return self._send_json({"message": "WhatsApp déjà utilisé."}, 409)
-                        set_parts = ", ".join([f"{k} = %s" for k in clean.keys()])
-                        params = list(clean.values()) + [candidate_id]
-                        cur.execute(f"update candidates set {set_parts} where id = %s", params)
-                        if cur.rowcount == 0:
-                            return self._send_json({"message": "Candidat introuvable."}, 404)
-                        conn.commit()
-                        self._audit("candidate_update", {"id": candidate_id, "fields": list(clean.keys())})
-                        return self._send_json({"message": "Candidat mis à jour."})
-
-                    if not payload.get("fullName"):
-                        return self._send_json({"message": "Nom complet requis."}, 400)
-                    if not payload.get("whatsapp"):
-                        return self._send_json({"message": "WhatsApp requis."}, 400)
-                    normalized = normalize_whatsapp(payload.get("whatsapp"))
-                    if not normalized:
-                        return self._send_json({"message": "Numéro WhatsApp invalide."}, 400)
-                    if payload.get("email") and not validate_email(payload.get("email")):
-                        return self._send_json({"message": "Email invalide."}, 400)
-                    if payload.get("phone") and not validate_phone(payload.get("phone")):
-                        return self._send_json({"message": "Téléphone invalide."}, 400)
-                    if not validate_lengths(payload):
-                        return self._send_json({"message": "Certains champs dépassent la taille maximale."}, 400)
-                    if payload.get("quranLevel", "") not in ALLOWED_LEVELS:
-                        return self._send_json({"message": "Niveau invalide."}, 400)
-                    if payload.get("status", "pending") not in ALLOWED_STATUSES:
-                        return self._send_json({"message": "Statut invalide."}, 400)
-                    cur.execute(
-                        "select id from candidates where lower(fullName) = lower(%s) and whatsapp = %s",
-                        (payload.get("fullName"), normalized),
-                    )
-                    if cur.fetchone():
-                        return self._send_json({"message": "Utilisateur déjà enregistré."}, 409)
-                    cur.execute("select id from candidates where whatsapp = %s", (normalized,))
-                    if cur.fetchone():
-                        return self._send_json({"message": "WhatsApp déjà utilisé."}, 409)
-                    cur.execute(
-                        """
-                        insert into candidates
-                        (fullName, age, city, country, email, phone, whatsapp, photoUrl, quranLevel, motivation, status)
-                        values (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                        returning id
-                        """,
-                        (
-                            payload.get("fullName"),
-                            payload.get("age") or None,
-                            payload.get("city"),
-                            payload.get("country"),
-                            payload.get("email"),
-                            payload.get("phone"),
-                            normalized,
-                            payload.get("photoUrl"),
-                            payload.get("quranLevel"),
-                            payload.get("motivation"),
-                            payload.get("status") or "pending",
-                        ),
-                    )
-                    new_id = cur.fetchone()[0]
-                    cur.execute(
-                        "update candidates set candidateCode = %s where id = %s",
-                        (f"{CODE_PREFIX}-{str(new_id).zfill(3)}", new_id),
-                    )
-                conn.commit()
-            self._audit("candidate_create", {"id": new_id})
-            return self._send_json({"message": "Candidat ajouté.", "candidateId": new_id}, 201)
+        # Envoyer email à l'admin
+        send_registration_email(candidate_id, payload.get("fullName"), payload.get("email"), payload.get("whatsapp"), payload.get("phone"))
 
-        if path == "/api/scores":
-            if not self._require_admin():
-                return
-            if not self._require_db():
-                return
-            candidate_id = payload.get("candidateId")
-            judge = payload.get("judgeName")
-            if not candidate_id or not judge:
-                return self._send_json({"message": "Candidate ID et nom du juge requis."}, 400)
-            if not validate_lengths(payload):
-                return self._send_json({"message": "Certains champs dépassent la taille maximale."}, 400)
+        # Envoyer email de confirmation au candidat
+        send_candidate_confirmation_email(candidate_id, payload.get("fullName"), payload.get("email"))
 
-            with get_conn() as conn:
-                with conn.cursor(row_factory=dict_row) as cur:
-                    cur.execute("select id, fullName from candidates where id = %s", (candidate_id,))
-                    candidate = cur.fetchone()
-                    if not candidate:
-                        return self._send_json({"message": "Candidat introuvable."}, 404)
-                    cur.execute(
-                        """
-                        insert into scores (candidateId, judgeName, themeChosenScore, themeImposedScore, notes)
-                        values (%s, %s, %s, %s, %s)
-                        """,
-                        (
-                            candidate_id,
-                            judge,
-                            payload.get("themeChosenScore", 0),
-                            payload.get("themeImposedScore", 0),
-                            payload.get("notes", ""),
-                        ),
-                    )
-                conn.commit()
-            self._audit("score_create", {"candidateId": candidate_id, "judgeName": judge})
-            return self._send_json({
-                "message": "Notation enregistrée.",
-                "candidateName": candidate.get("fullName", "Inconnu")
-            }, 201)
+        msg = (
+            "Assalamou alaykoum, je confirme mon inscription au Quiz Islamique 2026. "
+            f"Mon ID candidat est {candidate_id}."
+        )
+        redirect = f"https://wa.me/{ADMIN_WHATSAPP}?text={msg.replace(' ', '%20')}"
+        return self._send_json(
+            {
+                "message": "Inscription enregistrée. Un email de confirmation vous a été envoyé.",
+                "candidateId": candidate_id,
+                "whatsappRedirect": redirect,
+            },
+            201,
+        )
 
-        return self._send_json({"message": "Not found"}, 404)
+    def _route_vote(self, req):
+        payload = req["payload"]
+        if not check_rate_limit(get_client_ip(self), "vote"):
+            return self._send_json({"message": "Trop de votes, réessayez plus tard."}, 429)
+        candidate_id = payload.get("candidateId")
+        if not candidate_id:
+            return self._send_json({"message": "Candidate ID requis."}, 400)
+        try:
+            candidate_id = int(candidate_id)
+        except (TypeError, ValueError):
+            return self._send_json({"message": "Candidat introuvable."}, 404)
+        ip = get_client_ip(self)
+
+        if _vote_ingestor is not None:
+            status, message = _vote_ingestor.accept(
+                candidate_id, ip, payload.get("voterName"), payload.get("voterContact")
+            )
+            return self._send_json({"message": message}, status)
 
-    def do_PUT(self):
-        path = urlparse(self.path).path
-        if path.startswith("/api/admin/media/"):
-            if not self._require_admin():
-                return
-            media_name = unquote(path.rsplit("/", 1)[-1]).strip()
-            if not media_name:
-                return self._send_json({"message": "Nom média invalide."}, 400)
-            media_file = (self._quiz_media_root() / media_name).resolve()
-            root = self._quiz_media_root()
-            if root not in media_file.parents or not media_file.exists() or not media_file.is_file():
-                return self._send_json({"message": "Média introuvable."}, 404)
-            payload = self._get_json()
-            if payload is None:
-                return
-            meta = self._load_quiz_media_meta()
-            current = meta.get(media_name, {}) if isinstance(meta.get(media_name), dict) else {}
-            updated = {
-                "hidden": bool(payload.get("hidden", current.get("hidden", False))),
-                "order": int(payload.get("order", current.get("order", 0) or 0)),
-                "caption": str(payload.get("caption", current.get("caption", "")))[:240],
-            }
-            meta[media_name] = updated
-            if not self._save_quiz_media_meta(meta):
-                return self._send_json({"message": "Impossible de sauvegarder les métadonnées."}, 500)
-            return self._send_json({"message": "Média mis à jour."})
+        if not SETTINGS.voting_open():
+            return self._send_json({"message": "Votes fermés."}, 403)
+        VOTE_DEDUP.ensure_warm()
+        if VOTE_DEDUP.seen(candidate_id, ip):
+            return self._send_json({"message": "Vote déjà enregistré pour ce candidat."}, 429)
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                if not STATEMENTS.execute(cur, "candidate_exists", {"candidateId": candidate_id}).fetchone():
+                    return self._send_json({"message": "Candidat introuvable."}, 404)
+                # Réservation (candidat, ip, jour) et insertion en une requête: arbitre entre workers
+                STATEMENTS.execute(
+                    cur,
+                    "vote_insert",
+                    {
+                        "candidateId": candidate_id,
+                        "ip": ip,
+                        "voterName": payload.get("voterName"),
+                        "voterContact": payload.get("voterContact"),
+                    },
+                )
+                inserted = cur.fetchone()
+            conn.commit()
+        VOTE_DEDUP.add(candidate_id, ip)
+        VOTE_DEDUP.maybe_prune_db()
+        if not inserted:
+            return self._send_json({"message": "Vote déjà enregistré pour ce candidat."}, 429)
+        DATA_VERSION.bump()
+        return self._send_json({"message": "Vote enregistré."}, 201)
+
+    def _route_save_candidate(self, req):
+        payload = req["payload"]
+        candidate_id = payload.get("candidateId")
+        data = {
+            "fullName": payload.get("fullName"),
+            "age": payload.get("age"),
+            "city": payload.get("city"),
+            "country": payload.get("country"),
+            "email": payload.get("email"),
+            "phone": payload.get("phone"),
+            "whatsapp": payload.get("whatsapp"),
+            "photoUrl": payload.get("photoUrl"),
+            "quranLevel": payload.get("quranLevel"),
+            "motivation": payload.get("motivation"),
+            "status": payload.get("status"),
+        }
+        clean = {k: v for k, v in data.items() if v not in [None, ""]}
+        if not validate_lengths(clean):
+            return self._send_json({"message": "Certains champs dépassent la taille maximale."}, 400)
+        if "email" in clean and not validate_email(clean["email"]):
+            return self._send_json({"message": "Email invalide."}, 400)
+        if "phone" in clean and not validate_phone(clean["phone"]):
+            return self._send_json({"message": "Téléphone invalide."}, 400)
+        if "quranLevel" in clean and clean["quranLevel"] not in ALLOWED_LEVELS:
+            return self._send_json({"message": "Niveau invalide."}, 400)
+        if "status" in clean and clean["status"] not in ALLOWED_STATUSES:
+            return self._send_json({"message": "Statut invalide."}, 400)
+        if "whatsapp" in clean:
+            normalized = normalize_whatsapp(clean["whatsapp"])
+            if not normalized:
+                return self._send_json({"message": "Numéro WhatsApp invalide."}, 400)
+            clean["whatsapp"] = normalized
 
-        if path.startswith("/api/contact-messages/"):
-            if not self._require_admin():
-                return
-            if not self._require_db():
-                return
-            message_id = path.rsplit("/", 1)[-1]
-            if not message_id.isdigit():
-                return self._send_json({"message": "ID message invalide."}, 400)
-            payload = self._get_json()
-            if payload is None:
-                return
-            archived = 1 if int(payload.get("archived", 0)) == 1 else 0
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(
-                        "update contact_messages set archived = %s where id = %s",
-                        (archived, message_id),
-                    )
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                if candidate_id:
+                    if not clean:
+                        return self._send_json({"message": "Aucune modification fournie."}, 400)
+                    if "fullName" in clean or "whatsapp" in clean:
+                        cur.execute(
+                            """
+                            select id from candidates
+                            where lower(fullName) = lower(%s)
+                              and whatsapp = %s
+                              and id != %s
+                            """,
+                            (
+                                clean.get("fullName", payload.get("fullName")),
+                                clean.get("whatsapp", payload.get("whatsapp")),
+                                candidate_id,
+                            ),
+                        )
+                        if cur.fetchone():
+                            return self._send_json({"message": "Utilisateur déjà enregistré."}, 409)
+                    if "whatsapp" in clean:
+                        cur.execute(
+                            "select id from candidates where whatsapp = %s and id != %s",
+                            (clean["whatsapp"], candidate_id),
+                        )
+                        if cur.fetchone():
+                            return self._send_json({"message": "WhatsApp déjà utilisé."}, 409)
+                    set_parts = ", ".join([f"{k} = %s" for k in clean.keys()])
+                    params = list(clean.values()) + [candidate_id]
+                    cur.execute(f"update candidates set {set_parts} where id = %s", params)
                     if cur.rowcount == 0:
-                        return self._send_json({"message": "Message introuvable."}, 404)
-                conn.commit()
-            self._audit("contact_archive", {"id": message_id, "archived": archived})
-            return self._send_json({"message": "Message mis à jour."})
-        if path != "/api/tournament-settings":
-            return self._send_json({"message": "Not found"}, 404)
-        if not self._require_admin():
-            return
-        if not self._require_db():
-            return
+                        return self._send_json({"message": "Candidat introuvable."}, 404)
+                    conn.commit()
+                    self._audit("candidate_update", {"id": candidate_id, "fields": list(clean.keys())})
+                    return self._send_json({"message": "Candidat mis à jour."})
+
+                if not payload.get("fullName"):
+                    return self._send_json({"message": "Nom complet requis."}, 400)
+                if not payload.get("whatsapp"):
+                    return self._send_json({"message": "WhatsApp requis."}, 400)
+                normalized = normalize_whatsapp(payload.get("whatsapp"))
+                if not normalized:
+                    return self._send_json({"message": "Numéro WhatsApp invalide."}, 400)
+                if payload.get("email") and not validate_email(payload.get("email")):
+                    return self._send_json({"message": "Email invalide."}, 400)
+                if payload.get("phone") and not validate_phone(payload.get("phone")):
+                    return self._send_json({"message": "Téléphone invalide."}, 400)
+                if not validate_lengths(payload):
+                    return self._send_json({"message": "Certains champs dépassent la taille maximale."}, 400)
+                if payload.get("quranLevel", "") not in ALLOWED_LEVELS:
+                    return self._send_json({"message": "Niveau invalide."}, 400)
+                if payload.get("status", "pending") not in ALLOWED_STATUSES:
+                    return self._send_json({"message": "Statut invalide."}, 400)
+                new_id, duplicate = insert_candidate(cur, payload, normalized)
+                if duplicate:
+                    return self._send_json({"message": duplicate}, 409)
+            conn.commit()
+        self._audit("candidate_create", {"id": new_id})
+        return self._send_json({"message": "Candidat ajouté.", "candidateId": new_id}, 201)
+
+    def _route_create_score(self, req):
+        payload = req["payload"]
+        candidate_id = payload.get("candidateId")
+        judge = payload.get("judgeName")
+        if not candidate_id or not judge:
+            return self._send_json({"message": "Candidate ID et nom du juge requis."}, 400)
+        if not validate_lengths(payload):
+            return self._send_json({"message": "Certains champs dépassent la taille maximale."}, 400)
 
-        p = self._get_json()
-        if p is None:
-            return
+        with get_conn() as conn:
+            with conn.cursor(row_factory=dict_row) as cur:
+                cur.execute("select id, fullName from candidates where id = %s", (candidate_id,))
+                candidate = cur.fetchone()
+                if not candidate:
+                    return self._send_json({"message": "Candidat introuvable."}, 404)
+                cur.execute(
+                    """
+                    insert into scores (candidateId, judgeName, themeChosenScore, themeImposedScore, notes)
+                    values (%s, %s, %s, %s, %s)
+                    """,
+                    (
+                        candidate_id,
+                        judge,
+                        payload.get("themeChosenScore", 0),
+                        payload.get("themeImposedScore", 0),
+                        payload.get("notes", ""),
+                    ),
+                )
+            conn.commit()
+        self._audit("score_create", {"candidateId": candidate_id, "judgeName": judge})
+        return self._send_json({
+            "message": "Notation enregistrée.",
+            "candidateName": candidate.get("fullName", "Inconnu")
+        }, 201)
+
+    def _route_update_media(self, req):
+        media_name = unquote(req["params"]["name"]).strip()
+        if not media_name:
+            return self._send_json({"message": "Nom média invalide."}, 400)
+        media_file = (self._quiz_media_root() / media_name).resolve()
+        root = self._quiz_media_root()
+        if root not in media_file.parents or not media_file.exists() or not media_file.is_file():
+            return self._send_json({"message": "Média introuvable."}, 404)
+        payload = req["payload"]
+        meta = self._load_quiz_media_meta()
+        current = meta.get(media_name, {}) if isinstance(meta.get(media_name), dict) else {}
+        updated = {
+            "hidden": bool(payload.get("hidden", current.get("hidden", False))),
+            "order": int(payload.get("order", current.get("order", 0) or 0)),
+            "caption": str(payload.get("caption", current.get("caption", "")))[:240],
+        }
+        meta[media_name] = updated
+        if not self._save_quiz_media_meta(meta):
+            return self._send_json({"message": "Impossible de sauvegarder les métadonnées."}, 500)
+        return self._send_json({"message": "Média mis à jour."})
+
+    def _route_update_contact_message(self, req):
+        message_id = req["params"]["id"]
+        if not message_id.isdigit():
+            return self._send_json({"message": "ID message invalide."}, 400)
+        payload = req["payload"]
+        archived = 1 if int(payload.get("archived", 0)) == 1 else 0
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "update contact_messages set archived = %s where id = %s",
+                    (archived, message_id),
+                )
+                if cur.rowcount == 0:
+                    return self._send_json({"message": "Message introuvable."}, 404)
+            conn.commit()
+        self._audit("contact_archive", {"id": message_id, "archived": archived})
+        return self._send_json({"message": "Message mis à jour."})
+
+    def _route_delete_contact_message(self, req):
+        message_id = req["params"]["id"]
+        if not message_id.isdigit():
+            return self._send_json({"message": "ID message invalide."}, 400)
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("delete from contact_messages where id = %s", (message_id,))
+                if cur.rowcount == 0:
+                    return self._send_json({"message": "Message introuvable."}, 404)
+            conn.commit()
+        self._audit("contact_delete", {"id": message_id})
+        return self._send_json({"message": "Message supprimé."})
+
+    def _route_update_tournament_settings(self, req):
+        p = req["payload"]
         payload = {
             "maxCandidates": p.get("maxCandidates", 64),
             "directQualified": p.get("directQualified", 16),
@@ -1597,53 +3123,26 @@ class Handler(BaseHTTPRequestHandler):
                     values,
                 )
             conn.commit()
+        # Ce processus voit la modification tout de suite; les autres via NOTIFY
+        SETTINGS.try_refresh()
         self._audit("settings_update", {"fields": list(payload.keys())})
         return self._send_json({"message": "Paramètres du tournoi mis à jour."})
 
-    def do_DELETE(self):
-        path = urlparse(self.path).path
-        if path.startswith("/api/contact-messages/"):
-            if not self._require_admin():
-                return
-            if not self._require_db():
-                return
-            message_id = path.rsplit("/", 1)[-1]
-            if not message_id.isdigit():
-                return self._send_json({"message": "ID message invalide."}, 400)
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("delete from contact_messages where id = %s", (message_id,))
-                    if cur.rowcount == 0:
-                        return self._send_json({"message": "Message introuvable."}, 404)
-                conn.commit()
-            self._audit("contact_delete", {"id": message_id})
-            return self._send_json({"message": "Message supprimé."})
-        
-        if path.startswith("/api/admin/scores/"):
-            if not self._require_admin():
-                return
-            if not self._require_db():
-                return
-            score_id = path.rsplit("/", 1)[-1]
-            if not score_id.isdigit():
-                return self._send_json({"message": "ID note invalide."}, 400)
-            with get_conn() as conn:
-                with conn.cursor() as cur:
-                    cur.execute("delete from scores where id = %s", (score_id,))
-                    if cur.rowcount == 0:
-                        return self._send_json({"message": "Note introuvable."}, 404)
-                conn.commit()
-            self._audit("score_delete", {"id": score_id})
-            return self._send_json({"message": "Note supprimée."})
-        
-        if not path.startswith("/api/admin/candidates/"):
-            return self._send_json({"message": "Not found"}, 404)
-        if not self._require_admin():
-            return
-        if not self._require_db():
-            return
+    def _route_delete_score(self, req):
+        score_id = req["params"]["id"]
+        if not score_id.isdigit():
+            return self._send_json({"message": "ID note invalide."}, 400)
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("delete from scores where id = %s", (score_id,))
+                if cur.rowcount == 0:
+                    return self._send_json({"message": "Note introuvable."}, 404)
+            conn.commit()
+        self._audit("score_delete", {"id": score_id})
+        return self._send_json({"message": "Note supprimée."})
 
-        candidate_id = path.rsplit("/", 1)[-1]
+    def _route_delete_candidate(self, req):
+        candidate_id = req["params"]["id"]
         if not candidate_id.isdigit():
             return self._send_json({"message": "ID candidat invalide."}, 400)
 
@@ -1657,11 +3156,592 @@ class Handler(BaseHTTPRequestHandler):
         return self._send_json({"message": "Candidat supprimé."})
 
 
-def get_client_ip(handler):
-    forwarded = handler.headers.get("X-Forwarded-For", "")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return handler.client_address[0] if handler.client_address else "unknown"
+ROUTER = Router()
+# Routes publiques (médias: pas de base de données requise)
+ROUTER.add("GET", "/", Handler._route_index)
+ROUTER.add("GET", "/api/public-media", Handler._route_public_media)
+ROUTER.add("GET", "/api/public-media/download-all", Handler._route_public_media_download_all)
+ROUTER.add("GET", "/api/public-media/stats", Handler._route_public_media_stats)
+ROUTER.add("POST", "/api/public-media/events", Handler._route_media_event, body="json")
+ROUTER.add("GET", "/media/<*name>", Handler._route_media)
+ROUTER.add("GET", "/api/health", Handler._route_health, db=True)
+# fallback/cache: une réponse par route, la query string (?ts=... du frontend) est ignorée
+ROUTER.add("GET", "/api/public-candidates", Handler._route_public_candidates, db=True, fallback=True, cache=True, prefetch="public_candidates")
+ROUTER.add("GET", "/api/public-settings", Handler._route_public_settings, db=True, fallback=True, cache=True)
+ROUTER.add("GET", "/api/public-results", Handler._route_public_results, db=True, fallback=True, cache=True, prefetch="public_results")
+ROUTER.add("GET", "/api/public-results/qualified", Handler._route_public_results_qualified, db=True, fallback=True, cache=True, prefetch="public_qualified")
+ROUTER.add("POST", "/api/contact", Handler._route_contact, db=True, body="json")
+ROUTER.add("POST", "/api/register", Handler._route_register, db=True, body="json")
+ROUTER.add("POST", "/api/votes", Handler._route_vote, db=True, body="json")
+# Routes admin
+ROUTER.add("POST", "/api/admin/login", Handler._route_admin_login)
+ROUTER.add("GET", "/api/admin/routes", Handler._route_admin_routes, admin=True)
+ROUTER.add("GET", "/api/admin/statements", Handler._route_admin_statements, admin=True)
+ROUTER.add("GET", "/api/admin/media", Handler._route_admin_media, admin=True)
+ROUTER.add("PUT", "/api/admin/media/<name>", Handler._route_update_media, admin=True, body="json")
+ROUTER.add("POST", "/api/admin/change-password", Handler._route_change_password, admin=True, body="json")
+ROUTER.add("POST", "/api/admin/upload-photo", Handler._route_upload_photo, admin=True)
+ROUTER.add("GET", "/api/admin/dashboard", Handler._route_admin_dashboard, admin=True, db=True)
+ROUTER.add("GET", "/api/admin/dashboard/<section>", Handler._route_admin_dashboard, admin=True, db=True)
+ROUTER.add("GET", "/api/candidates", Handler._route_candidates, admin=True, db=True)
+ROUTER.add("POST", "/api/admin/candidates", Handler._route_save_candidate, admin=True, db=True, body="json")
+ROUTER.add("GET", "/api/admin/candidates/<id>", Handler._route_admin_candidate, admin=True, db=True)
+ROUTER.add("GET", "/api/admin/export/<name>", Handler._route_admin_export, admin=True, db=True)
+ROUTER.add("DELETE", "/api/admin/candidates/<id>", Handler._route_delete_candidate, admin=True, db=True)
+ROUTER.add("GET", "/api/votes/summary", Handler._route_votes_summary, admin=True, db=True)
+ROUTER.add("GET", "/api/scores/ranking", Handler._route_scores_ranking, admin=True, db=True)
+ROUTER.add("POST", "/api/scores", Handler._route_create_score, admin=True, db=True, body="json")
+ROUTER.add("GET", "/api/admin/scores", Handler._route_admin_scores, admin=True, db=True)
+ROUTER.add("DELETE", "/api/admin/scores/<id>", Handler._route_delete_score, admin=True, db=True)
+ROUTER.add("GET", "/api/tournament-settings", Handler._route_get_tournament_settings, admin=True, db=True)
+ROUTER.add("PUT", "/api/tournament-settings", Handler._route_update_tournament_settings, admin=True, db=True, body="json")
+ROUTER.add("GET", "/api/contact-messages", Handler._route_contact_messages, admin=True, db=True)
+ROUTER.add("PUT", "/api/contact-messages/<id>", Handler._route_update_contact_message, admin=True, db=True, body="json")
+ROUTER.add("DELETE", "/api/contact-messages/<id>", Handler._route_delete_contact_message, admin=True, db=True)
+ROUTER.add("GET", "/api/admin-audit", Handler._route_admin_audit, admin=True, db=True)
+
+
+def get_client_ip(handler):
+    forwarded = handler.headers.get("X-Forwarded-For", "")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return handler.client_address[0] if handler.client_address else "unknown"
+
+
+# ==================== POOL CPU ====================
+# Les tâches tournent dans des processus "spawn" (pas de fork d'un serveur multi-threads)
+# qui réimportent ce module: elles doivent être des fonctions de niveau module.
+_cpu_pool = None
+_CPU_POOL_LOCK = threading.Lock()
+_CPU_POOL_SLOTS = threading.BoundedSemaphore(max(1, CPU_POOL_WORKERS + CPU_POOL_QUEUE_SIZE))
+# Formats déjà compressés: stockés tels quels dans l'archive, DEFLATE n'y gagne rien
+ZIP_STORED_EXT = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".mp4", ".webm", ".mov", ".zip"}
+
+
+def get_cpu_pool():
+    global _cpu_pool
+    with _CPU_POOL_LOCK:
+        if _cpu_pool is None:
+            _cpu_pool = ProcessPoolExecutor(
+                max_workers=CPU_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _cpu_pool
+
+
+def close_cpu_pool():
+    global _cpu_pool
+    with _CPU_POOL_LOCK:
+        pool, _cpu_pool = _cpu_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _forget_cpu_pool_after_fork():
+    # Les processus du pool appartiennent au parent (prefork): le worker créera le sien.
+    global _cpu_pool
+    _cpu_pool = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_cpu_pool_after_fork)
+atexit.register(close_cpu_pool)
+
+
+def _cpu_pool_busy():
+    return APIError(
+        "Serveur occupé, réessayez dans quelques secondes.",
+        503,
+        headers={"Retry-After": str(CPU_POOL_RETRY_AFTER)},
+    )
+
+
+def run_cpu(func, *args):
+    """Exécute func(*args) dans le pool de processus et attend le résultat.
+
+    La file est bornée: si workers + file sont occupés, lève APIError 503
+    (avec Retry-After) au lieu de laisser les requêtes s'empiler.
+    """
+    if CPU_POOL_WORKERS <= 0:
+        return func(*args)
+    if not _CPU_POOL_SLOTS.acquire(blocking=False):
+        raise _cpu_pool_busy()
+    try:
+        future = get_cpu_pool().submit(func, *args)
+    except (BrokenProcessPool, RuntimeError) as error:
+        _CPU_POOL_SLOTS.release()
+        logger.error(f"Pool CPU indisponible, recréation: {error}")
+        close_cpu_pool()
+        raise _cpu_pool_busy()
+    # La place est libérée quand la tâche se termine, même si l'appelant a abandonné
+    future.add_done_callback(lambda _: _CPU_POOL_SLOTS.release())
+    try:
+        return future.result(timeout=CPU_POOL_TIMEOUT)
+    except FutureTimeout:
+        future.cancel()
+        logger.error(f"Tâche CPU {func.__name__} trop longue (> {CPU_POOL_TIMEOUT}s)")
+        raise _cpu_pool_busy()
+    except BrokenProcessPool as error:
+        logger.error(f"Processus du pool CPU interrompu: {error}")
+        close_cpu_pool()
+        raise _cpu_pool_busy()
+
+
+def encode_json(payload):
+    """Encode du JSON sur le thread courant."""
+    return json.dumps(payload, default=json_default).encode("utf-8")
+
+
+def _json_size_hint(payload):
+    if isinstance(payload, list):
+        return len(payload)
+    if isinstance(payload, dict):
+        return max((len(value) for value in payload.values() if isinstance(value, (list, dict))), default=0)
+    return 0
+
+
+def encode_response_json(payload):
+    """Encode une réponse JSON; à partir de CPU_JSON_MIN_ITEMS éléments, dans le pool CPU.
+
+    Le pool rend cette réponse plus lente (pickle + aller-retour: 2000 lignes de
+    candidats, 18 -> 25 ms) mais json.dumps ne tient plus le GIL pendant ce temps:
+    les autres requêtes du processus restent rapides (médiane 15 ms -> 0,1 ms avec
+    deux gros encodages en parallèle). Pool saturé: encodée ici plutôt qu'un 503.
+    """
+    if CPU_JSON_MIN_ITEMS and CPU_POOL_WORKERS > 0 and _json_size_hint(payload) >= CPU_JSON_MIN_ITEMS:
+        try:
+            return run_cpu(encode_json, payload)
+        except APIError:
+            pass
+    return encode_json(payload)
+
+
+def iter_json_list(rows, transform=None):
+    """Encode {"data": [...], "success": true} ligne par ligne (même format que _send_json).
+
+    Produit des morceaux d'environ STREAM_CHUNK_BYTES; rows est fermé (close()) à la fin,
+    y compris si l'envoi est interrompu.
+    """
+    parts, size = [b'{"data": ['], 0
+    try:
+        for index, row in enumerate(rows):
+            data = encode_json(transform(row) if transform else row)
+            if index:
+                parts.append(b", ")
+            parts.append(data)
+            size += len(data) + 2
+            if size >= STREAM_CHUNK_BYTES:
+                yield b"".join(parts)
+                parts, size = [], 0
+        parts.append(b'], "success": true}')
+        yield b"".join(parts)
+    finally:
+        close = getattr(rows, "close", None)
+        if close:
+            close()
+
+
+def build_media_zip(root, names):
+    """Écrit l'archive des médias dans un fichier temporaire et retourne son chemin."""
+    root = Path(root)
+    handle = tempfile.NamedTemporaryFile(prefix="quiz-media-", suffix=".zip", delete=False)
+    try:
+        with handle, zipfile.ZipFile(handle, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name in names:
+                path = (root / name).resolve()
+                if root not in path.parents or not path.is_file():
+                    continue
+                compress = zipfile.ZIP_STORED if path.suffix.lower() in ZIP_STORED_EXT else zipfile.ZIP_DEFLATED
+                zf.write(path, arcname=name, compress_type=compress)
+    except BaseException:
+        os.unlink(handle.name)
+        raise
+    return handle.name
+
+
+# ==================== COMPRESSION ====================
+# Réponses dynamiques: niveau COMPRESS_LEVEL (gzip) / 5 (brotli)
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+BROTLI_QUALITY = 5
+
+
+def accepted_encoding(header):
+    """Encodage préféré par le client (Accept-Encoding, q-values) parmi ENCODINGS, ou None."""
+    if not COMPRESS or not header:
+        return None
+    weights = {}
+    for part in header.split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip().lower()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compressible(content_type, size):
+    return COMPRESS and size >= COMPRESS_MIN_BYTES and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress_bytes(data, encoding, best=False):
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if best else BROTLI_QUALITY)
+    # wbits=31: en-tête gzip, mtime à 0 (même sortie pour un même contenu)
+    compressor = zlib.compressobj(9 if best else COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def stream_compressor(encoding):
+    """(compress, finish) pour une réponse encodée morceau par morceau."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+# ==================== FICHIERS STATIQUES ====================
+STATIC_CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".mjs": "application/javascript; charset=utf-8",
+    ".json": "application/json; charset=utf-8",
+    ".webmanifest": "application/manifest+json; charset=utf-8",
+    ".txt": "text/plain; charset=utf-8",
+    ".xml": "application/xml; charset=utf-8",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".ico": "image/x-icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".otf": "font/otf",
+    ".eot": "application/vnd.ms-fontobject",
+    ".pdf": "application/pdf",
+    ".mp4": "video/mp4",
+    ".webm": "video/webm",
+}
+# Ressources versionnées par les pages: un jour en cache navigateur; pages et JSON revalidés
+STATIC_LONG_CACHE_EXT = {
+    ".css", ".js", ".mjs", ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".ico",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+}
+STATIC_REVALIDATE_EXT = {".html", ".json", ".webmanifest"}
+STATIC_PATHS_MAX = 4096
+
+
+class StaticFiles:
+    """Fichiers de public/ servis sans relire le disque.
+
+    Le chemin demandé est résolu (resolve(), contrôle de sortie de public/, index.html
+    des dossiers) une fois puis mémorisé; chaque requête ne coûte ensuite qu'un
+    os.stat(). Les corps sont gardés dans un LRU borné à max_bytes, par (chemin, mtime,
+    taille, encodage): fichiers de moins de file_max_bytes tels quels, versions
+    compressées quelle que soit la taille. Un fichier modifié change de clé. Les
+    fichiers plus gros ne sont pas lus en Python (sendfile).
+    """
+
+    def __init__(self, root, max_bytes=STATIC_CACHE_MAX_BYTES, file_max_bytes=STATIC_CACHE_FILE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.file_max_bytes = file_max_bytes
+        self._paths = OrderedDict()
+        self._bodies = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "notModified": 0, "sendfile": 0}
+
+    def _resolve(self, rel_path):
+        with self._lock:
+            path = self._paths.get(rel_path)
+            if path is not None:
+                self._paths.move_to_end(rel_path)
+                return path
+        path = (self.root / rel_path.lstrip("/")).resolve()
+        if self.root not in path.parents and path != self.root:
+            return None
+        if path.is_dir():
+            path = path / "index.html"
+        if not path.is_file():
+            # Chemins introuvables non mémorisés: une URL au hasard ne coûte pas de mémoire
+            return None
+        with self._lock:
+            self._paths[rel_path] = path
+            while len(self._paths) > STATIC_PATHS_MAX:
+                self._paths.popitem(last=False)
+        return path
+
+    def lookup(self, rel_path):
+        """Fichier demandé: {"path", "size", "mtime", "contentType", "etag", ...} ou None."""
+        path = self._resolve(rel_path)
+        if path is None:
+            return None
+        try:
+            info = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._paths.pop(rel_path, None)
+            return None
+        ext = path.suffix.lower()
+        if ext in STATIC_LONG_CACHE_EXT:
+            cache_control = "public, max-age=86400"
+        elif ext in STATIC_REVALIDATE_EXT:
+            cache_control = "no-cache"
+        else:
+            cache_control = None
+        return {
+            "path": path,
+            "size": info.st_size,
+            "mtimeNs": info.st_mtime_ns,
+            "mtime": info.st_mtime,
+            "contentType": STATIC_CONTENT_TYPES.get(ext, "application/octet-stream"),
+            "cacheControl": cache_control,
+            "etag": f'"{info.st_mtime_ns:x}-{info.st_size:x}"',
+        }
+
+    def body(self, entry, encoding=None):
+        """Corps du fichier (compressé si encoding), None s'il faut l'envoyer par sendfile."""
+        if encoding is None and entry["size"] > self.file_max_bytes:
+            with self._lock:
+                self.counters["sendfile"] += 1
+            return None
+        key = (str(entry["path"]), entry["mtimeNs"], entry["size"], encoding)
+        with self._lock:
+            data = self._bodies.get(key)
+            if data is not None:
+                self._bodies.move_to_end(key)
+                self.counters["hits"] += 1
+                return data
+            self.counters["misses"] += 1
+        data = entry["path"].read_bytes()
+        if encoding:
+            # Compressé une seule fois par version du fichier: niveau maximal
+            data = compress_bytes(data, encoding, best=True)
+        if len(data) <= self.max_bytes:
+            with self._lock:
+                if key not in self._bodies:
+                    self._bodies[key] = data
+                    self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, old = self._bodies.popitem(last=False)
+                    self._size -= len(old)
+        return data
+
+    def not_modified(self):
+        with self._lock:
+            self.counters["notModified"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "paths": len(self._paths), "entries": len(self._bodies), "bytes": self._size}
+
+
+def not_modified(request_headers, etag, mtime):
+    """Requête conditionnelle satisfaite (304)? If-None-Match prime sur If-Modified-Since."""
+    if_none_match = request_headers.get("If-None-Match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    since = request_headers.get("If-Modified-Since")
+    if not since:
+        return False
+    try:
+        since = email_utils.parsedate_to_datetime(since).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return False
+    return int(mtime) <= since
+
+
+def static_response(rel_path, request_headers):
+    """Réponse pour un fichier de public/: (statut, en-têtes, corps, entrée) ou None (404).
+
+    corps None avec le statut 200: envoyer entry["path"] en entier (sendfile). Partagé
+    par Handler et le moteur asyncio.
+    """
+    entry = STATIC_FILES.lookup(rel_path)
+    if entry is None:
+        return None
+    vary = compressible(entry["contentType"], entry["size"])
+    encoding = accepted_encoding(request_headers.get("Accept-Encoding")) if vary else None
+    etag = f'{entry["etag"][:-1]}-{encoding}"' if encoding else entry["etag"]
+    headers = [("ETag", etag), ("Last-Modified", email_utils.formatdate(entry["mtime"], usegmt=True))]
+    if entry["cacheControl"]:
+        headers.append(("Cache-Control", entry["cacheControl"]))
+    if vary:
+        headers.append(("Vary", "Accept-Encoding"))
+    if not_modified(request_headers, etag, entry["mtime"]):
+        STATIC_FILES.not_modified()
+        return 304, headers, b"", entry
+    body = STATIC_FILES.body(entry, encoding)
+    headers.append(("Content-Type", entry["contentType"]))
+    if encoding:
+        headers.append(("Content-Encoding", encoding))
+    headers.append(("Content-Length", str(len(body) if body is not None else entry["size"])))
+    return 200, headers, body, entry
+
+
+STATIC_FILES = StaticFiles(PUBLIC_DIR)
+
+
+# ==================== CATALOGUE MÉDIA ====================
+MEDIA_SORTS = ("newest", "oldest", "name")
+MEDIA_TYPES = ("all", "image", "video")
+
+
+def load_quiz_media_meta(root):
+    """Métadonnées des médias (légende, ordre, masqué) par nom de fichier; {} si absentes."""
+    path = root / QUIZ_2025_META_FILE
+    if not path.exists() or not path.is_file():
+        return {}
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        return raw if isinstance(raw, dict) else {}
+    except Exception:
+        return {}
+
+
+class MediaCatalog:
+    """Index en mémoire de QUIZ_2025_MEDIA_DIR, reconstruit seulement sur changement.
+
+    Une requête ne coûte au plus que deux os.stat() (dossier et fichier de métadonnées)
+    toutes les check_interval secondes: un ajout, une suppression ou un renommage change
+    le mtime du dossier, une mise à jour admin celui des métadonnées. Un fichier réécrit
+    sur place ne touche pas le dossier: rescan complet toutes les rescan_interval secondes.
+    Le snapshot garde les listes déjà triées (ordre manuel puis nom, plus ancien ou plus
+    récent) par visibilité et type: une page se découpe sans trier ni toucher le disque.
+    Les vues et téléchargements (MEDIA_EVENTS) sont ajoutés aux seuls éléments renvoyés.
+    """
+
+    def __init__(self, check_interval=MEDIA_CATALOG_CHECK_SECONDS, rescan_interval=MEDIA_CATALOG_RESCAN_SECONDS):
+        self.check_interval = check_interval
+        self.rescan_interval = rescan_interval
+        self._snapshot = None
+        self._signature = None
+        self._checked_at = 0.0
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self.counters = {"checks": 0, "rebuilds": 0}
+
+    @staticmethod
+    def _signature_of(root):
+        try:
+            folder = root.stat()
+        except OSError:
+            return None
+        try:
+            meta = (root / QUIZ_2025_META_FILE).stat()
+            meta_signature = (meta.st_mtime_ns, meta.st_size)
+        except OSError:
+            meta_signature = None
+        return (str(root), folder.st_mtime_ns, meta_signature)
+
+    @staticmethod
+    def _build(root):
+        if not root.is_dir():
+            return {"configured": root.exists(), "names": frozenset(), "views": {}, "built": time.time()}
+        meta = load_quiz_media_meta(root)
+        items = []
+        with os.scandir(root) as entries:
+            for entry in entries:
+                ext = os.path.splitext(entry.name)[1].lower()
+                if ext not in QUIZ_2025_ALLOWED_EXT:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    info = entry.stat()
+                except OSError:
+                    continue
+                file_meta = meta.get(entry.name, {}) if isinstance(meta.get(entry.name), dict) else {}
+                items.append(
+                    {
+                        "name": entry.name,
+                        "url": f"/media/{quote(entry.name)}",
+                        "type": "video" if QUIZ_2025_ALLOWED_EXT[ext].startswith("video/") else "image",
+                        "caption": str(file_meta.get("caption", "")),
+                        "order": int(file_meta.get("order", 0) or 0),
+                        "hidden": bool(file_meta.get("hidden", False)),
+                        "createdAt": datetime.datetime.fromtimestamp(info.st_mtime, tz=datetime.timezone.utc).isoformat(),
+                        "sizeBytes": int(info.st_size),
+                    }
+                )
+        # Mêmes tris que la galerie: nom, puis date, puis ordre manuel (tris stables)
+        items.sort(key=lambda x: x["name"].lower())
+        by_date = sorted(items, key=lambda x: x["createdAt"])
+        ordered = {
+            "name": sorted(items, key=lambda x: x["order"]),
+            "oldest": sorted(by_date, key=lambda x: x["order"]),
+            "newest": sorted(sorted(items, key=lambda x: x["createdAt"], reverse=True), key=lambda x: x["order"]),
+        }
+        views = {}
+        for sort, listing in ordered.items():
+            for include_hidden in (False, True):
+                visible = listing if include_hidden else [x for x in listing if not x["hidden"]]
+                views[(include_hidden, "all", sort)] = visible
+                for media_type in ("image", "video"):
+                    views[(include_hidden, media_type, sort)] = [x for x in visible if x["type"] == media_type]
+        return {"configured": True, "names": frozenset(x["name"] for x in items), "views": views, "built": time.time()}
+
+    def snapshot(self):
+        """Catalogue courant: {"configured", "names", "views": {(masqués?, type, tri): [éléments]}}."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+        with self._lock:
+            now = time.monotonic()
+            if self._snapshot is not None and now - self._checked_at < self.check_interval:
+                return self._snapshot
+            self.counters["checks"] += 1
+            root = quiz_media_root()
+            signature = self._signature_of(root)
+            stale = self.rescan_interval and now - self._built_at >= self.rescan_interval
+            if self._snapshot is None or signature != self._signature or stale:
+                self._snapshot = self._build(root)
+                self._signature = signature
+                self._built_at = now
+                self.counters["rebuilds"] += 1
+            self._checked_at = now
+            return self._snapshot
+
+    def items(self, include_hidden=False, media_type="all", sort="newest"):
+        views = self.snapshot()["views"]
+        return views.get((include_hidden, media_type, sort), [])
+
+    def invalidate(self):
+        """Après une écriture locale (métadonnées): visible dès la requête suivante."""
+        with self._lock:
+            self._checked_at = 0.0
+            self._signature = None
+
+    def stats(self):
+        snapshot = self._snapshot
+        media = len(snapshot["names"]) if snapshot else 0
+        built = datetime.datetime.fromtimestamp(snapshot["built"], tz=datetime.timezone.utc).isoformat() if snapshot else None
+        return {**self.counters, "media": media, "builtAt": built}
+
+    def reset_after_fork(self):
+        # Le snapshot reste valable; seul le verrou est recréé
+        self._lock = threading.Lock()
+
+
+MEDIA_CATALOG = MediaCatalog()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=MEDIA_CATALOG.reset_after_fork)
 
 
 # ==================== SÉCURITÉ ====================
@@ -1714,6 +3794,18 @@ def hash_password(password):
     return f"pbkdf2_sha256${iterations}${salt}${derived.hex()}"
 
 
+_DEFAULT_ADMIN_HASH = {}
+
+
+def default_admin_password_hash():
+    """Hash de ADMIN_PASSWORD (repli sans base), calculé une seule fois par processus."""
+    if not ADMIN_PASSWORD:
+        return ""
+    if ADMIN_PASSWORD not in _DEFAULT_ADMIN_HASH:
+        _DEFAULT_ADMIN_HASH[ADMIN_PASSWORD] = run_cpu(hash_password, ADMIN_PASSWORD)
+    return _DEFAULT_ADMIN_HASH[ADMIN_PASSWORD]
+
+
 def check_password(password, hashed):
     """Vérifie un mot de passe hashé PBKDF2. Compatibilité SHA256 legacy incluse."""
     if not password or not hashed:
@@ -1735,20 +3827,168 @@ def check_password(password, hashed):
     return hmac.compare_digest(legacy, hashed)
 
 
+# Époque des jetons admin: changer l'époque révoque tous les jetons émis.
+# Stockée dans admin_config pour être partagée entre workers, relue au plus
+# toutes les ADMIN_AUTH_REFRESH_SECONDS secondes avec la date de mise à jour
+# du mot de passe, qui invalide le cache des identifiants Basic.
+_ADMIN_AUTH_STATE = {"epoch": "0", "passwordUpdatedAt": None, "checkedAt": float("-inf"), "generation": 0}
+_ADMIN_AUTH_CACHE = OrderedDict()
+_ADMIN_AUTH_LOCK = threading.Lock()
+
+
+def _refresh_admin_auth_state():
+    now = time.monotonic()
+    with _ADMIN_AUTH_LOCK:
+        if now - _ADMIN_AUTH_STATE["checkedAt"] < ADMIN_AUTH_REFRESH_SECONDS or not db_ready():
+            return
+        # Un seul thread relit la base, les autres gardent l'état connu
+        _ADMIN_AUTH_STATE["checkedAt"] = now
+    try:
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    select key, value, updatedAt from admin_config
+                    where key in ('admin_token_epoch', 'admin_password_hash')
+                    """
+                )
+                rows = {row[0]: row for row in cur.fetchall()}
+    except Exception as error:
+        logger.warning(f"Lecture de l'état d'authentification admin impossible: {error}")
+        return
+    with _ADMIN_AUTH_LOCK:
+        epoch_row = rows.get("admin_token_epoch")
+        if epoch_row and epoch_row[1]:
+            _ADMIN_AUTH_STATE["epoch"] = str(epoch_row[1])
+        password_row = rows.get("admin_password_hash")
+        updated_at = password_row[2] if password_row else None
+        if updated_at != _ADMIN_AUTH_STATE["passwordUpdatedAt"]:
+            _ADMIN_AUTH_STATE["passwordUpdatedAt"] = updated_at
+            _clear_admin_auth_cache_locked()
+
+
+def admin_token_epoch():
+    _refresh_admin_auth_state()
+    with _ADMIN_AUTH_LOCK:
+        return _ADMIN_AUTH_STATE["epoch"]
+
+
+def _clear_admin_auth_cache_locked():
+    _ADMIN_AUTH_CACHE.clear()
+    _ADMIN_AUTH_STATE["generation"] += 1
+
+
+def clear_admin_auth_cache():
+    with _ADMIN_AUTH_LOCK:
+        _clear_admin_auth_cache_locked()
+
+
+def admin_auth_cache_key(authorization):
+    """Empreinte HMAC de l'en-tête Authorization: le mot de passe n'est jamais gardé en clair."""
+    return hmac.new(ADMIN_TOKEN_SECRET.encode("utf-8"), authorization.encode("utf-8"), hashlib.sha256).digest()
+
+
+def admin_auth_cache_lookup(key):
+    """Retourne (trouvé, génération). La génération sert à ignorer un store devenu obsolète."""
+    _refresh_admin_auth_state()
+    now = time.monotonic()
+    with _ADMIN_AUTH_LOCK:
+        generation = _ADMIN_AUTH_STATE["generation"]
+        expires_at = _ADMIN_AUTH_CACHE.get(key)
+        if expires_at is None:
+            return False, generation
+        if expires_at <= now:
+            del _ADMIN_AUTH_CACHE[key]
+            return False, generation
+        _ADMIN_AUTH_CACHE.move_to_end(key)
+        return True, generation
+
+
+def admin_auth_cache_store(key, generation):
+    """Mémorise une vérification réussie (jamais un échec)."""
+    if ADMIN_AUTH_CACHE_TTL <= 0 or ADMIN_AUTH_CACHE_SIZE <= 0:
+        return
+    with _ADMIN_AUTH_LOCK:
+        # Le mot de passe a changé pendant la vérification: ne rien mémoriser
+        if generation != _ADMIN_AUTH_STATE["generation"]:
+            return
+        _ADMIN_AUTH_CACHE[key] = time.monotonic() + ADMIN_AUTH_CACHE_TTL
+        _ADMIN_AUTH_CACHE.move_to_end(key)
+        while len(_ADMIN_AUTH_CACHE) > ADMIN_AUTH_CACHE_SIZE:
+            _ADMIN_AUTH_CACHE.popitem(last=False)
+
+
+def revoke_admin_tokens(conn=None):
+    """Change l'époque: tous les jetons admin existants deviennent invalides."""
+    epoch = secrets.token_hex(8)
+    with _ADMIN_AUTH_LOCK:
+        _ADMIN_AUTH_STATE["epoch"] = epoch
+        _ADMIN_AUTH_STATE["checkedAt"] = time.monotonic()
+    if conn is not None:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                insert into admin_config (key, value)
+                values ('admin_token_epoch', %s)
+                on conflict (key) do update set value = excluded.value, updatedAt = now()
+                """,
+                (epoch,),
+            )
+    return epoch
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign_admin_token(body):
+    return hmac.new(ADMIN_TOKEN_SECRET.encode("utf-8"), body.encode("ascii"), hashlib.sha256).digest()
+
+
+def issue_admin_token(username):
+    """Émet un jeton signé: base64url(json) + "." + base64url(hmac-sha256)."""
+    expires_at = int(time.time()) + ADMIN_TOKEN_TTL
+    claims = {"sub": username, "exp": expires_at, "ep": admin_token_epoch()}
+    body = _b64url(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{body}.{_b64url(_sign_admin_token(body))}", expires_at
+
+
+def verify_admin_token(token):
+    body, _, signature = token.partition(".")
+    if not body or not signature:
+        return False
+    try:
+        if not hmac.compare_digest(_b64url_decode(signature), _sign_admin_token(body)):
+            return False
+        claims = json.loads(_b64url_decode(body))
+    except (ValueError, UnicodeError):
+        return False
+    if not isinstance(claims, dict) or claims.get("sub") != ADMIN_USERNAME:
+        return False
+    if not isinstance(claims.get("exp"), int) or claims["exp"] <= time.time():
+        return False
+    return hmac.compare_digest(str(claims.get("ep", "")), admin_token_epoch())
+
+
 def check_rate_limit(ip, action):
     rule = RATE_LIMIT_RULES.get(action)
     if not rule:
         return True
     now = time.time()
-    entries = RATE_LIMITS.get(ip, {}).get(action, [])
-    window = rule["window"]
-    entries = [t for t in entries if now - t < window]
-    if len(entries) >= rule["limit"]:
+    with _STATE_LOCK:
+        entries = RATE_LIMITS.get(ip, {}).get(action, [])
+        window = rule["window"]
+        entries = [t for t in entries if now - t < window]
+        if len(entries) >= rule["limit"]:
+            RATE_LIMITS.setdefault(ip, {})[action] = entries
+            return False
+        entries.append(now)
         RATE_LIMITS.setdefault(ip, {})[action] = entries
-        return False
-    entries.append(now)
-    RATE_LIMITS.setdefault(ip, {})[action] = entries
-    return True
+        return True
 
 
 def normalize_whatsapp(value):
@@ -1906,7 +4146,1512 @@ def send_candidate_confirmation_email(candidate_id, full_name, email):
         logger.error(f"Erreur envoi email de confirmation à {email}: {e}")
 
 
+# ==================== LISTEN/NOTIFY ====================
+LISTEN_HEARTBEAT_SECONDS = 30
+
+
+class NotifyListener:
+    """Une connexion LISTEN par processus, partagée par les caches en mémoire.
+
+    subscribe(canal, on_notify, on_connect): on_notify(payload) à chaque notification
+    du canal, on_connect() à chaque (re)connexion, pour rattraper ce qui a pu être
+    manqué pendant une coupure. Les callbacks tournent sur le thread d'écoute.
+    """
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.listening = False
+        self.counters = {"notifications": 0, "connections": 0}
+
+    def subscribe(self, channel, on_notify, on_connect=None):
+        with self._lock:
+            self._channels[channel] = (on_notify, on_connect)
+
+    def ensure_started(self):
+        if self._thread is not None or not self._channels or not db_ready():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen_loop, name="db-listen", daemon=True)
+                self._thread.start()
+
+    def _listen_loop(self):
+        while True:
+            try:
+                # Connexion dédiée hors pool: elle reste occupée par LISTEN
+                with psycopg.connect(DATABASE_URL, autocommit=True, connect_timeout=DB_WAKE_TIMEOUT) as conn:
+                    channels = dict(self._channels)
+                    for channel in channels:
+                        conn.execute(f"listen {channel}")
+                    self.listening = True
+                    self.counters["connections"] += 1
+                    for _, on_connect in channels.values():
+                        if on_connect:
+                            on_connect()
+                    while True:
+                        notified = False
+                        for notify in conn.notifies(timeout=LISTEN_HEARTBEAT_SECONDS):
+                            notified = True
+                            self.counters["notifications"] += 1
+                            on_notify, _ = channels.get(notify.channel, (None, None))
+                            if on_notify:
+                                on_notify(notify.payload)
+                        if not notified:
+                            # Connexion silencieuse: vérifier qu'elle est toujours vivante
+                            conn.execute("select 1")
+            except Exception as error:
+                logger.warning(f"Écoute LISTEN/NOTIFY interrompue: {error}")
+            self.listening = False
+            time.sleep(DB_BREAKER_PROBE_INTERVAL)
+
+    def stats(self):
+        return {**self.counters, "listening": self.listening, "channels": sorted(self._channels)}
+
+    def reset_after_fork(self):
+        # Le thread d'écoute du parent n'existe pas dans l'enfant
+        self._lock = threading.Lock()
+        self._thread = None
+        self.listening = False
+
+
+LISTENER = NotifyListener()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=LISTENER.reset_after_fork)
+
+
+# ==================== PARAMÈTRES DU TOURNOI ====================
+SETTINGS_CHANNEL = "tournament_settings"
+PUBLIC_SETTINGS_DEFAULTS = {
+    "votingEnabled": 0,
+    "registrationLocked": 0,
+    "competitionClosed": 0,
+    "announcementText": "",
+    "scheduleJson": "[]",
+}
+
+
+class SettingsCache:
+    """Ligne tournament_settings (id = 1) en mémoire, clés en camelCase.
+
+    LISTENER écoute le canal NOTIFY "tournament_settings" (trigger posé par la
+    migration 0005) et la ligne est rechargée à chaque modification, quelle qu'en soit
+    l'origine. Filet de sécurité: get() recharge aussi toute valeur plus vieille que
+    SETTINGS_REFRESH_SECONDS. Si la base ne répond pas, la dernière valeur connue sert.
+    """
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._row = None
+        self._next_refresh = float("-inf")
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.counters = {"loads": 0, "notifications": 0, "errors": 0}
+        if SETTINGS_LISTEN:
+            # Notifications perdues pendant une coupure de l'écoute: on relit une fois
+            LISTENER.subscribe(SETTINGS_CHANNEL, self._on_notify, self.try_refresh)
+
+    def get(self):
+        LISTENER.ensure_started()
+        row = self._row
+        if row is not None and time.monotonic() < self._next_refresh:
+            return row
+        if row is None:
+            return self.refresh()
+        # Valeur périmée: un seul thread relit la base, les autres gardent l'ancienne
+        try:
+            return self.refresh(wait=False)
+        except Exception as error:
+            logger.warning(f"Rechargement des paramètres du tournoi impossible: {error}")
+            return row
+
+    def refresh(self, wait=True):
+        """Relit la ligne en base et la retourne. Les lectures sont sérialisées: la
+        dernière lancée est aussi la dernière appliquée. wait=False: si une lecture est
+        déjà en cours, retourne la valeur actuelle sans attendre."""
+        if not self._refresh_lock.acquire(blocking=wait):
+            return self._row
+        try:
+            try:
+                with get_conn() as conn:
+                    with conn.cursor(row_factory=dict_row) as cur:
+                        row = STATEMENTS.execute(cur, "settings_row").fetchone()
+            except Exception:
+                with self._lock:
+                    self.counters["errors"] += 1
+                    # Pas de nouvel essai à chaque requête pendant une panne
+                    self._next_refresh = time.monotonic() + min(self.max_age, DB_BREAKER_PROBE_INTERVAL)
+                raise
+            row = _row_to_camel(row or {})
+            with self._lock:
+                changed = self._row is not None and row != self._row
+                self._row = row
+                self._next_refresh = time.monotonic() + self.max_age
+                self._loaded_at = time.time()
+                self.counters["loads"] += 1
+        finally:
+            self._refresh_lock.release()
+        if changed:
+            # /api/public-settings a pu être mis en cache avec l'ancienne ligne
+            DATA_VERSION.bump()
+        return row
+
+    def try_refresh(self):
+        try:
+            self.refresh()
+            return True
+        except Exception as error:
+            logger.warning(f"Rechargement des paramètres du tournoi impossible: {error}")
+            return False
+
+    def public(self):
+        """Clés camelCase, plus pour une version les anciennes clés en minuscules
+        (votingenabled...) qu'/api/public-settings renvoyait tel que lu par psycopg."""
+        row = self.get()
+        public = {key: row.get(key, default) for key, default in PUBLIC_SETTINGS_DEFAULTS.items()}
+        public.update({key.lower(): value for key, value in public.items()})
+        return public
+
+    def voting_open(self):
+        row = self.get()
+        return int(row.get("votingEnabled") or 0) == 1 and int(row.get("competitionClosed") or 0) != 1
+
+    def registration_open(self):
+        row = self.get()
+        return int(row.get("registrationLocked") or 0) != 1 and int(row.get("competitionClosed") or 0) != 1
+
+    def _on_notify(self, payload):
+        self.counters["notifications"] += 1
+        self.try_refresh()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counters,
+                "listening": SETTINGS_LISTEN and LISTENER.listening,
+                "age": round(time.time() - self._loaded_at, 1) if self._loaded_at else None,
+            }
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+
+SETTINGS = SettingsCache(SETTINGS_REFRESH_SECONDS)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=SETTINGS.reset_after_fork)
+
+
+# ==================== CACHE DES RÉPONSES PUBLIQUES ====================
+DATA_VERSION_CHANNEL = "data_version"
+RESPONSE_CACHE_MAX_ENTRIES = 64
+
+
+class DataVersion:
+    """Version des données publiques dans ce processus.
+
+    Incrémentée à chaque notification "data_version" (triggers de la migration 0008 sur
+    candidates, votes, scores et tournament_settings, quelle que soit l'origine de
+    l'écriture), à chaque écriture faite par ce processus (bump) et à chaque reconnexion
+    de l'écoute. NOTIFY n'est délivré qu'au commit: une réponse calculée sous la version
+    courante ne peut pas précéder une écriture déjà signalée. Sans écoute active,
+    current() retourne None et rien n'est mis en cache.
+    """
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+        if PUBLIC_CACHE:
+            LISTENER.subscribe(DATA_VERSION_CHANNEL, self.bump, self.bump)
+
+    def bump(self, payload=None):
+        with self._lock:
+            self.value += 1
+
+    def current(self):
+        if not PUBLIC_CACHE:
+            return None
+        LISTENER.ensure_started()
+        return self.value if LISTENER.listening else None
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+
+
+class ResponseCache:
+    """Réponses JSON encodées par route, valides pour une version.
+
+    L'ETag est fort: empreinte du corps, identique d'un worker à l'autre pour un même
+    contenu. Les entrées d'une version dépassée sont remplacées à la lecture suivante.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "notModified": 0}
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["version"] != version:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry
+
+    def fresh(self, key, version):
+        """Entrée valide pour cette version? Sans compter de hit ni toucher l'ordre LRU."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry["version"] == version
+
+    def put(self, key, version, body):
+        entry = {
+            "version": version,
+            "body": body,
+            "etag": f'"{hashlib.blake2s(body, digest_size=12).hexdigest()}"',
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def variant(self, entry, encoding):
+        """Corps compressé de l'entrée, calculé à la première demande de cet encodage."""
+        variants = entry.setdefault("variants", {})
+        data = variants.get(encoding)
+        if data is None:
+            data = variants[encoding] = compress_bytes(entry["body"], encoding)
+        return data
+
+    def not_modified(self):
+        with self._lock:
+            self.counters["notModified"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "entries": len(self._entries), "version": DATA_VERSION.value}
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+
+
+def etag_matches(header, etag):
+    """If-None-Match: "*" ou liste d'ETags (comparaison faible, comme le veut la RFC 9110)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+DATA_VERSION = DataVersion()
+RESPONSE_CACHE = ResponseCache()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=DATA_VERSION.reset_after_fork)
+    os.register_at_fork(after_in_child=RESPONSE_CACHE.reset_after_fork)
+
+
+# ==================== INGESTION DES VOTES ====================
+VOTE_INGEST_COLUMNS = ("ingestId", "candidateId", "voterName", "voterContact", "ip", "createdAt")
+_vote_ingestor = None
+
+
+class VoteDedupIndex:
+    """Votes du jour UTC par (candidat, ip), en mémoire, rangés par jour.
+
+    Même règle que la table vote_dedup (un vote par candidat, ip et jour UTC): un
+    vote de 23:59 UTC n'empêche pas celui de 00:01 UTC. Les jours passés sont
+    supprimés en bloc. Préchargé depuis vote_dedup au démarrage (warm). Entre
+    workers, la table reste l'arbitre: cet index évite seulement l'aller-retour en base.
+    """
+
+    def __init__(self, prune_seconds=3600):
+        self.prune_seconds = prune_seconds
+        self._days = {}
+        self._lock = threading.Lock()
+        self._warm_state = None
+        self._next_prune = 0.0
+
+    @staticmethod
+    def utc_day(timestamp):
+        return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).date().toordinal()
+
+    def _find_locked(self, key, day):
+        for old in [d for d in self._days if d < day]:
+            del self._days[old]
+        return key in self._days.get(day, ())
+
+    def _add_locked(self, key, day):
+        self._days.setdefault(day, set()).add(key)
+
+    def seen(self, candidate_id, ip, now=None):
+        day = self.utc_day(time.time() if now is None else now)
+        with self._lock:
+            return self._find_locked((candidate_id, ip), day)
+
+    def add(self, candidate_id, ip, created=None):
+        day = self.utc_day(time.time() if created is None else created)
+        with self._lock:
+            self._add_locked((candidate_id, ip), day)
+
+    def claim(self, candidate_id, ip, now=None):
+        """Vérifie et enregistre d'un bloc. Retourne False si déjà voté ce jour UTC."""
+        day = self.utc_day(time.time() if now is None else now)
+        with self._lock:
+            if self._find_locked((candidate_id, ip), day):
+                return False
+            self._add_locked((candidate_id, ip), day)
+            return True
+
+    def forget(self, candidate_id, ip):
+        with self._lock:
+            for entries in self._days.values():
+                entries.discard((candidate_id, ip))
+
+    def warm(self):
+        """Charge les réservations du jour UTC depuis vote_dedup (une fois par processus)."""
+        with get_conn() as conn:
+            rows = conn.execute(
+                "select candidateId, ip, day from vote_dedup where day >= (now() at time zone 'UTC')::date"
+            ).fetchall()
+        with self._lock:
+            for candidate_id, ip, day in rows:
+                self._add_locked((candidate_id, ip), day.toordinal())
+            self._warm_state = "done"
+        logger.info(f"Index anti-doublon des votes préchargé: {len(rows)} paire(s) candidat/ip")
+
+    def ensure_warm(self):
+        """Lance le préchargement en arrière-plan s'il n'a pas encore eu lieu."""
+        with self._lock:
+            if self._warm_state is not None:
+                return
+            self._warm_state = "running"
+        threading.Thread(target=self._warm_in_background, name="vote-dedup-warm", daemon=True).start()
+
+    def _warm_in_background(self):
+        try:
+            self.warm()
+        except Exception as error:
+            logger.warning(f"Préchargement de l'index anti-doublon impossible: {error}")
+            with self._lock:
+                self._warm_state = None
+
+    def maybe_prune_db(self):
+        """Supprime les réservations de plus d'un jour, au plus une fois par heure et par processus."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_prune:
+                return
+            self._next_prune = now + self.prune_seconds
+        try:
+            with get_conn() as conn:
+                conn.execute("delete from vote_dedup where day < (now() at time zone 'UTC')::date - 1")
+        except Exception as error:
+            logger.warning(f"Purge de vote_dedup impossible: {error}")
+
+    def stats(self):
+        with self._lock:
+            return {"days": len(self._days), "entries": sum(len(e) for e in self._days.values())}
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+        if self._warm_state == "running":
+            self._warm_state = None
+
+
+VOTE_DEDUP = VoteDedupIndex()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=VOTE_DEDUP.reset_after_fork)
+
+
+class VoteIngestor:
+    """Ingestion bufferisée des votes (VOTE_INGEST_MODE=buffered).
+
+    accept() valide le vote contre un état en mémoire (paramètres du tournoi,
+    candidats, votes du jour UTC), l'ajoute au journal du processus
+    (VOTE_SPOOL_DIR/votes-<pid>-*.jsonl, fsync, verrou flock) puis répond 202: vote
+    reçu, pas encore compté. La table vote_dedup reste l'arbitre au moment de
+    l'écriture: un vote déjà réservé par un autre worker ou par la route directe y
+    est écarté, compté dans counters["rejected"] (/api/health) et journalisé.
+    Un thread vide le tampon toutes les VOTE_FLUSH_INTERVAL secondes ou dès
+    VOTE_FLUSH_BATCH votes: COPY dans une table temporaire puis un seul insert
+    ... on conflict (ingestId) do nothing. Un segment de journal n'est supprimé
+    qu'après le commit; les segments d'un processus mort (flock libre) sont
+    rejoués, sans doublon grâce à ingestId.
+    """
+
+    def __init__(self, spool_dir):
+        self.spool_dir = Path(spool_dir)
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending = []
+        self._segments = []
+        self._handle = None
+        self._path = None
+        self._seq = 0
+        self._candidates = set()
+        self._state_at = None
+        self._stopping = False
+        self._thread = None
+        self.counters = {
+            "accepted": 0,
+            "flushed": 0,
+            "inserted": 0,
+            "rejected": 0,
+            "batches": 0,
+            "flushErrors": 0,
+            "rotateErrors": 0,
+            "lastFlushMs": 0.0,
+        }
+
+    # ---------- cycle de vie ----------
+    def start(self):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._open_segment_locked()
+        self._refresh_state()
+        try:
+            VOTE_DEDUP.warm()
+        except Exception as error:
+            logger.warning(f"Préchargement de l'index anti-doublon impossible: {error}")
+            VOTE_DEDUP.ensure_warm()
+        self._recover_orphans()
+        self._thread = threading.Thread(target=self._run, name="vote-ingest", daemon=True)
+        self._thread.start()
+        logger.info(f"Ingestion des votes bufferisée: journal {self.spool_dir}, lot {VOTE_FLUSH_BATCH}, {VOTE_FLUSH_INTERVAL}s")
+
+    def stop(self, timeout=10):
+        with self._wake:
+            self._stopping = True
+            self._wake.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._lock:
+            left = len(self._pending) + sum(len(votes) for _, _, votes in self._segments)
+            if not self._pending and self._handle is not None:
+                os.unlink(self._path)
+            for handle in [self._handle] + [h for _, h, _ in self._segments]:
+                if handle is not None:
+                    handle.close()
+            self._handle = None
+        if left:
+            logger.warning(f"{left} vote(s) non écrit(s) en base, conservés dans {self.spool_dir}")
+
+    # ---------- acceptation ----------
+    def accept(self, candidate_id, ip, voter_name, voter_contact):
+        """Retourne (statut HTTP, message) comme la route directe, mais 202 au lieu de 201:
+        le doublon éventuel n'est tranché qu'à l'écriture du lot."""
+        if self._state_at is None:
+            raise DatabaseUnavailable()
+        if not SETTINGS.voting_open():
+            return 403, "Votes fermés."
+        if candidate_id not in self._candidates and not self._candidate_exists(candidate_id):
+            return 404, "Candidat introuvable."
+        now = time.time()
+        vote = {
+            "ingestId": str(uuid.uuid4()),
+            "candidateId": candidate_id,
+            "voterName": voter_name,
+            "voterContact": voter_contact,
+            "ip": ip,
+            "createdAt": datetime.datetime.fromtimestamp(now, datetime.timezone.utc).isoformat(),
+        }
+        line = (json.dumps(vote, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._wake:
+            if len(self._pending) + sum(len(votes) for _, _, votes in self._segments) >= VOTE_BUFFER_MAX:
+                raise APIError("Trop de votes en attente, réessayez dans quelques secondes.", 503, headers={"Retry-After": "5"})
+            if not VOTE_DEDUP.claim(candidate_id, ip, now):
+                return 429, "Vote déjà enregistré pour ce candidat."
+            try:
+                self._handle.write(line)
+                self._handle.flush()
+                if VOTE_SPOOL_FSYNC:
+                    os.fsync(self._handle.fileno())
+            except OSError:
+                VOTE_DEDUP.forget(candidate_id, ip)
+                raise
+            self._pending.append(vote)
+            self.counters["accepted"] += 1
+            if len(self._pending) >= VOTE_FLUSH_BATCH:
+                self._wake.notify()
+        return 202, "Vote reçu, il sera comptabilisé sous peu."
+
+    def _candidate_exists(self, candidate_id):
+        # Candidat inscrit depuis le dernier rafraîchissement
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                found = STATEMENTS.execute(cur, "candidate_exists", {"candidateId": candidate_id}).fetchone()
+        if found:
+            with self._lock:
+                self._candidates.add(candidate_id)
+        return bool(found)
+
+    # ---------- journal ----------
+    def _open_segment_locked(self):
+        self._seq += 1
+        name = f"votes-{self.pid}-{secrets.token_hex(4)}-{self._seq}.jsonl"
+        # Créé sous un nom hors du motif votes-*.jsonl, verrouillé, puis renommé: la reprise
+        # des orphelins d'un autre worker ne peut pas le prendre avant le verrou
+        temp = self.spool_dir / f".{name}.tmp"
+        handle = open(temp, "ab")
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            os.rename(temp, self.spool_dir / name)
+        except OSError:
+            handle.close()
+            with contextlib.suppress(OSError):
+                os.unlink(temp)
+            raise
+        self._handle, self._path = handle, self.spool_dir / name
+
+    def _rotate_locked(self):
+        """Passe le segment courant à l'écriture en base. En cas d'échec, rien ne change."""
+        if not self._pending:
+            return
+        segment = (self._path, self._handle, self._pending)
+        self._open_segment_locked()
+        self._segments.append(segment)
+        self._pending = []
+
+    # ---------- écriture en base ----------
+    def _run(self):
+        next_refresh = time.monotonic() + VOTE_STATE_REFRESH
+        while True:
+            with self._wake:
+                if not self._stopping:
+                    self._wake.wait_for(
+                        lambda: self._stopping or len(self._pending) >= VOTE_FLUSH_BATCH,
+                        timeout=VOTE_FLUSH_INTERVAL,
+                    )
+                stopping = self._stopping
+                try:
+                    self._rotate_locked()
+                except OSError as error:
+                    # Les votes restent dans le segment courant, qui continue de servir
+                    self.counters["rotateErrors"] += 1
+                    logger.error(f"Nouveau segment de journal impossible, nouvel essai: {error}")
+            flushed = self._flush_segments()
+            if stopping:
+                return
+            if not flushed:
+                time.sleep(min(5.0, VOTE_FLUSH_INTERVAL * 4))
+            if time.monotonic() >= next_refresh:
+                next_refresh = time.monotonic() + VOTE_STATE_REFRESH
+                self._refresh_state()
+                try:
+                    self._recover_orphans()
+                    VOTE_DEDUP.maybe_prune_db()
+                except Exception as error:
+                    logger.error(f"Reprise des journaux de votes impossible: {error}")
+
+    def _flush_segments(self):
+        while True:
+            with self._lock:
+                if not self._segments:
+                    return True
+                path, handle, votes = self._segments[0]
+            try:
+                inserted = self._write_batch(votes)
+            except Exception as error:
+                self.counters["flushErrors"] += 1
+                logger.error(f"Écriture de {len(votes)} vote(s) impossible, nouvel essai: {error}")
+                return False
+            rejected = len(votes) - inserted
+            with self._lock:
+                self._segments.pop(0)
+                self.counters["flushed"] += len(votes)
+                self.counters["inserted"] += inserted
+                self.counters["rejected"] += rejected
+            if rejected:
+                logger.warning(
+                    f"{rejected} vote(s) sur {len(votes)} écarté(s) à l'écriture: déjà voté ce jour "
+                    "(autre worker ou route directe) ou candidat supprimé"
+                )
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            handle.close()
+
+    def _write_batch(self, votes):
+        started = time.perf_counter()
+        with get_conn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    create temp table if not exists vote_ingest (
+                      ingestId uuid, candidateId bigint, voterName text,
+                      voterContact text, ip text, createdAt timestamp with time zone
+                    ) on commit delete rows
+                    """
+                )
+                with cur.copy(f"copy vote_ingest ({', '.join(VOTE_INGEST_COLUMNS)}) from stdin") as copy:
+                    for vote in votes:
+                        copy.write_row([vote.get(column) for column in VOTE_INGEST_COLUMNS])
+                STATEMENTS.execute(cur, "vote_ingest")
+                inserted = max(cur.rowcount, 0)
+            conn.commit()
+        self.counters["batches"] += 1
+        self.counters["lastFlushMs"] = round((time.perf_counter() - started) * 1000, 2)
+        return inserted
+
+    def _recover_orphans(self):
+        """Rejoue les journaux laissés par un processus arrêté brutalement."""
+        for name in glob.glob(str(self.spool_dir / ".votes-*.jsonl.tmp")):
+            # Segment créé mais jamais renommé (arrêt entre les deux): toujours vide. Le
+            # propriétaire le renomme aussitôt verrouillé, seuls les anciens sont supprimés.
+            with contextlib.suppress(FileNotFoundError):
+                if time.time() - os.stat(name).st_mtime > 60:
+                    os.unlink(name)
+        for name in glob.glob(str(self.spool_dir / "votes-*.jsonl")):
+            path = Path(name)
+            with self._lock:
+                if path == self._path or any(path == p for p, _, _ in self._segments):
+                    continue
+            try:
+                handle = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()  # Journal d'un processus vivant
+                continue
+            votes = []
+            for raw in handle:
+                try:
+                    votes.append(json.loads(raw))
+                except ValueError:
+                    pass  # Dernière ligne tronquée par l'arrêt
+            try:
+                inserted = self._write_batch(votes) if votes else 0
+            except Exception as error:
+                logger.error(f"Reprise du journal {path.name} impossible: {error}")
+                handle.close()
+                return
+            # Un autre worker a pu reprendre ce journal en même temps (insert idempotent)
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            handle.close()
+            logger.info(f"Journal de votes {path.name} repris: {len(votes)} vote(s), {inserted} inséré(s)")
+
+    def _refresh_state(self):
+        try:
+            with get_conn() as conn:
+                with conn.cursor() as cur:
+                    candidates = {row[0] for row in STATEMENTS.execute(cur, "candidate_ids").fetchall()}
+        except Exception as error:
+            logger.warning(f"Rafraîchissement de l'état des votes impossible: {error}")
+            return
+        with self._lock:
+            self._candidates = candidates
+            self._state_at = time.time()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counters,
+                "pending": len(self._pending) + sum(len(votes) for _, _, votes in self._segments),
+                "stateAge": round(time.time() - self._state_at, 1) if self._state_at else None,
+            }
+
+
+def start_vote_ingestor():
+    """Démarre l'ingestion bufferisée dans ce processus si VOTE_INGEST_MODE=buffered."""
+    global _vote_ingestor
+    if VOTE_INGEST_MODE != "buffered" or not db_ready():
+        return None
+    if fcntl is None:
+        logger.warning("VOTE_INGEST_MODE=buffered indisponible sur cette plateforme, votes directs.")
+        return None
+    if _vote_ingestor is None or _vote_ingestor.pid != os.getpid():
+        _vote_ingestor = VoteIngestor(VOTE_SPOOL_DIR)
+        _vote_ingestor.start()
+    return _vote_ingestor
+
+
+def stop_vote_ingestor():
+    global _vote_ingestor
+    if _vote_ingestor is not None and _vote_ingestor.pid == os.getpid():
+        _vote_ingestor.stop()
+    _vote_ingestor = None
+
+
+# ==================== SERVEUR HTTP ====================
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer qui traite les requêtes dans un pool de threads borné.
+
+    Un thread du pool ne sert que des requêtes déjà reçues. Une connexion qui attend
+    sa requête (nouvelle connexion, keep-alive inactif) est surveillée par un seul
+    thread "http-idle" (selectors) et rendue au pool dès que des données arrivent;
+    elle est fermée sans réponse après HTTP_SOCKET_TIMEOUT (première requête) ou
+    HTTP_KEEPALIVE_TIMEOUT (entre deux requêtes).
+
+    Au-delà de HTTP_MAX_CONNECTIONS connexions ouvertes, la boucle d'accept se
+    bloque: les nouvelles connexions patientent dans le backlog du noyau. Quand les
+    workers et la file d'attente sont occupés, les connexions prêtes attendent leur
+    tour (dans l'ordre d'arrivée) au lieu de créer des threads sans limite. Le thread
+    http-idle ne se bloque jamais: les échéances keep-alive continuent d'expirer.
+    """
+
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        server_address,
+        handler_class,
+        workers=HTTP_WORKERS,
+        queue_size=HTTP_QUEUE_SIZE,
+        bind_and_activate=True,
+        max_connections=HTTP_MAX_CONNECTIONS,
+    ):
+        super().__init__(server_address, handler_class, bind_and_activate)
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-worker")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._connections = threading.BoundedSemaphore(max_connections)
+        self._inflight = 0
+        self._inflight_cond = threading.Condition()
+        # Requêtes déjà servies par connexion reprise (limite HTTP_KEEPALIVE_MAX_REQUESTS)
+        self._served = {}
+        # Connexions en attente: remises au thread http-idle via _incoming, puis dans
+        # _waiting (socket -> adresse, requêtes servies, échéance), propre à ce thread
+        self._incoming = deque()
+        self._waiting = {}
+        # Connexions lisibles sans place libre (thread http-idle); _want_slot demande à
+        # _release_slot() de réveiller ce thread
+        self._ready = deque()
+        self._want_slot = False
+        self._idle_lock = threading.Lock()
+        self._idle_thread = None
+        self._idle_closed = False
+        self._selector = None
+        self._waker = None
+
+    def process_request(self, request, client_address):
+        self._connections.acquire()
+        self._watch(request, client_address, 0, HTTP_SOCKET_TIMEOUT)
+
+    def finish_request(self, request, client_address):
+        # Le handler est retourné: _process_request_worker regarde s'il rend la connexion
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def shutdown_request(self, request):
+        super().shutdown_request(request)
+        self._connections.release()
+
+    def requests_served(self, request):
+        """Requêtes déjà servies sur cette connexion (0 pour une nouvelle connexion)."""
+        return self._served.pop(request, 0)
+
+    def keepalive_linger(self):
+        """Attente de la requête suivante sur le thread: aucune si des requêtes attendent un worker."""
+        return 0 if self._inflight > self.workers else HTTP_KEEPALIVE_LINGER
+
+    def _process_request_worker(self, request, client_address):
+        handler = None
+        try:
+            handler = self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            if handler is not None and handler._hand_back:
+                timeout = HTTP_KEEPALIVE_TIMEOUT or HTTP_SOCKET_TIMEOUT
+                self._watch(request, client_address, handler._requests_on_connection, timeout)
+            else:
+                self.shutdown_request(request)
+            self._release_slot()
+
+    def _dispatch(self, request, client_address, served):
+        """Thread http-idle: confie la connexion au pool. Ne bloque pas: retourne False si
+        workers et file sont occupés."""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._inflight_cond:
+            self._inflight += 1
+        if served:
+            self._served[request] = served
+        try:
+            self._executor.submit(self._process_request_worker, request, client_address)
+        except RuntimeError:
+            # Pool déjà arrêté (arrêt en cours)
+            self._served.pop(request, None)
+            self.shutdown_request(request)
+            self._release_slot()
+        return True
+
+    def _dispatch_ready(self):
+        # Demander le réveil avant d'essayer: une place rendue entre l'échec et la
+        # prochaine attente du sélecteur n'est pas perdue
+        self._want_slot = bool(self._ready)
+        while self._ready:
+            request, client_address, served = self._ready[0]
+            if not self._dispatch(request, client_address, served):
+                return
+            self._ready.popleft()
+        self._want_slot = False
+
+    def _release_slot(self):
+        self._slots.release()
+        with self._inflight_cond:
+            self._inflight -= 1
+            self._inflight_cond.notify_all()
+        if self._want_slot:
+            self._wake_idle()
+
+    # ---------- connexions en attente de requête ----------
+    def _watch(self, request, client_address, served, timeout):
+        """Confie la connexion au thread http-idle jusqu'à ce qu'elle soit lisible."""
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._idle_lock:
+            closed = self._idle_closed
+            if not closed:
+                if self._idle_thread is None:
+                    self._start_idle_thread_locked()
+                self._incoming.append((request, client_address, served, deadline))
+        if closed:
+            self.shutdown_request(request)
+        else:
+            self._wake_idle()
+
+    def _start_idle_thread_locked(self):
+        self._selector = selectors.DefaultSelector()
+        self._waker = socket.socketpair()
+        for end in self._waker:
+            end.setblocking(False)
+        self._selector.register(self._waker[0], selectors.EVENT_READ)
+        self._idle_thread = threading.Thread(target=self._idle_loop, name="http-idle", daemon=True)
+        self._idle_thread.start()
+
+    def _wake_idle(self):
+        with contextlib.suppress(OSError):
+            self._waker[1].send(b"\0")
+
+    def _idle_loop(self):
+        next_sweep = 0.0
+        while True:
+            with self._idle_lock:
+                incoming, self._incoming = self._incoming, deque()
+                closed = self._idle_closed
+            if closed:
+                break
+            for request, client_address, served, deadline in incoming:
+                try:
+                    self._selector.register(request, selectors.EVENT_READ)
+                except (ValueError, OSError):
+                    self.shutdown_request(request)
+                    continue
+                self._waiting[request] = (client_address, served, deadline)
+            for key, _ in self._selector.select(timeout=0.5):
+                if key.fileobj is self._waker[0]:
+                    with contextlib.suppress(OSError):
+                        while self._waker[0].recv(4096):
+                            pass
+                    continue
+                self._selector.unregister(key.fileobj)
+                client_address, served, _ = self._waiting.pop(key.fileobj)
+                self._ready.append((key.fileobj, client_address, served))
+            self._dispatch_ready()
+            now = time.monotonic()
+            if now >= next_sweep:
+                next_sweep = now + 0.5
+                expired = [r for r, (_, _, deadline) in self._waiting.items() if deadline is not None and deadline <= now]
+                for request in expired:
+                    self._selector.unregister(request)
+                    del self._waiting[request]
+                    self.shutdown_request(request)
+        # Arrêt: les connexions sans requête en cours sont fermées
+        for request in list(self._waiting) + [item[0] for item in incoming]:
+            with contextlib.suppress(KeyError, ValueError):
+                self._selector.unregister(request)
+            self.shutdown_request(request)
+        self._waiting.clear()
+        # Requête reçue mais jamais prise par un worker: fermée aussi
+        while self._ready:
+            self.shutdown_request(self._ready.popleft()[0])
+
+    def _stop_idle(self):
+        with self._idle_lock:
+            self._idle_closed = True
+            thread = self._idle_thread
+        if thread is None:
+            return
+        self._wake_idle()
+        thread.join(HTTP_DRAIN_TIMEOUT)
+        if not thread.is_alive():
+            self._selector.close()
+            for end in self._waker:
+                end.close()
+
+    def drain(self, timeout=HTTP_DRAIN_TIMEOUT):
+        """Attend la fin des requêtes en cours. Retourne True si tout est terminé."""
+        deadline = time.monotonic() + max(0.0, timeout)
+        with self._inflight_cond:
+            while self._inflight > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._inflight_cond.wait(remaining)
+            return self._inflight == 0
+
+    def server_close(self):
+        # Fermer d'abord le socket d'écoute et les connexions inactives, puis laisser
+        # finir les requêtes en vol
+        super().server_close()
+        self._stop_idle()
+        drained = self.drain()
+        if not drained:
+            logger.warning("Arrêt: %s requête(s) encore en cours après %ss.", self._inflight, HTTP_DRAIN_TIMEOUT)
+        self._executor.shutdown(wait=drained, cancel_futures=True)
+
+
+def build_server(port, mode=SERVER_MODE):
+    if mode == "single":
+        return HTTPServer(("0.0.0.0", port), Handler)
+    if mode != "threaded":
+        logger.warning("SERVER_MODE=%s inconnu, utilisation du mode threaded.", mode)
+    return PooledHTTPServer(("0.0.0.0", port), Handler)
+
+
+def install_shutdown_handlers(server):
+    """SIGTERM/SIGINT: arrêter la boucle d'accept; server_close() draine ensuite."""
+
+    def _stop(signum, _frame):
+        logger.info("Signal %s reçu, arrêt du serveur...", signum)
+        # shutdown() attend la fin de serve_forever(): l'appeler depuis un autre thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, _stop)
+
+
+def serve(port):
+    # En prefork, seul le superviseur pinge: un keep-warm pour tout le groupe
+    start_db_keepwarm()
+    if SERVER_MODE == "asyncio":
+        # Écoute NOTIFY dès le démarrage: les caches publics servent dès la 1re requête
+        LISTENER.ensure_started()
+        start_vote_ingestor()
+        try:
+            return asyncio.run(AsyncHTTPServer(port).run())
+        finally:
+            stop_vote_ingestor()
+    if SERVER_MODE == "prefork":
+        if hasattr(os, "fork"):
+            return PreforkSupervisor(port, PREFORK_WORKERS).run()
+        logger.warning("SERVER_MODE=prefork indisponible sur cette plateforme, mode threaded utilisé.")
+    server = build_server(port)
+    install_shutdown_handlers(server)
+    workers = getattr(server, "workers", 1)
+    logger.info("Serveur démarré sur http://0.0.0.0:%s (mode %s, %s worker(s))", port, SERVER_MODE, workers)
+    LISTENER.ensure_started()
+    start_vote_ingestor()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        stop_vote_ingestor()
+        logger.info("Serveur arrêté.")
+
+
+def _listen_socket(port, reuse_port=False):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(("0.0.0.0", port))
+    sock.listen(PooledHTTPServer.request_queue_size)
+    return sock
+
+
+class PreforkSupervisor:
+    """Lance N processus workers (chacun un PooledHTTPServer) sur le même port.
+
+    Par défaut les workers héritent du socket d'écoute ouvert par le parent;
+    avec PREFORK_REUSEPORT=1 chacun ouvre le sien (SO_REUSEPORT) et le noyau
+    répartit les connexions. Le parent redémarre les workers qui meurent et
+    relaie SIGTERM/SIGINT (arrêt) et SIGHUP (redémarrage des workers).
+    """
+
+    RESTART_BACKOFF = 1.0
+
+    def __init__(self, port, workers):
+        self.port = port
+        self.workers = workers
+        self.reuse_port = PREFORK_REUSEPORT and hasattr(socket, "SO_REUSEPORT")
+        self.sock = None
+        self.children = {}
+        self.running = True
+
+    def run(self):
+        if not self.reuse_port:
+            self.sock = _listen_socket(self.port)
+        # Ne pas transmettre le pool DB du parent (init_db) aux workers
+        close_pool()
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        logger.info(
+            "Superviseur prefork sur http://0.0.0.0:%s: %s worker(s) x %s thread(s)%s",
+            self.port,
+            self.workers,
+            HTTP_WORKERS,
+            " (SO_REUSEPORT)" if self.reuse_port else "",
+        )
+        for slot in range(self.workers):
+            self._spawn(slot)
+        self._supervise()
+        if self.sock:
+            self.sock.close()
+        logger.info("Superviseur arrêté.")
+
+    def _spawn(self, slot):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                self._run_worker(slot)
+                code = 0
+            except Exception:
+                logger.exception("Worker %s: erreur fatale", slot)
+            finally:
+                logging.shutdown()
+                os._exit(code)
+        self.children[pid] = {"slot": slot, "startedAt": time.monotonic()}
+
+    def _run_worker(self, slot):
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        server = PooledHTTPServer(("0.0.0.0", self.port), Handler, bind_and_activate=False)
+        server.socket.close()
+        server.socket = self.sock if self.sock else _listen_socket(self.port, reuse_port=True)
+        host, port = server.socket.getsockname()[:2]
+        server.server_address = (host, port)
+        server.server_name = host
+        server.server_port = port
+        install_shutdown_handlers(server)
+        logger.info("Worker %s démarré (pid %s)", slot, os.getpid())
+        LISTENER.ensure_started()
+        start_vote_ingestor()
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            stop_vote_ingestor()
+            close_pool()
+
+    def _on_stop(self, signum, _frame):
+        self.running = False
+        self._signal_children(signum)
+
+    def _on_reload(self, _signum, _frame):
+        logger.info("SIGHUP: redémarrage des workers.")
+        self._signal_children(signal.SIGTERM)
+
+    def _signal_children(self, signum):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _supervise(self):
+        deadline = None
+        while self.children:
+            if not self.running and deadline is None:
+                deadline = time.monotonic() + HTTP_DRAIN_TIMEOUT + 5
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG if deadline else 0)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                if time.monotonic() > deadline:
+                    logger.warning("Workers toujours actifs après le délai d'arrêt, SIGKILL.")
+                    self._signal_children(signal.SIGKILL)
+                    deadline = time.monotonic() + 5
+                time.sleep(0.1)
+                continue
+            info = self.children.pop(pid, None)
+            if info is None:
+                continue
+            if not self.running:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            logger.warning("Worker %s (pid %s) terminé (code %s), redémarrage.", info["slot"], pid, code)
+            if time.monotonic() - info["startedAt"] < self.RESTART_BACKOFF:
+                # Éviter une boucle de redémarrage rapide si le worker plante au démarrage
+                time.sleep(self.RESTART_BACKOFF)
+            if self.running:
+                self._spawn(info["slot"])
+
+
+# ==================== MOTEUR ASYNCIO ====================
+MAX_REQUEST_HEAD_BYTES = 64 * 1024
+MEDIA_CHUNK_BYTES = 256 * 1024
+
+
+class LoopWriter:
+    """wfile de Handler pour le moteur asyncio: garde la réponse en mémoire jusqu'à
+    STREAM_CHUNK_BYTES, puis la transmet à la boucle (write + drain) depuis le thread
+    de la route. Les réponses en flux gardent ainsi une mémoire constante, et un
+    client lent freine la route au lieu de tout accumuler.
+    """
+
+    def __init__(self, writer, loop):
+        self.writer = writer
+        self.loop = loop
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= STREAM_CHUNK_BYTES:
+            self._send(self.getvalue())
+        return len(data)
+
+    def flush(self):
+        # Appelé par handle_one_request après chaque réponse: le reste part avec getvalue()
+        pass
+
+    def getvalue(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+    def _send(self, data):
+        asyncio.run_coroutine_threadsafe(self._write(data), self.loop).result(HTTP_SOCKET_TIMEOUT or None)
+
+    async def _write(self, data):
+        self.writer.write(data)
+        await self.writer.drain()
+
+
+def run_buffered_request(raw, client_address, server=None, request_index=1, wfile=None, prefetched=None):
+    """Exécute une requête HTTP complète (octets bruts) avec Handler, sans socket.
+
+    Les routes restent celles de Handler: le moteur asyncio ne fait que lire la
+    requête et écrire la réponse. Retourne (réponse brute, fermer_connexion); avec
+    wfile (LoopWriter), seule la fin de réponse pas encore transmise est retournée.
+    prefetched: lignes (ou erreur) d'une route "prefetch", déjà lues par la boucle.
+    """
+    handler = Handler.__new__(Handler)
+    handler.request = None
+    handler.connection = None
+    handler.client_address = client_address
+    handler.server = server
+    handler.rfile = io.BytesIO(raw)
+    handler.wfile = wfile or io.BytesIO()
+    handler.close_connection = True
+    # Rang de la requête sur la connexion (limite HTTP_KEEPALIVE_MAX_REQUESTS)
+    handler._requests_on_connection = request_index - 1
+    handler._prefetched = prefetched
+    handler.handle_one_request()
+    return handler.wfile.getvalue(), handler.close_connection
+
+
+class AsyncHTTPServer:
+    """Serveur asyncio: une coroutine par connexion, routes exécutées par Handler.
+
+    Les connexions inactives ne coûtent qu'une coroutine; un thread du pool n'est
+    occupé que pendant l'exécution d'une route. /media/ est servi directement
+    par la boucle (loop.sendfile).
+
+    Base de données asynchrone (AsyncConnectionPool): /api/health, et les lectures
+    publiques marquées "prefetch" (candidats, résultats, qualifiés) dont la requête
+    s'exécute dans la boucle; Handler ne fait ensuite qu'encoder la réponse sur un
+    thread (cache, secours et format JSON inchangés). Une réponse déjà en cache ne
+    touche pas la base. /api/public-settings est servi depuis SETTINGS (mémoire). Les
+    routes admin et les écritures restent synchrones: un thread de
+    ASYNC_ROUTE_WORKERS et une connexion du pool synchrone, comme en mode threaded.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.server = None
+        self.executor = None
+        self.db_pool = None
+        self.connections = {}
+        self.stopping = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self.stopping = asyncio.Event()
+        self.executor = ThreadPoolExecutor(max_workers=ASYNC_ROUTE_WORKERS, thread_name_prefix="async-route")
+        self.server = await asyncio.start_server(
+            self._handle_connection,
+            "0.0.0.0",
+            self.port,
+            backlog=1024,
+            limit=MAX_REQUEST_HEAD_BYTES,
+        )
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.stopping.set)
+            except NotImplementedError:
+                pass
+        logger.info(
+            "Serveur asyncio démarré sur http://0.0.0.0:%s (%s thread(s) pour les routes)",
+            self.port,
+            ASYNC_ROUTE_WORKERS,
+        )
+        await self.stopping.wait()
+        logger.info("Arrêt du serveur asyncio...")
+        await self._shutdown()
+        logger.info("Serveur arrêté.")
+
+    async def _shutdown(self):
+        self.server.close()
+        # Fermer les connexions inactives, laisser finir celles qui traitent une requête
+        for task, state in list(self.connections.items()):
+            if state == "idle":
+                task.cancel()
+        busy = [task for task, state in self.connections.items() if state == "busy"]
+        if busy:
+            _, pending = await asyncio.wait(busy, timeout=HTTP_DRAIN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.db_pool is not None:
+            await self.db_pool.close()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections[task] = "idle"
+        peer = writer.get_extra_info("peername") or ("unknown", 0)
+        client_address = tuple(peer[:2])
+        served = 0
+        try:
+            while not self.stopping.is_set():
+                timeout = HTTP_KEEPALIVE_TIMEOUT if served else HTTP_SOCKET_TIMEOUT
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout or None)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    break
+                served += 1
+                self.connections[task] = "busy"
+                close = await self._handle_request(head, reader, writer, client_address, served)
+                self.connections[task] = "idle"
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            logger.exception("Moteur asyncio: erreur connexion")
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _handle_request(self, head, reader, writer, client_address, served):
+        request_line, _, header_block = head.partition(b"\r\n")
+        parts = request_line.decode("latin-1").split()
+        headers = http.client.parse_headers(io.BytesIO(header_block))
+        method = parts[0] if parts else ""
+        target = parts[1] if len(parts) > 1 else "/"
+
+        body = b""
+        force_close = False
+        try:
+            length = int(headers.get("Content-Length", 0) or 0)
+        except ValueError:
+            length = 0
+        if length > MAX_UPLOAD_BYTES:
+            # Handler répond 413 sans lire le corps: ne pas réutiliser la connexion
+            force_close = True
+        elif length > 0:
+            if headers.get("Expect", "").lower() == "100-continue":
+                writer.write(f"{Handler.protocol_version} 100 Continue\r\n\r\n".encode("latin-1"))
+                await writer.drain()
+            body = await reader.readexactly(length)
+
+        path = urlparse(target).path
+        keep_alive = not force_close and served < HTTP_KEEPALIVE_MAX_REQUESTS and self._keep_alive(parts, headers)
+        if method == "GET" and path.startswith("/media/"):
+            if await self._serve_media(path, headers, writer, keep_alive):
+                return not keep_alive
+        elif method == "GET" and path == "/api/health" and db_ready():
+            await self._serve_health(headers, writer, keep_alive)
+            return not keep_alive
+        route = ROUTER.resolve(method, path)[0] if method == "GET" else None
+        if method == "GET" and not path.startswith("/api/") and route is None:
+            if await self._serve_static(path, headers, writer, keep_alive):
+                return not keep_alive
+
+        prefetched = None
+        if route is not None and route["prefetch"] and db_ready():
+            prefetched = await self._prefetch_rows(route)
+        loop = asyncio.get_running_loop()
+        response, close = await loop.run_in_executor(
+            self.executor,
+            run_buffered_request,
+            head + body,
+            client_address,
+            self,
+            served,
+            LoopWriter(writer, loop),
+            prefetched,
+        )
+        writer.write(response)
+        await writer.drain()
+        return close or force_close
+
+    def _keep_alive(self, request_parts, headers):
+        version = request_parts[2] if len(request_parts) > 2 else "HTTP/1.0"
+        connection = headers.get("Connection", "").lower()
+        if version >= "HTTP/1.1":
+            return connection != "close"
+        return connection == "keep-alive"
+
+    def _write_head(self, writer, status, request_headers, extra_headers, keep_alive):
+        lines = [f"{Handler.protocol_version} {status} {http.client.responses.get(status, '')}"]
+        lines.append(f"Server: {Handler.server_version}")
+        lines.append(f"Date: {email_utils.formatdate(usegmt=True)}")
+        for name, value in security_headers(request_headers) + extra_headers:
+            lines.append(f"{name}: {value}")
+        if keep_alive:
+            lines.append(f"Keep-Alive: timeout={int(HTTP_KEEPALIVE_TIMEOUT)}")
+        else:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _serve_media(self, path, request_headers, writer, keep_alive):
+        """Sert un média (plages comprises) sans bloquer la boucle. Retourne False pour
+        déléguer à Handler."""
+        file = None
+        try:
+            media = await asyncio.to_thread(media_response, path, request_headers)
+            if media["length"]:
+                file = await asyncio.to_thread(open, media["path"], "rb")
+            stream = acquire_media_stream(media)
+        except (APIError, OSError):
+            # Réponses d'erreur (404, 416, 503...): laisser Handler produire exactement le même JSON
+            if file is not None:
+                await asyncio.to_thread(file.close)
+            return False
+        try:
+            self._write_head(writer, media["status"], request_headers, media["headers"], keep_alive)
+            await writer.drain()
+            if file is not None:
+                loop = asyncio.get_running_loop()
+                await loop.sendfile(writer.transport, file, media["offset"], media["length"], fallback=True)
+        finally:
+            if stream:
+                MEDIA_STREAMS.release()
+            if file is not None:
+                await asyncio.to_thread(file.close)
+        return True
+
+    async def _serve_static(self, path, request_headers, writer, keep_alive):
+        """Fichier de public/ servi sans Handler: corps en mémoire ou loop.sendfile.
+        Retourne False (404) pour déléguer à Handler."""
+        # stat, et lecture/compression à la première demande: hors de la boucle
+        response = await asyncio.to_thread(static_response, path, request_headers)
+        if response is None:
+            return False
+        status, headers, body, entry = response
+        self._write_head(writer, status, request_headers, headers, keep_alive)
+        if body:
+            writer.write(body)
+        await writer.drain()
+        if status == 200 and body is None:
+            file = await asyncio.to_thread(open, entry["path"], "rb")
+            try:
+                loop = asyncio.get_running_loop()
+                await loop.sendfile(writer.transport, file, 0, entry["size"], fallback=True)
+            finally:
+                await asyncio.to_thread(file.close)
+        return True
+
+    async def _get_db_pool(self):
+        if self.db_pool is None:
+            self.db_pool = AsyncConnectionPool(DATABASE_URL, check=AsyncConnectionPool.check_connection, **db_pool_options())
+            await self.db_pool.open(wait=False)
+        return self.db_pool
+
+    async def _prefetch_rows(self, route):
+        """Exécute la requête d'une route "prefetch" sur le pool asynchrone. Retourne les
+        lignes, l'erreur (relevée par Handler: réponse de secours ou 503), ou None si la
+        réponse est déjà en cache pour la version courante."""
+        version = DATA_VERSION.current()
+        if route["cache"] and version is not None and RESPONSE_CACHE.fresh(route["pattern"], version):
+            return None
+        conn = None
+        try:
+            if not DB_BREAKER.allow():
+                raise DatabaseUnavailable()
+            pool = await self._get_db_pool()
+            async with pool.connection() as conn:
+                DB_BREAKER.record_success()
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await STATEMENTS.execute_async(cur, route["prefetch"])
+                    return await cur.fetchall()
+        except (PoolTimeout, psycopg.OperationalError) as error:
+            # Comme get_conn(): connexion impossible ou perdue en cours de requête
+            if conn is None or conn.broken:
+                DB_BREAKER.record_failure(error)
+            return error
+        except Exception as error:
+            return error
+
+    async def _serve_health(self, request_headers, writer, keep_alive):
+        probe_error = None
+        try:
+            if not DB_BREAKER.allow():
+                raise DatabaseUnavailable()
+            pool = await self._get_db_pool()
+            async with pool.connection() as conn:
+                await conn.execute("select 1")
+        except Exception as e:
+            probe_error = e
+        payload = json_envelope(health_report(probe_error, self.db_pool))
+        data = json.dumps(payload, default=json_default).encode("utf-8")
+        self._write_head(
+            writer,
+            200,
+            request_headers,
+            [
+                ("Content-Type", "application/json; charset=utf-8"),
+                ("Cache-Control", "no-store, no-cache, must-revalidate"),
+                ("Pragma", "no-cache"),
+                ("Content-Length", str(len(data))),
+            ],
+            keep_alive,
+        )
+        writer.write(data)
+        await writer.drain()
+
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["migrate"]:
+        # Avant un déploiement: migrations du code et de sql-migrations/. --status: liste seulement
+        if not db_ready():
+            sys.exit("DATABASE_URL non défini.")
+        try:
+            if sys.argv[2:3] == ["--status"]:
+                waiting = pending_migrations(include_sql=True)
+                for version, description, _ in waiting:
+                    print(f"en attente  {version}  {description}")
+                print(f"{len(waiting)} migration(s) en attente.")
+                sys.exit(0)
+            applied = migrate(include_sql=True)
+        except psycopg.Error as error:
+            logger.error("Migration interrompue: %s", error)
+            sys.exit(1)
+        logger.info("%s migration(s) appliquée(s)%s", len(applied), f": {', '.join(applied)}" if applied else ".")
+        sys.exit(0)
+
     # Initialiser la base de données (non-bloquant)
     if not db_ready():
         logger.warning("DATABASE_URL non défini. Les fonctionnalités admin (candidats, scores, etc.) ne fonctionneront pas.")
@@ -1916,10 +5661,16 @@ if __name__ == "__main__":
             logger.info("Base de données initialisée.")
         except Exception as e:
             logger.error("ERREUR init base de données: %s", e)
-            logger.warning("Le serveur va démarrer sans base de données. Vérifiez DATABASE_URL/DATABASE_EXTERNAL_URL.")
+            logger.warning("Le serveur démarre sans base de données; initialisation réessayée en arrière-plan. Vérifiez DATABASE_URL/DATABASE_EXTERNAL_URL.")
+            retry_init_db()
+
+    if sys.argv[1:2] == ["rebuild-vote-totals"]:
+        if not db_ready():
+            sys.exit("DATABASE_URL non défini.")
+        drift = rebuild_vote_totals()
+        logger.info("Totaux de votes reconstruits (%s candidat(s) corrigé(s)).", drift)
+        sys.exit(0)
 
     # Démarrer le serveur (TOUJOURS, même si DB échoue)
     port = int(os.environ.get("PORT", "10000"))
-    server = HTTPServer(("0.0.0.0", port), Handler)
-    logger.info("Serveur démarré sur http://0.0.0.0:%s", port)
-    server.serve_forever()
+    serve(port)
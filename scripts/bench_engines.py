@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark des moteurs HTTP de app.py (threaded vs asyncio)
+Usage: python scripts/bench_engines.py [--clients 1000] [--duration 15] [--path /api/public-media/stats]
+Exemple: python scripts/bench_engines.py --engines threaded,asyncio --idle 500
+
+Chaque moteur est démarré dans un sous-processus (SERVER_MODE=<moteur>), puis
+--clients clients concurrents enchaînent des GET sur --path pendant --duration
+secondes. --idle ouvre en plus des connexions inactives, comme des navigateurs
+en keep-alive qui ne font rien.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def raise_fd_limit(wanted):
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = min(hard, max(soft, wanted))
+    if target > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+async def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return True
+        except OSError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, _, rest = head.partition(b"\r\n")
+    status = int(status_line.split()[1])
+    headers = {}
+    for line in rest.decode("latin-1").split("\r\n"):
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", "0") or 0)
+    if length:
+        await reader.readexactly(length)
+    keep_alive = status_line.startswith(b"HTTP/1.1") and headers.get("connection", "").lower() != "close"
+    return status, keep_alive
+
+
+async def client_loop(port, path, stop_at, timeout, latencies, errors):
+    request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n\r\n".encode("latin-1")
+    reader = writer = None
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+            latencies.append(time.perf_counter() - started)
+            if status >= 500:
+                errors.append(status)
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as exc:
+            errors.append(type(exc).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def hold_idle(port, count, stop_at):
+    writers = []
+    for _ in range(count):
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writers.append(writer)
+        except OSError:
+            break
+    await asyncio.sleep(max(0, stop_at - time.monotonic()))
+    for writer in writers:
+        writer.close()
+    return len(writers)
+
+
+async def run_load(port, args):
+    latencies, errors = [], []
+    stop_at = time.monotonic() + args.duration
+    idle_task = asyncio.create_task(hold_idle(port, args.idle, stop_at)) if args.idle else None
+    if idle_task:
+        await asyncio.sleep(1)
+    started = time.monotonic()
+    await asyncio.gather(*(client_loop(port, args.path, stop_at, args.timeout, latencies, errors) for _ in range(args.clients)))
+    elapsed = time.monotonic() - started
+    idle_open = await idle_task if idle_task else 0
+    return latencies, errors, elapsed, idle_open
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench_engine(engine, args):
+    env = dict(os.environ, SERVER_MODE=engine, PORT=str(args.port))
+    proc = subprocess.Popen(
+        [sys.executable, str(ROOT / "app.py")],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not asyncio.run(wait_for_port(args.port)):
+            print(f"❌ {engine}: le serveur n'a pas démarré")
+            return None
+        latencies, errors, elapsed, idle_open = asyncio.run(run_load(args.port, args))
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return {
+        "engine": engine,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "mean": (statistics.mean(latencies) * 1000) if latencies else 0.0,
+        "errors": len(errors),
+        "idle": idle_open,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare les moteurs HTTP de app.py")
+    parser.add_argument("--engines", default="threaded,asyncio")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--idle", type=int, default=0)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--path", default="/api/public-media/stats")
+    parser.add_argument("--timeout", type=float, default=10, help="délai max par requête (s)")
+    parser.add_argument("--port", type=int, default=18765)
+    args = parser.parse_args()
+
+    raise_fd_limit((args.clients + args.idle) * 2 + 256)
+
+    print("=" * 72)
+    print(f"🏁 {args.clients} clients concurrents, {args.idle} connexions inactives, {args.duration:.0f}s sur {args.path}")
+    print("=" * 72)
+    results = []
+    for engine in [e.strip() for e in args.engines.split(",") if e.strip()]:
+        result = bench_engine(engine, args)
+        if result:
+            results.append(result)
+            print(
+                f"{engine:>9}: {result['rps']:8.1f} req/s  "
+                f"p50 {result['p50']:7.1f} ms  p95 {result['p95']:7.1f} ms  p99 {result['p99']:7.1f} ms  "
+                f"erreurs {result['errors']}  inactives ouvertes {result['idle']}"
+            )
+    return 0 if results else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
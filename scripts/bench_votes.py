@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de POST /api/votes: ingestion directe vs bufferisée
+Usage: DATABASE_URL=postgresql://... python scripts/bench_votes.py [--voters 1,10,100] [--duration 10]
+Exemple: python scripts/bench_votes.py --modes direct,buffered --voters 1,10,100
+
+Pour chaque mode (VOTE_INGEST_MODE) et chaque niveau de concurrence, app.py est
+démarré dans un sous-processus, puis N votants enchaînent des votes (une IP
+différente par vote, candidats de test tirés au hasard). En mode bufferisé, le
+temps nécessaire pour que tous les votes acquittés soient en base est aussi mesuré.
+Les candidats de test (et leurs votes) sont supprimés à la fin.
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import psycopg
+
+from bench_engines import percentile, raise_fd_limit, read_response, wait_for_port
+
+ROOT = Path(__file__).resolve().parent.parent
+BENCH_PREFIX = "+99900"
+# Une IP par vote, jamais réutilisée d'une mesure à l'autre: la déduplication 24 h
+# et le rate limit ne s'appliquent pas
+VOTER_IPS = (f"10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}" for n in itertools.count(1))
+
+
+def prepare_db(url, candidates):
+    with psycopg.connect(url) as conn:
+        settings = conn.execute(
+            "select votingEnabled, competitionClosed from tournament_settings where id = 1"
+        ).fetchone()
+        conn.execute("update tournament_settings set votingEnabled = 1, competitionClosed = 0 where id = 1")
+        ids = []
+        for index in range(candidates):
+            row = conn.execute(
+                """
+                insert into candidates (fullName, whatsapp) values (%s, %s)
+                on conflict (whatsapp) do update set fullName = excluded.fullName
+                returning id
+                """,
+                (f"Bench {index}", f"{BENCH_PREFIX}{index:04d}"),
+            ).fetchone()
+            ids.append(row[0])
+        conn.execute("delete from votes where candidateId = any(%s)", (ids,))
+    return ids, settings
+
+
+def restore_db(url, settings):
+    with psycopg.connect(url) as conn:
+        conn.execute("delete from candidates where whatsapp like %s", (BENCH_PREFIX + "%",))
+        if settings:
+            conn.execute(
+                "update tournament_settings set votingEnabled = %s, competitionClosed = %s where id = 1",
+                settings,
+            )
+
+
+def count_votes(url, ids):
+    with psycopg.connect(url) as conn:
+        return conn.execute("select count(*) from votes where candidateId = any(%s)", (ids,)).fetchone()[0]
+
+
+async def voter(port, ids, ips, stop_at, timeout, latencies, errors):
+    reader = writer = None
+    while time.monotonic() < stop_at:
+        body = json.dumps({"candidateId": random.choice(ids)}).encode("utf-8")
+        request = (
+            f"POST /api/votes HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"X-Forwarded-For: {next(ips)}\r\n\r\n"
+        ).encode("latin-1") + body
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout)
+            if status in (201, 202):
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(status)
+            if not keep_alive:
+                writer.close()
+                reader = writer = None
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as exc:
+            errors.append(type(exc).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def run_voters(port, ids, voters, args):
+    latencies, errors = [], []
+    stop_at = time.monotonic() + args.duration
+    started = time.monotonic()
+    await asyncio.gather(*(voter(port, ids, VOTER_IPS, stop_at, args.timeout, latencies, errors) for _ in range(voters)))
+    return latencies, errors, time.monotonic() - started
+
+
+def bench(mode, voters, ids, args):
+    spool = tempfile.mkdtemp(prefix="bench-votes-")
+    env = dict(os.environ, PORT=str(args.port), VOTE_INGEST_MODE=mode, VOTE_SPOOL_DIR=spool)
+    proc = subprocess.Popen(
+        [sys.executable, str(ROOT / "app.py")],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not asyncio.run(wait_for_port(args.port)):
+            print(f"❌ {mode}: le serveur n'a pas démarré")
+            return None
+        before = count_votes(args.database_url, ids)
+        latencies, errors, elapsed = asyncio.run(run_voters(args.port, ids, voters, args))
+        acked = len(latencies)
+        # Temps pour que tous les votes acquittés soient visibles en base
+        drain_started = time.monotonic()
+        stored = count_votes(args.database_url, ids) - before
+        while stored < acked and time.monotonic() - drain_started < 30:
+            time.sleep(0.05)
+            stored = count_votes(args.database_url, ids) - before
+        drain = time.monotonic() - drain_started
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return {
+        "rps": acked / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "errors": len(errors),
+        "errorKinds": dict(collections.Counter(errors).most_common(3)),
+        "acked": acked,
+        "stored": stored,
+        "drain": drain,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare l'ingestion directe et bufferisée des votes")
+    parser.add_argument("--modes", default="direct,buffered")
+    parser.add_argument("--voters", default="1,10,100")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=10, help="délai max par requête (s)")
+    parser.add_argument("--port", type=int, default=18766)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", ""))
+    args = parser.parse_args()
+    if not args.database_url:
+        print("❌ DATABASE_URL requis (base de test: des votes y sont écrits)")
+        return 1
+
+    levels = [int(v) for v in args.voters.split(",") if v.strip()]
+    raise_fd_limit(max(levels) * 2 + 256)
+    ids, settings = prepare_db(args.database_url, args.candidates)
+    print("=" * 72)
+    print(f"🗳️  {args.duration:.0f}s par mesure, {len(ids)} candidats de test")
+    print("=" * 72)
+    try:
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            for voters in levels:
+                result = bench(mode, voters, ids, args)
+                if result:
+                    print(
+                        f"{mode:>9} x{voters:<4}: {result['rps']:8.1f} votes/s  "
+                        f"p50 {result['p50']:7.1f} ms  p95 {result['p95']:7.1f} ms  p99 {result['p99']:7.1f} ms  "
+                        f"erreurs {result['errors']}  en base {result['stored']}/{result['acked']} "
+                        f"(+{result['drain']:.2f}s)"
+                    )
+                    if result["errorKinds"]:
+                        print(f"{'':>16}erreurs: {result['errorKinds']}")
+    finally:
+        restore_db(args.database_url, settings)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""Tests unitaires de app.py (sans base de données).
+
+Usage: python -m pytest
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# app.py est importé sans base: aucun test ne doit toucher une vraie base.
+# Une URL vide (et non absente, qui vaut postgresql://localhost) désactive la base.
+os.environ["DATABASE_URL"] = ""
+os.environ["DATABASE_EXTERNAL_URL"] = ""
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Cache des identifiants Basic vérifiés: TTL, éviction LRU et génération."""
+
+import pytest
+
+import app
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(app.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_TOKEN_SECRET", "secret-de-test")
+    monkeypatch.setattr(app, "ADMIN_AUTH_CACHE_TTL", 60.0)
+    monkeypatch.setattr(app, "ADMIN_AUTH_CACHE_SIZE", 2)
+    app.clear_admin_auth_cache()
+    yield
+    app.clear_admin_auth_cache()
+
+
+def _store(authorization):
+    key = app.admin_auth_cache_key(authorization)
+    found, generation = app.admin_auth_cache_lookup(key)
+    assert not found
+    app.admin_auth_cache_store(key, generation)
+    return key
+
+
+def test_key_does_not_contain_the_credentials():
+    key = app.admin_auth_cache_key("Basic YWRtaW46cGFzcw==")
+    assert key == app.admin_auth_cache_key("Basic YWRtaW46cGFzcw==")
+    assert key != app.admin_auth_cache_key("Basic YWRtaW46YXV0cmU=")
+    assert b"YWRtaW46cGFzcw" not in key
+
+
+def test_hit_until_ttl_expires(clock):
+    key = _store("Basic a")
+    clock.now += 59.9
+    assert app.admin_auth_cache_lookup(key)[0]
+    clock.now += 0.1
+    assert not app.admin_auth_cache_lookup(key)[0]
+    assert key not in app._ADMIN_AUTH_CACHE
+
+
+def test_lru_eviction(clock):
+    first = _store("Basic a")
+    second = _store("Basic b")
+    # Lire "a" le rend le plus récent: "b" part à l'ajout de "c"
+    assert app.admin_auth_cache_lookup(first)[0]
+    third = _store("Basic c")
+    assert list(app._ADMIN_AUTH_CACHE) == [first, third]
+    assert not app.admin_auth_cache_lookup(second)[0]
+
+
+def test_clear_bumps_generation_and_drops_stale_store(clock):
+    key = app.admin_auth_cache_key("Basic a")
+    found, generation = app.admin_auth_cache_lookup(key)
+    assert not found
+    # Mot de passe changé pendant la vérification PBKDF2
+    app.clear_admin_auth_cache()
+    app.admin_auth_cache_store(key, generation)
+    assert not app.admin_auth_cache_lookup(key)[0]
+    found, new_generation = app.admin_auth_cache_lookup(key)
+    assert new_generation == generation + 1
+    app.admin_auth_cache_store(key, new_generation)
+    assert app.admin_auth_cache_lookup(key)[0]
+
+
+def test_clear_empties_the_cache(clock):
+    key = _store("Basic a")
+    app.clear_admin_auth_cache()
+    assert not app.admin_auth_cache_lookup(key)[0]
+
+
+@pytest.mark.parametrize("setting", ["ADMIN_AUTH_CACHE_TTL", "ADMIN_AUTH_CACHE_SIZE"])
+def test_disabled_cache_stores_nothing(monkeypatch, clock, setting):
+    monkeypatch.setattr(app, setting, 0)
+    key = _store("Basic a")
+    assert not app.admin_auth_cache_lookup(key)[0]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""admin_list: curseurs after/before (pagination par clé) sur une base simulée."""
+
+import contextlib
+import operator
+import re
+
+import pytest
+
+import app
+
+ROWS = [{"id": i, "status": "approved" if i % 3 else "pending"} for i in range(1, 11)]
+OPERATORS = {"=": operator.eq, "<": operator.lt, ">": operator.gt}
+
+
+class FakeCursor:
+    """Exécute le seul SQL que admin_list produit en mode paginé: where, order by id, limit."""
+
+    def __init__(self, executed):
+        self.executed = executed
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.executed.append((sql, list(params)))
+        params = list(params)
+        limit = params.pop()
+        rows = ROWS
+        where = re.search(r" where (.*) order by", sql)
+        conditions = where.group(1).split(" and ") if where else []
+        for condition, value in zip(conditions, params):
+            column, op, _ = condition.split()
+            rows = [row for row in rows if OPERATORS[op](row[column], value)]
+        descending = sql.rstrip().endswith("desc limit %s")
+        self.rows = sorted(rows, key=lambda row: row["id"], reverse=descending)[:limit]
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConn:
+    def __init__(self, executed):
+        self.executed = executed
+
+    def cursor(self, row_factory=None):
+        return FakeCursor(self.executed)
+
+
+@pytest.fixture
+def executed(monkeypatch):
+    executed = []
+
+    @contextlib.contextmanager
+    def get_conn():
+        yield FakeConn(executed)
+
+    monkeypatch.setattr(app, "get_conn", get_conn)
+    return executed
+
+
+def _page(**query):
+    result = app.admin_list("candidates", {key: [str(value)] for key, value in query.items()})
+    return [row["id"] for row in result["items"]], result["pagination"]
+
+
+def test_first_page(executed):
+    ids, pagination = _page(limit=3)
+    assert ids == [10, 9, 8]
+    assert pagination == {"limit": 3, "next": 8, "prev": None}
+    sql, params = executed[0]
+    assert sql.endswith("order by id desc limit %s")
+    assert params == [4]
+
+
+def test_walk_forward_then_back(executed):
+    ids, pagination = _page(limit=4)
+    pages = [ids]
+    while pagination["next"] is not None:
+        ids, pagination = _page(limit=4, after=pagination["next"])
+        pages.append(ids)
+    assert pages == [[10, 9, 8, 7], [6, 5, 4, 3], [2, 1]]
+    assert pagination["prev"] == 2
+
+    ids, pagination = _page(limit=4, before=pagination["prev"])
+    assert ids == [6, 5, 4, 3]
+    assert pagination == {"limit": 4, "next": 3, "prev": 6}
+    ids, pagination = _page(limit=4, before=pagination["prev"])
+    assert ids == [10, 9, 8, 7]
+    assert pagination == {"limit": 4, "next": 7, "prev": None}
+
+
+def test_before_walks_ascending_and_returns_descending(executed):
+    ids, _ = _page(limit=2, before=5)
+    assert ids == [7, 6]
+    sql, params = executed[0]
+    assert "id > %s" in sql and sql.endswith("order by id asc limit %s")
+    assert params == [5, 3]
+
+
+def test_cursor_with_filter(executed):
+    ids, pagination = _page(limit=2, status="approved", after=8)
+    assert ids == [7, 5]
+    assert pagination == {"limit": 2, "next": 5, "prev": 7}
+    sql, params = executed[0]
+    assert "status = %s and id < %s" in sql
+    assert params == ["approved", 8, 3]
+
+
+def test_limit_is_clamped(executed):
+    assert _page(limit=0)[1]["limit"] == 1
+    assert _page(limit=10_000)[1]["limit"] == app.PAGE_LIMIT_MAX
+    assert _page(after=11)[1]["limit"] == app.PAGE_LIMIT_DEFAULT
+
+
+def test_empty_page(executed):
+    assert _page(limit=3, after=1) == ([], {"limit": 3, "next": None, "prev": None})
+
+
+@pytest.mark.parametrize(
+    "query",
+    [{"after": "abc"}, {"before": "-1"}, {"after": "5", "before": "2"}, {"limit": "x"}, {"limit": "2", "status": "nope"}],
+)
+def test_invalid_cursor_is_rejected(executed, query):
+    with pytest.raises(app.APIError) as error:
+        app.admin_list("candidates", {key: [value] for key, value in query.items()})
+    assert error.value.status_code == 400
+    assert executed == []
+
+
+def test_empty_cursor_is_ignored():
+    assert app._cursor_value({"after": [" "]}, "after") is None
+    assert app._cursor_value({}, "after") is None
+    assert app._cursor_value({"after": [" 42 "]}, "after") == 42
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Jetons admin signés: émission, vérification, expiration et révocation par époque."""
+
+import json
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def auth_state(monkeypatch):
+    monkeypatch.setattr(app, "ADMIN_USERNAME", "admin")
+    monkeypatch.setattr(app, "ADMIN_TOKEN_SECRET", "secret-de-test")
+    monkeypatch.setattr(app, "ADMIN_TOKEN_TTL", 3600)
+    monkeypatch.setitem(app._ADMIN_AUTH_STATE, "epoch", "0")
+
+
+def test_issued_token_verifies():
+    token, expires_at = app.issue_admin_token("admin")
+    assert app.verify_admin_token(token)
+    body = json.loads(app._b64url_decode(token.partition(".")[0]))
+    assert body == {"sub": "admin", "exp": expires_at, "ep": "0"}
+
+
+def test_expired_token_is_rejected(monkeypatch):
+    token, expires_at = app.issue_admin_token("admin")
+    monkeypatch.setattr(app.time, "time", lambda: expires_at)
+    assert not app.verify_admin_token(token)
+    monkeypatch.setattr(app.time, "time", lambda: expires_at - 1)
+    assert app.verify_admin_token(token)
+
+
+def test_new_epoch_revokes_issued_tokens():
+    old_token, _ = app.issue_admin_token("admin")
+    epoch = app.revoke_admin_tokens()
+    assert epoch != "0"
+    assert not app.verify_admin_token(old_token)
+    new_token, _ = app.issue_admin_token("admin")
+    assert app.verify_admin_token(new_token)
+
+
+def test_token_for_another_user_is_rejected():
+    token, _ = app.issue_admin_token("someone")
+    assert not app.verify_admin_token(token)
+
+
+def test_token_signed_with_another_secret_is_rejected(monkeypatch):
+    token, _ = app.issue_admin_token("admin")
+    monkeypatch.setattr(app, "ADMIN_TOKEN_SECRET", "autre-secret")
+    assert not app.verify_admin_token(token)
+
+
+def test_tampered_claims_are_rejected():
+    token, expires_at = app.issue_admin_token("admin")
+    _, _, signature = token.partition(".")
+    claims = {"sub": "admin", "exp": expires_at + 10**6, "ep": "0"}
+    forged = app._b64url(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    assert not app.verify_admin_token(f"{forged}.{signature}")
+
+
+@pytest.mark.parametrize("token", ["", ".", "abc", "abc.", ".abc", "!!!.???", "a.b.c"])
+def test_malformed_token_is_rejected(token):
+    assert not app.verify_admin_token(token)
+
+
+def test_signed_non_object_claims_are_rejected():
+    body = app._b64url(b"[1, 2]")
+    signature = app._b64url(app._sign_admin_token(body))
+    assert not app.verify_admin_token(f"{body}.{signature}")
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Moteur asyncio: lignes des routes "prefetch" lues par la boucle, réponse faite par Handler."""
+
+import json
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def database(monkeypatch):
+    # Routes avec base sans vraie base: seules les lignes lues d'avance sont servies
+    monkeypatch.setattr(app, "db_ready", lambda: True)
+    monkeypatch.setattr(app.DATA_VERSION, "current", lambda: None)
+
+    def no_conn():
+        raise AssertionError("le pool synchrone ne doit pas être utilisé")
+
+    monkeypatch.setattr(app, "get_conn", no_conn)
+
+
+def _get(path, prefetched):
+    raw = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1")
+    response, _ = app.run_buffered_request(raw, ("127.0.0.1", 1), prefetched=prefetched)
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_public_routes_declare_their_statement():
+    prefetch = {route["pattern"]: route["prefetch"] for route in app.ROUTER.routes if route["prefetch"]}
+    assert prefetch == {
+        "/api/public-candidates": "public_candidates",
+        "/api/public-results": "public_results",
+        "/api/public-results/qualified": "public_qualified",
+    }
+    assert all(app.ROUTER.resolve("GET", pattern)[0]["method"] == "GET" for pattern in prefetch)
+
+
+def test_prefetched_rows_are_served():
+    rows = [{"id": 2, "fullName": "B"}, {"id": 1, "fullName": "A"}]
+    status, body = _get("/api/public-candidates?ts=1", rows)
+    assert status == 200
+    assert body["data"] == rows
+
+
+def test_results_built_from_prefetched_rows():
+    rows = [
+        {"id": 1, "country": "Sénégal", "city": "Dakar", "totalVotes": 3},
+        {"id": 2, "country": "sénégal", "city": "Thiès", "totalVotes": 4},
+    ]
+    status, body = _get("/api/public-results", rows)
+    assert status == 200
+    assert body["stats"] == {"totalCandidates": 2, "totalVotes": 7, "countries": 1, "cities": 2}
+
+
+def test_prefetch_error_goes_through_handler():
+    status, body = _get("/api/public-results/qualified", app.DatabaseUnavailable())
+    assert status == 503
+    assert "error" in body
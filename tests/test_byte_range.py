@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""parse_byte_range: plages 206, plages ignorées (fichier entier) et 416."""
+
+import pytest
+
+import app
+
+SIZE = 1000
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=500-", (500, 999)),
+        ("bytes=999-999", (999, 999)),
+        ("bytes=0-5000", (0, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("Bytes = 10-19", (10, 19)),
+    ],
+)
+def test_satisfiable_range(header, expected):
+    assert app.parse_byte_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "items=0-99",
+        "bytes=0-1,5-6",
+        "bytes=abc",
+        "bytes=-",
+        "bytes=",
+        "bytes=5-2",
+        "bytes=1-x",
+        "bytes=+1-2",
+    ],
+)
+def test_ignored_range_serves_whole_file(header):
+    assert app.parse_byte_range(header, SIZE) is None
+
+
+@pytest.mark.parametrize("header, size", [("bytes=1000-", SIZE), ("bytes=2000-2100", SIZE), ("bytes=-0", SIZE), ("bytes=0-", 0)])
+def test_unsatisfiable_range(header, size):
+    with pytest.raises(app.APIError) as error:
+        app.parse_byte_range(header, size)
+    assert error.value.status_code == 416
+    assert error.value.headers == {"Content-Range": f"bytes */{size}"}
+
+
+def test_media_response_partial_content(tmp_path, monkeypatch):
+    (tmp_path / "clip.mp4").write_bytes(b"x" * SIZE)
+    monkeypatch.setattr(app, "QUIZ_2025_MEDIA_DIR", str(tmp_path))
+    media = app.media_response("/media/clip.mp4", {"Range": "bytes=100-199"})
+    headers = dict(media["headers"])
+    assert media["status"] == 206
+    assert (media["offset"], media["length"]) == (100, 100)
+    assert headers["Content-Range"] == f"bytes 100-199/{SIZE}"
+    assert headers["Content-Length"] == "100"
+
+
+def test_media_response_stale_if_range_sends_whole_file(tmp_path, monkeypatch):
+    (tmp_path / "clip.mp4").write_bytes(b"x" * SIZE)
+    monkeypatch.setattr(app, "QUIZ_2025_MEDIA_DIR", str(tmp_path))
+    media = app.media_response("/media/clip.mp4", {"Range": "bytes=100-199", "If-Range": '"old-etag"'})
+    assert media["status"] == 200
+    assert (media["offset"], media["length"]) == (0, SIZE)
+    assert "Content-Range" not in dict(media["headers"])
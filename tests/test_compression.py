@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""accepted_encoding: choix de l'encodage selon Accept-Encoding et ses q-values."""
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def encodings(monkeypatch):
+    # Mêmes résultats que brotli soit installé ou non
+    monkeypatch.setattr(app, "ENCODINGS", ("br", "gzip"))
+    monkeypatch.setattr(app, "COMPRESS", True)
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("GZIP", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0.8, gzip;q=0.8", "br"),
+        ("br;q=0, gzip;q=0", None),
+        ("gzip;q=0", None),
+        ("deflate", None),
+        ("*", "br"),
+        ("*;q=0.5, br;q=0.1", "gzip"),
+        ("*, gzip;q=0", "br"),
+        ("identity", None),
+        ("gzip;q=abc, br;q=0.2", "br"),
+        ("gzip ; q=0.9 , br ; q=1.0", "br"),
+    ],
+)
+def test_accepted_encoding(header, expected):
+    assert app.accepted_encoding(header) == expected
+
+
+def test_no_header():
+    assert app.accepted_encoding("") is None
+    assert app.accepted_encoding(None) is None
+
+
+def test_compression_disabled(monkeypatch):
+    monkeypatch.setattr(app, "COMPRESS", False)
+    assert app.accepted_encoding("gzip, br") is None
+
+
+def test_gzip_only_without_brotli(monkeypatch):
+    monkeypatch.setattr(app, "ENCODINGS", ("gzip",))
+    assert app.accepted_encoding("br, gzip;q=0.1") == "gzip"
+    assert app.accepted_encoding("br") is None
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""encode_response_json: grosses réponses encodées dans le pool CPU, au-delà du seuil."""
+
+import datetime
+
+import pytest
+
+import app
+
+ROWS = [{"id": i, "createdAt": datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)} for i in range(10)]
+
+
+@pytest.fixture
+def offloaded(monkeypatch):
+    calls = []
+
+    def run_cpu(func, *args):
+        calls.append(func)
+        return func(*args)
+
+    monkeypatch.setattr(app, "run_cpu", run_cpu)
+    monkeypatch.setattr(app, "CPU_POOL_WORKERS", 2)
+    monkeypatch.setattr(app, "CPU_JSON_MIN_ITEMS", 10)
+    return calls
+
+
+def test_large_list_goes_to_the_pool(offloaded):
+    payload = {"data": ROWS, "success": True}
+    assert app.encode_response_json(payload) == app.encode_json(payload)
+    assert offloaded == [app.encode_json]
+
+
+def test_small_payload_stays_on_the_thread(offloaded):
+    app.encode_response_json({"data": ROWS[:9], "success": True})
+    app.encode_response_json({"message": "ok"})
+    assert offloaded == []
+
+
+def test_threshold_zero_disables_offload(offloaded, monkeypatch):
+    monkeypatch.setattr(app, "CPU_JSON_MIN_ITEMS", 0)
+    app.encode_response_json({"data": ROWS})
+    assert offloaded == []
+
+
+def test_busy_pool_encodes_on_the_thread(monkeypatch):
+    def busy(func, *args):
+        raise app._cpu_pool_busy()
+
+    monkeypatch.setattr(app, "run_cpu", busy)
+    monkeypatch.setattr(app, "CPU_POOL_WORKERS", 2)
+    monkeypatch.setattr(app, "CPU_JSON_MIN_ITEMS", 10)
+    payload = {"data": ROWS}
+    assert app.encode_response_json(payload) == app.encode_json(payload)
+
+
+def test_real_pool_round_trip(monkeypatch):
+    monkeypatch.setattr(app, "CPU_POOL_WORKERS", 1)
+    monkeypatch.setattr(app, "CPU_JSON_MIN_ITEMS", 10)
+    payload = {"data": ROWS, "success": True}
+    try:
+        assert app.encode_response_json(payload) == app.encode_json(payload)
+    finally:
+        app.close_cpu_pool()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Routes "fallback": dernière réponse connue servie quand la base est indisponible."""
+
+import json
+
+import pytest
+
+import app
+
+PATH = "/api/fallback"
+
+
+def _request(path):
+    raw = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1")
+    response, _ = app.run_buffered_request(raw, ("127.0.0.1", 1))
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(lines[0].split()[1]), headers, json.loads(body)
+
+
+class Route:
+    """Route "fallback" dont la base tombe quand down vaut True."""
+
+    __name__ = "_route_fallback"
+
+    def __init__(self):
+        self.down = False
+        self.calls = 0
+
+    def __call__(self, handler, req):
+        if self.down:
+            raise app.DatabaseUnavailable()
+        self.calls += 1
+        return handler._send_json({"count": self.calls})
+
+
+@pytest.fixture
+def route(monkeypatch):
+    route = Route()
+    router = app.Router()
+    router.add("GET", PATH, route, fallback=True)
+    monkeypatch.setattr(app, "ROUTER", router)
+    return route
+
+
+def test_last_good_served_whatever_the_ts(route):
+    _request(f"{PATH}?ts=1")
+    _request(f"{PATH}?ts=2")
+    route.down = True
+    status, headers, body = _request(f"{PATH}?ts=3")
+    assert status == 200
+    assert body["count"] == 2
+    assert headers["x-degraded"] == "database-unavailable"
+    assert "x-data-timestamp" in headers
+
+
+def test_one_payload_per_route(route):
+    for ts in range(20):
+        _request(f"{PATH}?ts={ts}")
+    last_good = app.ROUTER.routes[0]["lastGood"]
+    assert last_good[0]["count"] == 20
+
+
+def test_no_last_good_gives_503(route):
+    route.down = True
+    status, headers, _ = _request(f"{PATH}?ts=1")
+    assert status == 503
+    assert "x-degraded" not in headers
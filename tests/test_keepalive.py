@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""Mode threaded: les connexions keep-alive inactives n'occupent pas le pool de threads."""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import app
+from conftest import ROOT
+
+WORKERS = 4
+PATH = "/api/public-media/stats"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(sock, path=PATH):
+    """Envoie un GET HTTP/1.1 et lit la réponse (Content-Length). Retourne (statut, en-têtes)."""
+    sock.sendall(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode("latin-1"))
+    reader = sock.makefile("rb")
+    status = int(reader.readline().split()[1])
+    headers = {}
+    while True:
+        line = reader.readline().decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    reader.read(int(headers.get("content-length", 0)))
+    reader.close()
+    return status, headers
+
+
+@pytest.fixture
+def server_port(tmp_path):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        PORT=str(port),
+        SERVER_MODE="threaded",
+        HTTP_WORKERS=str(WORKERS),
+        HTTP_QUEUE_SIZE="0",
+        HTTP_KEEPALIVE_TIMEOUT="5",
+        QUIZ_2025_MEDIA_DIR=str(tmp_path),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, str(ROOT / "app.py")],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or proc.poll() is not None:
+                    pytest.fail("le serveur n'a pas démarré")
+                time.sleep(0.1)
+        yield port
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def test_idle_connections_do_not_delay_a_new_request(server_port):
+    idle = []
+    try:
+        # 4x plus de connexions inactives que de threads: keep-alive après une requête,
+        # et connexions ouvertes sans requête (préconnexion des navigateurs)
+        for _ in range(WORKERS * 3):
+            sock = socket.create_connection(("127.0.0.1", server_port), timeout=10)
+            assert _get(sock)[0] == 200
+            idle.append(sock)
+        for _ in range(WORKERS):
+            idle.append(socket.create_connection(("127.0.0.1", server_port), timeout=10))
+        time.sleep(0.2)
+
+        started = time.monotonic()
+        with socket.create_connection(("127.0.0.1", server_port), timeout=10) as sock:
+            status, _ = _get(sock)
+        elapsed = time.monotonic() - started
+
+        assert status == 200
+        assert elapsed < 1.0, f"nouvelle requête servie en {elapsed:.2f}s"
+
+        # Une connexion inactive reste utilisable, et garde son compte de requêtes
+        status, headers = _get(idle[0])
+        assert status == 200
+        assert "max=98" in headers.get("keep-alive", "")
+    finally:
+        for sock in idle:
+            sock.close()
+
+
+@pytest.fixture
+def saturated_server(monkeypatch):
+    """Serveur en processus: 1 worker, file vide, GET /api/block occupe le worker."""
+    release = threading.Event()
+
+    def block(handler, req):
+        release.wait(10)
+        return handler._send_json({"ok": True})
+
+    block.__name__ = "_route_block"
+    router = app.Router()
+    router.add("GET", "/api/block", block)
+    router.add("GET", PATH, lambda handler, req: handler._send_json({"ok": True}))
+    monkeypatch.setattr(app, "ROUTER", router)
+    monkeypatch.setattr(app, "HTTP_SOCKET_TIMEOUT", 0.5)
+    server = app.PooledHTTPServer(("127.0.0.1", 0), app.Handler, workers=1, queue_size=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[1], release
+    finally:
+        release.set()
+        server.shutdown()
+        server.server_close()
+
+
+def test_saturated_pool_keeps_the_idle_thread_running(saturated_server):
+    port, release = saturated_server
+    busy = socket.create_connection(("127.0.0.1", port), timeout=10)
+    waiting = socket.create_connection(("127.0.0.1", port), timeout=10)
+    silent = socket.create_connection(("127.0.0.1", port), timeout=5)
+    try:
+        busy.sendall(b"GET /api/block HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n")
+        time.sleep(0.2)
+        # Aucune place: cette requête attend son tour sans bloquer le thread http-idle
+        waiting.sendall(f"GET {PATH} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode("latin-1"))
+
+        # L'échéance (HTTP_SOCKET_TIMEOUT) d'une connexion sans requête expire quand même
+        started = time.monotonic()
+        assert silent.recv(1) == b""
+        assert time.monotonic() - started < 3
+
+        release.set()
+        assert _get_response(busy) == 200
+        assert _get_response(waiting) == 200
+    finally:
+        for sock in (busy, waiting, silent):
+            sock.close()
+
+
+def _get_response(sock):
+    reader = sock.makefile("rb")
+    try:
+        return int(reader.readline().split()[1])
+    finally:
+        reader.close()
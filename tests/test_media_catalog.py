@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""MediaCatalog: mêmes listes que l'ancien parcours du dossier, reconstruites sur changement."""
+
+import datetime
+import json
+import os
+
+import pytest
+
+import app
+
+BASE = 1_750_000_000
+FILES = {
+    # nom: (décalage du mtime en secondes, métadonnées)
+    "b.jpg": (30, {}),
+    "A.png": (10, {"order": 2}),
+    "c.mp4": (10, {"caption": "Finale"}),
+    "d.webm": (50, {"order": -1}),
+    "e.jpg": (20, {"hidden": True}),
+    "F.jpg": (10, {"order": 2}),
+    "g.mp4": (40, {"hidden": True, "order": 1}),
+    "h.jpeg": (30, {"order": "3"}),
+}
+
+
+def _legacy_listing(root, include_hidden, media_type, sort):
+    """Ancien Handler._list_quiz_media + _apply_media_query (sans recherche ni pagination)."""
+    meta = app.load_quiz_media_meta(root)
+    items = []
+    for file in sorted(root.iterdir(), key=lambda x: x.name.lower()):
+        if not file.is_file() or file.suffix.lower() not in app.QUIZ_2025_ALLOWED_EXT:
+            continue
+        file_meta = meta.get(file.name, {}) if isinstance(meta.get(file.name), dict) else {}
+        hidden = bool(file_meta.get("hidden", False))
+        if hidden and not include_hidden:
+            continue
+        items.append(
+            {
+                "name": file.name,
+                "type": "video" if app.QUIZ_2025_ALLOWED_EXT[file.suffix.lower()].startswith("video/") else "image",
+                "order": int(file_meta.get("order", 0) or 0),
+                "createdAt": datetime.datetime.fromtimestamp(file.stat().st_mtime, tz=datetime.timezone.utc).isoformat(),
+            }
+        )
+    if media_type in {"image", "video"}:
+        items = [x for x in items if x["type"] == media_type]
+    if sort == "name":
+        items = sorted(items, key=lambda x: x["name"].lower())
+    elif sort == "oldest":
+        items = sorted(items, key=lambda x: x["createdAt"])
+    else:
+        items = sorted(items, key=lambda x: x["createdAt"], reverse=True)
+    return [x["name"] for x in sorted(items, key=lambda x: x["order"])]
+
+
+@pytest.fixture
+def media_dir(tmp_path, monkeypatch):
+    for name, (offset, _) in FILES.items():
+        path = tmp_path / name
+        path.write_bytes(b"x")
+        os.utime(path, (BASE + offset, BASE + offset))
+    (tmp_path / "notes.txt").write_text("ignoré")
+    (tmp_path / "dossier.jpg").mkdir()
+    meta = {name: file_meta for name, (_, file_meta) in FILES.items() if file_meta}
+    (tmp_path / app.QUIZ_2025_META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+    monkeypatch.setattr(app, "QUIZ_2025_MEDIA_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("sort", ["name", "oldest", "newest"])
+@pytest.mark.parametrize("media_type", ["all", "image", "video"])
+@pytest.mark.parametrize("include_hidden", [False, True])
+def test_sort_matches_legacy_listing(media_dir, include_hidden, media_type, sort):
+    catalog = app.MediaCatalog(check_interval=0, rescan_interval=0)
+    names = [x["name"] for x in catalog.items(include_hidden, media_type, sort)]
+    assert names == _legacy_listing(media_dir, include_hidden, media_type, sort)
+
+
+def test_item_fields(media_dir):
+    catalog = app.MediaCatalog(check_interval=0, rescan_interval=0)
+    item = next(x for x in catalog.items(sort="name") if x["name"] == "c.mp4")
+    assert item == {
+        "name": "c.mp4",
+        "url": "/media/c.mp4",
+        "type": "video",
+        "caption": "Finale",
+        "order": 0,
+        "hidden": False,
+        "createdAt": datetime.datetime.fromtimestamp(BASE + 10, tz=datetime.timezone.utc).isoformat(),
+        "sizeBytes": 1,
+    }
+    assert catalog.snapshot()["names"] == frozenset(FILES)
+
+
+def test_rebuilds_only_on_change(media_dir):
+    catalog = app.MediaCatalog(check_interval=0, rescan_interval=0)
+    catalog.items()
+    catalog.items()
+    assert catalog.counters["rebuilds"] == 1
+    (media_dir / "i.jpg").write_bytes(b"x")
+    # mtime du dossier forcé: deux écritures dans la même tic d'horloge
+    os.utime(media_dir, ns=(0, os.stat(media_dir).st_mtime_ns + 1))
+    assert "i.jpg" in [x["name"] for x in catalog.items(sort="name")]
+    assert catalog.counters["rebuilds"] == 2
+
+
+def test_invalidate_sees_metadata_update(media_dir):
+    catalog = app.MediaCatalog(check_interval=3600, rescan_interval=0)
+    assert "b.jpg" in [x["name"] for x in catalog.items()]
+    (media_dir / app.QUIZ_2025_META_FILE).write_text(json.dumps({"b.jpg": {"hidden": True}}), encoding="utf-8")
+    # Dans check_interval: snapshot gardé tant que rien ne l'invalide
+    assert "b.jpg" in [x["name"] for x in catalog.items()]
+    catalog.invalidate()
+    assert "b.jpg" not in [x["name"] for x in catalog.items()]
+
+
+def test_missing_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "QUIZ_2025_MEDIA_DIR", str(tmp_path / "absent"))
+    catalog = app.MediaCatalog(check_interval=0, rescan_interval=0)
+    assert catalog.items() == []
+    assert not catalog.snapshot()["configured"]
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""SettingsCache.public(): clés camelCase et, pour une version, anciennes clés en minuscules."""
+
+import app
+
+
+def _cache(monkeypatch, row):
+    cache = app.SettingsCache(60)
+    monkeypatch.setattr(cache, "get", lambda: app._row_to_camel(row))
+    return cache
+
+
+def test_camel_case_and_legacy_keys(monkeypatch):
+    row = {
+        "votingenabled": 1,
+        "registrationlocked": 0,
+        "competitionclosed": 0,
+        "announcementtext": "Finale samedi",
+        "schedulejson": "[]",
+    }
+    public = _cache(monkeypatch, row).public()
+    assert public["votingEnabled"] == public["votingenabled"] == 1
+    assert public["announcementText"] == public["announcementtext"] == "Finale samedi"
+    assert set(public) == set(app.PUBLIC_SETTINGS_DEFAULTS) | {key.lower() for key in app.PUBLIC_SETTINGS_DEFAULTS}
+
+
+def test_defaults_without_row(monkeypatch):
+    public = _cache(monkeypatch, {}).public()
+    assert public["scheduleJson"] == public["schedulejson"] == "[]"
+    assert public["votingEnabled"] == public["votingenabled"] == 0
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Cache des réponses publiques: une entrée par route, quelle que soit la query string."""
+
+import pytest
+
+import app
+
+PATH = "/api/cached"
+
+
+def _request(path, extra=""):
+    raw = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{extra}\r\n".encode("latin-1")
+    response, _ = app.run_buffered_request(raw, ("127.0.0.1", 1))
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(lines[0].split()[1]), headers, body
+
+
+class Route:
+    """Route "cache" qui compte ses exécutions; version fixée par le test."""
+
+    __name__ = "_route_cached"
+
+    def __init__(self):
+        self.calls = []
+        self.version = 1
+
+    def __call__(self, handler, req):
+        self.calls.append(req["query"])
+        return handler._send_json({"count": len(self.calls)})
+
+
+@pytest.fixture
+def route(monkeypatch):
+    route = Route()
+    router = app.Router()
+    router.add("GET", PATH, route, cache=True)
+    monkeypatch.setattr(app, "ROUTER", router)
+    monkeypatch.setattr(app, "RESPONSE_CACHE", app.ResponseCache())
+    monkeypatch.setattr(app.DATA_VERSION, "current", lambda: route.version)
+    return route
+
+
+def test_ts_parameter_shares_one_entry(route):
+    status, first, body = _request(f"{PATH}?ts=1700000000001")
+    assert status == 200
+    status, second, cached_body = _request(f"{PATH}?ts=1700000000002")
+    assert status == 200
+    assert len(route.calls) == 1
+    assert cached_body == body
+    assert second["etag"] == first["etag"]
+    assert app.RESPONSE_CACHE.stats()["entries"] == 1
+    assert app.RESPONSE_CACHE.counters["hits"] == 1
+
+
+def test_if_none_match_with_new_ts(route):
+    _, headers, _ = _request(f"{PATH}?ts=1")
+    status, _, body = _request(f"{PATH}?ts=2", f"If-None-Match: {headers['etag']}\r\n")
+    assert status == 304
+    assert body == b""
+    assert len(route.calls) == 1
+
+
+def test_new_version_recomputes(route):
+    _request(f"{PATH}?ts=1")
+    route.version = 2
+    _request(f"{PATH}?ts=2")
+    assert len(route.calls) == 2
+    assert app.RESPONSE_CACHE.stats()["entries"] == 1
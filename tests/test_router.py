@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Router: chemins exacts, paramètres, reste du chemin et 405 avec Allow."""
+
+import app
+
+
+def _handler():
+    pass
+
+
+def _router():
+    router = app.Router()
+    router.add("GET", "/api/items", _handler)
+    router.add("POST", "/api/items", _handler)
+    router.add("GET", "/api/items/<id>", _handler)
+    router.add("DELETE", "/api/items/<id>", _handler)
+    router.add("GET", "/api/items/export", _handler)
+    router.add("GET", "/media/<*name>", _handler)
+    return router
+
+
+def test_resolve_exact_path():
+    route, params, allowed = _router().resolve("GET", "/api/items")
+    assert route["pattern"] == "/api/items"
+    assert params == {}
+    assert allowed == ["GET", "POST"]
+
+
+def test_resolve_param_segment():
+    route, params, allowed = _router().resolve("DELETE", "/api/items/42")
+    assert route["pattern"] == "/api/items/<id>"
+    assert route["method"] == "DELETE"
+    assert params == {"id": "42"}
+    assert allowed == ["DELETE", "GET"]
+
+
+def test_static_segment_wins_over_param():
+    route, params, _ = _router().resolve("GET", "/api/items/export")
+    assert route["pattern"] == "/api/items/export"
+    assert params == {}
+
+
+def test_rest_of_path():
+    route, params, _ = _router().resolve("GET", "/media/album/2025/photo.jpg")
+    assert route["pattern"] == "/media/<*name>"
+    assert params == {"name": "album/2025/photo.jpg"}
+
+
+def test_unknown_path():
+    router = _router()
+    assert router.resolve("GET", "/api/other") == (None, {}, [])
+    assert router.resolve("GET", "/api/items/42/extra") == (None, {}, [])
+    # Un segment vide ne remplit pas un paramètre
+    assert router.resolve("GET", "/api/items/")[0] is None
+
+
+def test_wrong_method_returns_allowed_methods():
+    route, params, allowed = _router().resolve("PUT", "/api/items/7")
+    assert route is None
+    assert params == {"id": "7"}
+    assert allowed == ["DELETE", "GET"]
+
+
+def _status_and_headers(raw):
+    head = raw.split(b"\r\n\r\n", 1)[0].decode("latin-1").split("\r\n")
+    headers = {}
+    for line in head[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(head[0].split()[1]), headers
+
+
+def test_handler_sends_405_with_allow():
+    raw, _ = app.run_buffered_request(
+        b"DELETE /api/public-media HTTP/1.1\r\nHost: localhost\r\n\r\n", ("127.0.0.1", 1)
+    )
+    status, headers = _status_and_headers(raw)
+    assert status == 405
+    assert headers["allow"] == "GET"
+
+
+def test_handler_sends_404_for_unknown_path():
+    raw, _ = app.run_buffered_request(b"GET /api/nope HTTP/1.1\r\nHost: localhost\r\n\r\n", ("127.0.0.1", 1))
+    status, headers = _status_and_headers(raw)
+    assert status == 404
+    assert "allow" not in headers
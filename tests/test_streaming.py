@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""iter_json_list: même JSON que _send_json, découpé en morceaux d'environ STREAM_CHUNK_BYTES."""
+
+import datetime
+import json
+
+import pytest
+
+import app
+
+
+class Rows:
+    """Lignes d'un curseur: close() doit être appelé même si l'envoi s'arrête."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def close(self):
+        self.closed = True
+
+
+def _rows(count):
+    return [{"id": i, "name": f"candidat {i:04d}", "createdAt": datetime.datetime(2026, 1, 1, 12, 0, i % 60)} for i in range(count)]
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 500])
+def test_same_json_as_send_json(monkeypatch, count):
+    monkeypatch.setattr(app, "STREAM_CHUNK_BYTES", 1024)
+    rows = _rows(count)
+    body = b"".join(app.iter_json_list(rows))
+    assert body == app.encode_json({"data": rows, "success": True})
+
+
+def test_chunk_size(monkeypatch):
+    monkeypatch.setattr(app, "STREAM_CHUNK_BYTES", 1024)
+    rows = _rows(500)
+    row_size = max(len(app.encode_json(row)) for row in rows) + 2
+    chunks = list(app.iter_json_list(rows))
+    assert len(chunks) > 10
+    for chunk in chunks[:-1]:
+        assert 1024 <= len(chunk) < 1024 + row_size + len(b'{"data": [')
+    assert chunks[-1].endswith(b'], "success": true}')
+
+
+def test_single_chunk_when_small():
+    chunks = list(app.iter_json_list(_rows(3)))
+    assert len(chunks) == 1
+    assert json.loads(chunks[0])["data"][2]["id"] == 2
+
+
+def test_transform_applied_per_row():
+    body = b"".join(app.iter_json_list([1, 2, 3], transform=lambda row: {"n": row * 10}))
+    assert json.loads(body) == {"data": [{"n": 10}, {"n": 20}, {"n": 30}], "success": True}
+
+
+def test_rows_closed_at_end():
+    rows = Rows(_rows(3))
+    list(app.iter_json_list(rows))
+    assert rows.closed
+
+
+def test_rows_closed_when_client_goes_away(monkeypatch):
+    monkeypatch.setattr(app, "STREAM_CHUNK_BYTES", 1024)
+    rows = Rows(_rows(500))
+    chunks = app.iter_json_list(rows)
+    next(chunks)
+    assert not rows.closed
+    chunks.close()
+    assert rows.closed
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""VoteDedupIndex: un vote par (candidat, ip) et par jour UTC, comme vote_dedup."""
+
+import datetime
+
+import app
+
+DAY = 24 * 3600
+# 2026-03-10 23:59:00 UTC
+LATE = datetime.datetime(2026, 3, 10, 23, 59, tzinfo=datetime.timezone.utc).timestamp()
+NOW = LATE - 12 * 3600
+
+
+def test_claim_once_per_window():
+    index = app.VoteDedupIndex()
+    assert index.claim(1, "10.0.0.1", now=NOW)
+    assert not index.claim(1, "10.0.0.1", now=NOW + 10)
+    assert index.seen(1, "10.0.0.1", now=NOW + 10)
+
+
+def test_pairs_are_independent():
+    index = app.VoteDedupIndex()
+    assert index.claim(1, "10.0.0.1", now=NOW)
+    assert index.claim(2, "10.0.0.1", now=NOW)
+    assert index.claim(1, "10.0.0.2", now=NOW)
+    assert not index.seen(3, "10.0.0.1", now=NOW)
+
+
+def test_window_is_the_utc_day():
+    index = app.VoteDedupIndex()
+    assert index.claim(1, "10.0.0.1", now=LATE)
+    # 00:01 UTC le lendemain: nouveau jour pour la base, donc pour l'index aussi
+    assert not index.seen(1, "10.0.0.1", now=LATE + 60)
+    assert index.claim(1, "10.0.0.1", now=LATE + 120)
+    assert not index.claim(1, "10.0.0.1", now=LATE + DAY - 120)
+
+
+def test_same_day_even_24_hours_apart_from_midnight():
+    index = app.VoteDedupIndex()
+    index.add(1, "10.0.0.1", created=LATE - DAY + 120)
+    # 00:01 puis 23:59 du même jour UTC: toujours refusé
+    assert index.seen(1, "10.0.0.1", now=LATE)
+
+
+def test_past_days_are_pruned():
+    index = app.VoteDedupIndex()
+    for day in range(3):
+        index.add(day, "10.0.0.1", created=NOW + day * DAY)
+    assert not index.seen(0, "10.0.0.1", now=NOW + 2 * DAY)
+    assert index.stats() == {"days": 1, "entries": 1}
+    assert index.seen(2, "10.0.0.1", now=NOW + 2 * DAY)
+
+
+def test_utc_day_matches_the_database_date():
+    created = datetime.datetime(2026, 3, 11, 0, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+    # 00:30 à UTC+2 = 22:30 UTC la veille: (createdAt at time zone 'UTC')::date vaut le 10
+    assert app.VoteDedupIndex.utc_day(created.timestamp()) == datetime.date(2026, 3, 10).toordinal()
+
+
+def test_forget_releases_the_claim():
+    index = app.VoteDedupIndex()
+    assert index.claim(1, "10.0.0.1", now=NOW)
+    # Écriture du journal échouée: le vote ne doit pas rester bloqué
+    index.forget(1, "10.0.0.1")
+    assert not index.seen(1, "10.0.0.1", now=NOW)
+    assert index.claim(1, "10.0.0.1", now=NOW)
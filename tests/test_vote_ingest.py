@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Ingestion bufferisée: 202 à l'acceptation, votes écartés par la base comptés."""
+
+import json
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def ingestor(tmp_path, monkeypatch):
+    monkeypatch.setattr(app.SETTINGS, "voting_open", lambda: True)
+    monkeypatch.setattr(app, "VOTE_DEDUP", app.VoteDedupIndex())
+    monkeypatch.setattr(app, "VOTE_SPOOL_FSYNC", False)
+    ingestor = app.VoteIngestor(tmp_path)
+    ingestor._candidates = {1}
+    ingestor._state_at = 0.0
+    with ingestor._lock:
+        ingestor._open_segment_locked()
+    yield ingestor
+    ingestor._handle.close()
+
+
+def test_accept_answers_202_and_journals_the_vote(ingestor):
+    status, _ = ingestor.accept(1, "10.0.0.1", "Awa", None)
+    assert status == 202
+    lines = ingestor._path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[0])["candidateId"] == 1
+    assert ingestor.accept(1, "10.0.0.1", "Awa", None)[0] == 429
+
+
+def test_rejected_votes_are_counted(ingestor, monkeypatch, caplog):
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        assert ingestor.accept(1, ip, None, None)[0] == 202
+    # vote_dedup en base: deux des trois (candidat, ip, jour) déjà pris ailleurs
+    monkeypatch.setattr(ingestor, "_write_batch", lambda votes: 1)
+    with ingestor._lock:
+        ingestor._rotate_locked()
+    assert ingestor._flush_segments()
+    stats = ingestor.stats()
+    assert (stats["flushed"], stats["inserted"], stats["rejected"]) == (3, 1, 2)
+    assert "2 vote(s) sur 3 écarté(s)" in caplog.text